@@ -5,6 +5,9 @@ from app.controllers.hospital_controller import router as hospital_router
 from app.controllers.consultation_room_controller import router as consultation_room_router
 from app.controllers.slot_controller import router as slot_router
 from app.controllers.appointment_controller import router as appointment_router
+from app.controllers.booking_controller import router as booking_router
+from app.controllers.closure_controller import router as closure_router
+from app.controllers.waitlist_controller import router as waitlist_router
 
 __all__ = [
     "auth_router",
@@ -14,4 +17,7 @@ __all__ = [
     "consultation_room_router",
     "slot_router",
     "appointment_router",
+    "booking_router",
+    "closure_router",
+    "waitlist_router",
 ]
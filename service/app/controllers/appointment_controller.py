@@ -1,19 +1,34 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
 from app.database.base import get_db
-from app.schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentUpdate, AppointmentDetailResponse
+from app.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentAutoCreate,
+    AppointmentResponse,
+    AppointmentUpdate,
+    AppointmentReschedule,
+    AppointmentDetailResponse,
+    AppointmentBulkCancel,
+    AppointmentBulkCancelResponse
+)
 from app.services.appointment_service import AppointmentService
 from app.core.dependencies import get_current_patient
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.idempotency import IDEMPOTENCY_HEADER, run_idempotent
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/appointments", tags=["Appointments"])
+router = APIRouter(prefix="/appointments", tags=["Appointments"], route_class=TracedRoute)
 
 
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def book_appointment(
     appointment: AppointmentCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
     db: Session = Depends(get_db),
     current_patient: Patient = Depends(get_current_patient)
 ):
@@ -34,15 +49,54 @@ async def book_appointment(
     - Only weekdays (Monday-Friday)
     - Morning: 8:00 AM - 1:00 PM
     - Afternoon: 2:00 PM - 6:00 PM
+    
+    Send an `Idempotency-Key` header to make retries safe: repeating the
+    request with the same key returns the first response instead of booking again.
+    """
+    service = AppointmentService(db)
+    return await run_idempotent(
+        idempotency_key, "appointments", current_patient.id, appointment,
+        lambda: service.book_appointment(appointment, current_patient),
+        AppointmentResponse, status.HTTP_201_CREATED
+    )
+
+
+@router.post("/auto", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
+async def book_appointment_any_room(
+    appointment: AppointmentAutoCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Book a medical appointment in any free consultation room
+    
+    **Required fields:**
+    - **hospital_id**: Hospital ID
+    - **specialty_id**: Medical specialty ID
+    - **appointment_date**: Appointment date (YYYY-MM-DD)
+    - **start_time**: Start time of a slot (HH:MM:SS)
+    - **shift**: Shift type (morning or afternoon)
+    - **reason**: Reason for consultation (optional)
+    
+    The first free room of the hospital assigned to the specialty is booked
+    atomically; concurrent requests for the same time get different rooms.
+    Returns 400 if every room is taken at that time. Supports `Idempotency-Key`
+    like POST /appointments.
     """
     service = AppointmentService(db)
-    return service.book_appointment(appointment, current_patient)
+    return await run_idempotent(
+        idempotency_key, "appointments/auto", current_patient.id, appointment,
+        lambda: service.book_any_room(appointment, current_patient),
+        AppointmentResponse, status.HTTP_201_CREATED
+    )
 
 
 @router.get("/my-appointments", response_model=List[AppointmentDetailResponse])
 async def get_my_appointments(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Optional: Comma-separated fields to return (e.g. `appointment_date,start_time,specialty.name,consultation_room.name`)"),
     db: Session = Depends(get_db),
     current_patient: Patient = Depends(get_current_patient)
 ):
@@ -51,15 +105,23 @@ async def get_my_appointments(
     
     Returns appointments ordered by date and time (most recent first)
     Includes full details: patient, specialty, date, time, room, status
+    
+    Use `fields` to return (and load) only some fields; nested fields use
+    dot notation, e.g. `?fields=appointment_date,start_time,specialty.name`
     """
+    selection = parse_fields(fields, AppointmentDetailResponse)
     service = AppointmentService(db)
-    return service.get_my_appointments(current_patient, skip, limit)
+    appointments = service.get_my_appointments(current_patient, skip, limit, selection)
+    if selection is None:
+        return appointments
+    return sparse_response(appointments, AppointmentDetailResponse, selection)
 
 
 @router.get("/upcoming", response_model=List[AppointmentDetailResponse])
 async def get_upcoming_appointments(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Optional: Comma-separated fields to return (e.g. `appointment_date,start_time,specialty.name,consultation_room.name`)"),
     db: Session = Depends(get_db),
     current_patient: Patient = Depends(get_current_patient)
 ):
@@ -69,9 +131,65 @@ async def get_upcoming_appointments(
     Returns only future appointments (from today onwards)
     Status: pending or confirmed
     Ordered by date and time (nearest first)
+    
+    Supports `fields` like GET /appointments/my-appointments
+    """
+    selection = parse_fields(fields, AppointmentDetailResponse)
+    service = AppointmentService(db)
+    appointments = service.get_upcoming_appointments(current_patient, skip, limit, selection)
+    if selection is None:
+        return appointments
+    return sparse_response(appointments, AppointmentDetailResponse, selection)
+
+
+@router.get("/export")
+async def export_appointments(
+    hospital_id: int = Query(..., description="Hospital ID"),
+    date_from: date = Query(..., description="Start date (YYYY-MM-DD), inclusive"),
+    date_to: date = Query(..., description="End date (YYYY-MM-DD), inclusive"),
+    export_format: str = Query("ndjson", alias="format", description="Export format: ndjson or csv"),
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Export all appointments of a hospital in a date range (admin only)
+    
+    - Streams rows as they are fetched from a server-side cursor
+    - Memory stays flat regardless of the export size
+    - Includes hospital, specialty, room and patient names
+    - **format**: `ndjson` (one JSON object per line) or `csv`
+    """
+    service = AppointmentService(db)
+    chunks = service.export_appointments(hospital_id, date_from, date_to, export_format)
+    
+    extension = "csv" if export_format.lower() == "csv" else "ndjson"
+    media_type = "text/csv" if extension == "csv" else "application/x-ndjson"
+    filename = f"appointments_{hospital_id}_{date_from}_{date_to}.{extension}"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/bulk-cancel", response_model=AppointmentBulkCancelResponse)
+async def bulk_cancel_appointments(
+    bulk: AppointmentBulkCancel,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Close a room, or a hospital, for a date range and cancel its active appointments (admin only)
+    
+    - **consultation_room_id** or **hospital_id** (optionally with **specialty_id**:
+      closes the hospital's rooms of that specialty)
+    - Creates the closures and runs one set-based UPDATE in a single transaction
+    - The closed days stop offering slots; delete the closures to reopen them
+    - Returns the affected patients with their contact data for notification
     """
     service = AppointmentService(db)
-    return service.get_upcoming_appointments(current_patient, skip, limit)
+    return service.cancel_in_bulk(bulk)
 
 
 @router.get("/{appointment_id}", response_model=AppointmentDetailResponse)
@@ -102,6 +220,25 @@ async def update_appointment(
     return service.update_appointment(appointment_id, appointment_update, current_patient)
 
 
+@router.post("/{appointment_id}/reschedule", response_model=AppointmentResponse)
+async def reschedule_appointment(
+    appointment_id: int,
+    reschedule: AppointmentReschedule,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Move an appointment to another slot
+    
+    - Same specialty; **consultation_room_id** is optional (same room by default)
+    - The new slot is claimed and the old one released in one transaction:
+      if the new slot is taken, the appointment keeps its current slot
+    - The appointment status becomes `rescheduled`
+    """
+    service = AppointmentService(db)
+    return service.reschedule_appointment(appointment_id, reschedule, current_patient)
+
+
 @router.delete("/{appointment_id}", status_code=status.HTTP_200_OK)
 async def cancel_appointment(
     appointment_id: int,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, status
 from sqlalchemy.orm import Session
 
 from app.database.base import get_db
@@ -6,8 +6,10 @@ from app.schemas.patient import PatientCreate, PatientLogin, PatientResponse, To
 from app.services.auth_service import AuthService
 from app.core.dependencies import get_current_patient
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
+from app.core.rate_limit import client_ip
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TracedRoute)
 
 
 @router.post("/register", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
@@ -28,14 +30,20 @@ async def register(patient: PatientCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: PatientLogin, db: Session = Depends(get_db)):
+async def login(
+    credentials: PatientLogin,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Login with document number and password
     
-    Returns JWT access token
+    Returns JWT access token. Repeated attempts per document number or IP
+    are throttled with 429 and Retry-After.
     """
     service = AuthService(db)
-    return service.login(credentials)
+    return service.login(credentials, client_ip(request), background_tasks)
 
 
 @router.get("/me", response_model=PatientResponse)
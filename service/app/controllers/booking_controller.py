@@ -0,0 +1,46 @@
+"""
+Booking Controller
+Composite endpoints for the booking flow
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database.base import get_db
+from app.schemas.booking import BookingBootstrapResponse
+from app.services.booking_service import BookingService
+from app.core.dependencies import get_current_patient
+from app.models.patient import Patient
+from app.core.tracing import TracedRoute
+
+router = APIRouter(prefix="/booking", tags=["Booking"], route_class=TracedRoute)
+
+
+@router.get("/bootstrap", response_model=BookingBootstrapResponse)
+def get_booking_bootstrap(
+    hospital_id: int = Query(..., description="Hospital ID"),
+    specialty_id: int = Query(None, description="Optional: Specialty ID to search first availability"),
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Get everything the first booking screen needs in a single round trip.
+    
+    Replaces steps 1-3 of the booking flow:
+    1. GET /hospitals/{hospital_id}
+    2. GET /hospitals/{hospital_id}/specialties
+    3. GET /slots/available
+    
+    **Returns:**
+    - `hospital`: Hospital details
+    - `specialties`: Specialties offered by the hospital, with `available_rooms`
+    - `first_available_date`: First weekday with free slots for `specialty_id`
+      (searching `BOOKING_SEARCH_DAYS` days ahead), or null
+    - `availability`: Slots of that day, one element per shift with free slots
+    
+    **Example:**
+    ```
+    GET /booking/bootstrap?hospital_id=1&specialty_id=2
+    ```
+    """
+    service = BookingService(db)
+    return service.get_bootstrap(hospital_id, specialty_id)
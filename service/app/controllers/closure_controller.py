@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from app.database.base import get_db
+from app.schemas.closure import ClosureCreate, ClosureResponse
+from app.services.closure_service import ClosureService
+from app.core.dependencies import get_current_patient
+from app.models.patient import Patient
+from app.core.tracing import TracedRoute
+
+router = APIRouter(prefix="/closures", tags=["Closures"], route_class=TracedRoute)
+
+
+@router.get("/", response_model=List[ClosureResponse])
+async def list_closures(
+    date_from: Optional[date] = Query(None, description="From date (YYYY-MM-DD), today by default"),
+    date_to: Optional[date] = Query(None, description="To date (YYYY-MM-DD), inclusive"),
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    List holidays, hospital closures and room maintenance windows
+    
+    Without date_to, returns every closure that has not ended yet.
+    """
+    service = ClosureService(db)
+    return service.list_closures(date_from, date_to)
+
+
+@router.post("/", response_model=ClosureResponse, status_code=status.HTTP_201_CREATED)
+async def create_closure(
+    closure: ClosureCreate,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Close days for booking (admin only)
+    
+    - **global**: holiday, every hospital
+    - **hospital**: one hospital (hospital_id)
+    - **room**: maintenance of one consultation room (consultation_room_id)
+    
+    Existing appointments are kept; closed days stop offering slots.
+    """
+    service = ClosureService(db)
+    return service.create_closure(closure)
+
+
+@router.delete("/{closure_id}", status_code=status.HTTP_200_OK)
+async def delete_closure(
+    closure_id: int,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """Delete a closure (admin only)"""
+    service = ClosureService(db)
+    return service.delete_closure(closure_id)
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.base import get_db
 from app.schemas.consultation_room import (
@@ -11,25 +11,41 @@ from app.schemas.consultation_room import (
     AssignSpecialtyToRoomRequest,
     RemoveSpecialtyFromRoomRequest
 )
+from app.schemas.schedule import (
+    RoomScheduleUpdate,
+    RoomScheduleResponse,
+    ScheduleExceptionCreate,
+    ScheduleExceptionResponse
+)
 from app.services.consultation_room_service import ConsultationRoomService
+from app.services.schedule_service import ScheduleService
 from app.core.dependencies import get_current_patient
+from app.core.fieldsets import parse_fields, sparse_response
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/consultation-rooms", tags=["Consultation Rooms"])
+router = APIRouter(prefix="/consultation-rooms", tags=["Consultation Rooms"], route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[ConsultationRoomResponse])
 async def list_consultation_rooms(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Optional: Comma-separated fields to return (e.g. `room_number,name,floor`)"),
     db: Session = Depends(get_db),
     current_patient: Patient = Depends(get_current_patient)
 ):
     """
     List all active consultation rooms
+    
+    Use `fields` to return (and load) only some fields
     """
+    selection = parse_fields(fields, ConsultationRoomResponse)
     service = ConsultationRoomService(db)
-    return service.get_all_rooms(skip, limit)
+    rooms = service.get_all_rooms(skip, limit, selection)
+    if selection is None:
+        return rooms
+    return sparse_response(rooms, ConsultationRoomResponse, selection)
 
 
 @router.get("/by-specialty/{specialty_id}", response_model=List[ConsultationRoomResponse])
@@ -174,6 +190,70 @@ async def remove_specialty_from_room(
     return service.remove_specialty(room_id, request.specialty_id)
 
 
+@router.get("/{room_id}/schedule", response_model=RoomScheduleResponse)
+async def get_room_schedule(
+    room_id: int,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Get the weekly schedule templates and upcoming exceptions of a room
+    
+    Rooms without templates use the default grid (Monday-Friday, 8-13 / 14-18)
+    """
+    service = ScheduleService(db)
+    return service.get_room_schedule(room_id)
+
+
+@router.put("/{room_id}/schedule", response_model=RoomScheduleResponse)
+async def replace_room_schedule(
+    room_id: int,
+    schedule: RoomScheduleUpdate,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Replace the weekly schedule of a room (admin only)
+    
+    One template per weekday (0=Monday ... 6=Sunday) and shift, with optional
+    breaks. Days or shifts without a template have no slots. An empty list
+    restores the default grid.
+    """
+    service = ScheduleService(db)
+    return service.replace_room_schedule(room_id, schedule)
+
+
+@router.post("/{room_id}/schedule/exceptions", response_model=ScheduleExceptionResponse, status_code=status.HTTP_201_CREATED)
+async def add_schedule_exception(
+    room_id: int,
+    exception: ScheduleExceptionCreate,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Override a room's shift on a date (admin only)
+    
+    With start_time/end_time the shift uses those hours that day; without
+    them the shift has no slots that day.
+    """
+    service = ScheduleService(db)
+    return service.add_exception(room_id, exception)
+
+
+@router.delete("/{room_id}/schedule/exceptions/{exception_id}", status_code=status.HTTP_200_OK)
+async def delete_schedule_exception(
+    room_id: int,
+    exception_id: int,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Delete a schedule exception (admin only)
+    """
+    service = ScheduleService(db)
+    return service.delete_exception(room_id, exception_id)
+
+
 @router.delete("/{room_id}", status_code=status.HTTP_200_OK)
 async def deactivate_consultation_room(
     room_id: int,
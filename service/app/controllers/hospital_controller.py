@@ -2,9 +2,9 @@
 Hospital Controller
 Handles HTTP requests for hospitals
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database.base import get_db
 from app.schemas.hospital import (
@@ -21,14 +21,17 @@ from app.repositories.specialty_repository import SpecialtyRepository
 from app.services.hospital_service import HospitalService
 from app.models.patient import Patient
 from app.core.dependencies import get_current_patient
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/hospitals", tags=["hospitals"])
+router = APIRouter(prefix="/hospitals", tags=["hospitals"], route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[HospitalResponse])
 def get_hospitals(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Optional: Comma-separated fields to return (e.g. `name,code,district`)"),
     db: Session = Depends(get_db),
     current_patient: Patient = Depends(get_current_patient)
 ):
@@ -36,11 +39,16 @@ def get_hospitals(
     Get all active hospitals.
     
     This endpoint returns a list of all hospitals where patients can book appointments.
+    Use `fields` to return (and load) only some fields.
     """
+    selection = parse_fields(fields, HospitalResponse)
     repository = HospitalRepository(db)
     specialty_repo = SpecialtyRepository(db)
     service = HospitalService(repository, specialty_repo)
-    return service.get_all_hospitals(skip=skip, limit=limit)
+    hospitals = service.get_all_hospitals(skip=skip, limit=limit, fields=selection)
+    if selection is None:
+        return hospitals
+    return sparse_response(hospitals, HospitalResponse, selection)
 
 
 @router.get("/{hospital_id}", response_model=HospitalResponse)
@@ -85,25 +93,18 @@ def get_hospital_specialties(
     4. Patient checks available slots
     5. Patient books an appointment
     """
-    from app.repositories.consultation_room_repository import ConsultationRoomRepository
-    
     repository = HospitalRepository(db)
     specialty_repo = SpecialtyRepository(db)
-    room_repo = ConsultationRoomRepository(db)
     service = HospitalService(repository, specialty_repo)
     
-    specialties = service.get_hospital_specialties(hospital_id)
-    
-    # Enrich with room count
-    result = []
-    for specialty in specialties:
-        rooms = room_repo.get_by_hospital_and_specialty(hospital_id, specialty.id)
-        result.append(SpecialtyWithRoomCount(
+    # Room count comes from the same grouped query
+    return [
+        SpecialtyWithRoomCount(
             **specialty.__dict__,
-            available_rooms=len(rooms)
-        ))
-    
-    return result
+            available_rooms=room_count
+        )
+        for specialty, room_count in service.get_hospital_specialties_with_room_count(hospital_id)
+    ]
 
 
 @router.post("/", response_model=HospitalResponse, status_code=status.HTTP_201_CREATED)
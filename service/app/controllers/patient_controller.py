@@ -7,8 +7,9 @@ from app.schemas.patient import PatientResponse
 from app.services.patient_service import PatientService
 from app.core.dependencies import get_current_patient
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/patients", tags=["Patients"])
+router = APIRouter(prefix="/patients", tags=["Patients"], route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[PatientResponse])
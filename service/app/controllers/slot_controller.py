@@ -7,8 +7,9 @@ from app.schemas.appointment import AvailableSlotsResponse
 from app.services.slot_service import SlotService
 from app.core.dependencies import get_current_patient
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/slots", tags=["Available Slots"])
+router = APIRouter(prefix="/slots", tags=["Available Slots"], route_class=TracedRoute)
 
 
 @router.get("/available", response_model=AvailableSlotsResponse)
@@ -3,12 +3,13 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.database.base import get_db
-from app.schemas.specialty import SpecialtyResponse, SpecialtyCreate
+from app.schemas.specialty import SpecialtyResponse, SpecialtyCreate, SpecialtyUpdate
 from app.services.specialty_service import SpecialtyService
 from app.core.dependencies import get_current_patient
 from app.models.patient import Patient
+from app.core.tracing import TracedRoute
 
-router = APIRouter(prefix="/specialties", tags=["Specialties"])
+router = APIRouter(prefix="/specialties", tags=["Specialties"], route_class=TracedRoute)
 
 
 @router.get("/", response_model=List[SpecialtyResponse])
@@ -47,3 +48,19 @@ async def create_specialty(
     """Create a new specialty (admin only)"""
     service = SpecialtyService(db)
     return service.create_specialty(specialty)
+
+
+@router.patch("/{specialty_id}", response_model=SpecialtyResponse)
+async def update_specialty(
+    specialty_id: int,
+    specialty_update: SpecialtyUpdate,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Update a specialty (admin only)
+    
+    Changing slot_duration only affects new bookings; existing appointments keep their end time.
+    """
+    service = SpecialtyService(db)
+    return service.update_specialty(specialty_id, specialty_update)
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.database.base import get_db
+from app.schemas.waitlist import WaitlistCreate, WaitlistResponse
+from app.services.waitlist_service import WaitlistService
+from app.core.dependencies import get_current_patient
+from app.models.patient import Patient
+from app.core.tracing import TracedRoute
+
+router = APIRouter(prefix="/waitlist", tags=["Waitlist"], route_class=TracedRoute)
+
+
+@router.post("/", response_model=WaitlistResponse, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(
+    entry: WaitlistCreate,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """
+    Wait for a freed slot of a specialty in a hospital
+    
+    - **date_from** / **date_to**: acceptable dates, inclusive
+    - **shift**: optional, morning or afternoon
+    
+    When an appointment in a matching room and date is cancelled, the slot is
+    booked for the first patient waiting (the entry becomes `booked` and links
+    the appointment).
+    """
+    service = WaitlistService(db)
+    return service.join_waitlist(entry, current_patient)
+
+
+@router.get("/my-entries", response_model=List[WaitlistResponse])
+async def get_my_waitlist_entries(
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """Get my waitlist entries (most recent first)"""
+    service = WaitlistService(db)
+    return service.get_my_entries(current_patient)
+
+
+@router.delete("/{entry_id}", status_code=status.HTTP_200_OK)
+async def leave_waitlist(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_patient: Patient = Depends(get_current_patient)
+):
+    """Leave the waitlist (only waiting entries)"""
+    service = WaitlistService(db)
+    return service.leave_waitlist(entry_id, current_patient)
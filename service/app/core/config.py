@@ -10,11 +10,69 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "neumoapp-secret-key-change-in-production-2024"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # costo de bcrypt; calibrar con calibrate_bcrypt.py
+    
+    # Login throttling (token buckets)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # memory | shm (compartido entre workers del host)
+    LOGIN_THROTTLE_DOCUMENT_CAPACITY: int = 5  # intentos seguidos por documento
+    LOGIN_THROTTLE_DOCUMENT_REFILL_SECONDS: float = 60.0  # segundos para recuperar un intento
+    LOGIN_THROTTLE_IP_CAPACITY: int = 30  # intentos seguidos por IP
+    LOGIN_THROTTLE_IP_REFILL_SECONDS: float = 2.0
+    LOGIN_THROTTLE_SHM_PATH: str = "/dev/shm/neumoapp-login-throttle"
+    LOGIN_THROTTLE_SHM_SLOTS: int = 65536  # buckets en la tabla compartida
+    TRUSTED_PROXIES: str = ""  # IPs/CIDR de balanceadores, separados por coma: la IP real sale de X-Forwarded-For
     
     # Application
     PROJECT_NAME: str = "Neumoapp API"
     VERSION: str = "1.0.0"
     
+    # Monitoring
+    METRICS_ENABLED: bool = True  # expone /metrics (Prometheus)
+    TRACING_EXPORTER: str = "none"  # none | stdout | json
+    TRACING_FILE: str = "traces.jsonl"  # destino del exporter json
+    TRACING_SAMPLE_RATE: float = 1.0  # fracción de requests trazados (0-1)
+    PROFILING_SECRET: Optional[str] = None  # habilita X-Profile; sin valor no se instala
+    PROFILING_DIR: str = "profiles"  # carpeta de salida de los perfiles
+    
+    LOOP_MONITOR_ENABLED: bool = True  # mide el retraso del event loop
+    LOOP_MONITOR_INTERVAL: float = 0.1  # segundos entre mediciones
+    LOOP_BLOCK_DEBUG: bool = False  # registra el stack de los bloqueos del loop
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0  # bloqueo mínimo a registrar
+    
+    # Readiness
+    READINESS_DB_TIMEOUT: float = 1.0  # segundos para el SELECT 1
+    READINESS_MAX_POOL_USAGE: float = 0.9  # fracción del pool en uso que marca sobrecarga
+    READINESS_MAX_LOOP_LAG_MS: float = 200.0  # retraso promedio máximo del event loop
+    READINESS_LOOP_LAG_WINDOW_SECONDS: float = 10.0  # ventana del promedio (ignora picos aislados)
+    READINESS_CACHE_SECONDS: float = 0.5  # reutiliza el último resultado
+    
+    # Booking
+    BOOKING_SEARCH_DAYS: int = 30  # días hacia adelante para buscar disponibilidad
+    SLOT_ENGINE: str = "python"  # python | sql (grilla con generate_series, solo PostgreSQL)
+    
+    # Slot inventory (slots precalculados)
+    SLOT_INVENTORY_ENABLED: bool = False  # lecturas y reservas sobre slot_inventory
+    SLOT_INVENTORY_WEEKS: int = 4  # semanas materializadas hacia adelante
+    SLOT_INVENTORY_REFRESH_SECONDS: int = 3600  # intervalo del job en la app (0 = solo CLI)
+    
+    # Closures (feriados, cierres de hospital y mantenimiento de consultorios)
+    CLOSURE_CALENDAR_HORIZON_DAYS: int = 366  # días precalculados en memoria
+    CLOSURE_CALENDAR_REFRESH_SECONDS: int = 60  # revisa cambios de otros workers (0 = solo carga inicial)
+    
+    # Waitlist (lista de espera)
+    WAITLIST_ENABLED: bool = True  # worker que asigna los slots liberados
+    WAITLIST_MAX_DAYS: int = 30  # rango máximo de fechas por inscripción
+    WAITLIST_REFRESH_SECONDS: int = 30  # sincroniza el índice con las inscripciones de otros workers
+    
+    # Idempotency-Key en la reserva de citas
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # tiempo que se guarda la primera respuesta
+    IDEMPOTENCY_MAX_KEYS: int = 100_000  # respuestas guardadas por worker (descarta las más antiguas)
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000  # filas por fetch del cursor del servidor
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,62 @@
+"""
+In-process slot events
+
+Booking code publishes the slots it frees (cancellations) after committing,
+and a background worker consumes them outside the request path. Publishing
+is thread-safe and never blocks: it appends to a deque and wakes the
+consumer's event loop. Events are dropped while no consumer is attached.
+"""
+import asyncio
+from collections import deque
+from datetime import date, time
+from typing import Deque, List, NamedTuple, Optional
+
+
+class FreedSlot(NamedTuple):
+    consultation_room_id: int
+    appointment_date: date
+    start_time: time
+    end_time: time
+    shift: str
+
+
+class SlotEventQueue:
+    """Queue of freed slots with a single asyncio consumer"""
+
+    def __init__(self):
+        self._events: Deque[FreedSlot] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def attach(self) -> asyncio.Event:
+        """Register the running loop as consumer (call from the loop thread)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def detach(self) -> None:
+        self._loop = None
+        self._wakeup = None
+        self._events.clear()
+
+    def publish(self, slot: FreedSlot) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        self._events.append(slot)
+        # Puede llamarse desde el threadpool: despertar al consumidor en su loop
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # Loop cerrado (apagado)
+            pass
+
+    def drain(self) -> List[FreedSlot]:
+        """Take every pending event, oldest first"""
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+slot_events = SlotEventQueue()
@@ -0,0 +1,160 @@
+"""
+Sparse fieldsets for list endpoints
+
+`?fields=appointment_date,start_time,specialty.name` trims both the response
+model and the columns loaded from the database:
+- parse_fields: validates the selector against the response schema
+- build_load_options: load_only/joinedload options for the ORM query
+- sparse_response: serializes the rows with a trimmed (cached) schema
+"""
+from copy import copy
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only
+
+# {field: None (escalar) | frozenset(subcampos de un objeto anidado)}
+FieldSelection = Dict[str, Optional[FrozenSet[str]]]
+
+# Campos que siempre se devuelven
+ALWAYS_INCLUDED = ("id",)
+
+
+def _nested_model(model: Type[BaseModel], name: str) -> Optional[Type[BaseModel]]:
+    """Return the nested schema of a field, or None if it is a scalar"""
+    annotation = model.model_fields[name].annotation
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FieldSelection]:
+    """
+    Parse a comma separated `fields` selector against a response schema.
+
+    Supports one level of nesting (`specialty.name`). Returns None when no
+    selector was given so callers keep the full response.
+    """
+    if not fields:
+        return None
+
+    selection: Dict[str, Optional[set]] = {name: None for name in ALWAYS_INCLUDED if name in model.model_fields}
+
+    for raw in fields.split(","):
+        path = raw.strip()
+        if not path:
+            continue
+
+        name, _, sub_name = path.partition(".")
+        if name not in model.model_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{path}'"
+            )
+
+        nested = _nested_model(model, name)
+
+        if not sub_name:
+            # Un objeto anidado completo se expande a todos sus campos,
+            # así también se restringen las columnas cargadas
+            selection[name] = set(nested.model_fields) if nested is not None else None
+            continue
+
+        if nested is None or sub_name not in nested.model_fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{path}'"
+            )
+
+        selection.setdefault(name, set()).add(sub_name)
+
+    return {
+        name: frozenset(sub) if sub is not None else None
+        for name, sub in selection.items()
+    }
+
+
+def _selection_key(selection: FieldSelection) -> Tuple:
+    return tuple(sorted(
+        (name, tuple(sorted(sub)) if sub is not None else None)
+        for name, sub in selection.items()
+    ))
+
+
+@lru_cache(maxsize=256)
+def _sparse_model(model: Type[BaseModel], key: Tuple) -> Type[BaseModel]:
+    """Build (once per selection) a schema with only the selected fields"""
+    definitions = {}
+
+    for name, sub in key:
+        field = copy(model.model_fields[name])
+        annotation = field.annotation
+
+        if sub is not None:
+            nested = _nested_model(model, name)
+            annotation = _sparse_model(nested, tuple((sub_name, None) for sub_name in sub))
+
+        definitions[name] = (annotation, field)
+
+    return create_model(
+        f"{model.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+def sparse_model(model: Type[BaseModel], selection: FieldSelection) -> Type[BaseModel]:
+    """Get the trimmed schema for a selection"""
+    return _sparse_model(model, _selection_key(selection))
+
+
+def sparse_response(items: List, model: Type[BaseModel], selection: FieldSelection) -> JSONResponse:
+    """Serialize ORM rows with the trimmed schema"""
+    schema = sparse_model(model, selection)
+    return JSONResponse(content=[
+        schema.model_validate(item).model_dump(mode="json")
+        for item in items
+    ])
+
+
+def _column_names(orm_model, names) -> List:
+    """Map field names to ORM column attributes (ignores non-column fields)"""
+    mapper = inspect(orm_model)
+    return [getattr(orm_model, name) for name in names if name in mapper.column_attrs]
+
+
+def build_load_options(orm_model, selection: Optional[FieldSelection]) -> List:
+    """
+    Build ORM loader options for a selection.
+
+    - Scalars: load_only on the selected columns (plus FKs of selected relations)
+    - Relations: joinedload, restricted with load_only when subfields are given
+    """
+    if selection is None:
+        return []
+
+    mapper = inspect(orm_model)
+    scalar_names = set(name for name in selection if name in mapper.column_attrs)
+    options = []
+
+    for name, sub in selection.items():
+        if name not in mapper.relationships:
+            continue
+
+        relationship = mapper.relationships[name]
+        for column in relationship.local_columns:
+            scalar_names.add(mapper.get_property_by_column(column).key)
+
+        loader = joinedload(getattr(orm_model, name))
+        if sub is not None:
+            target = relationship.mapper.class_
+            target_columns = _column_names(target, set(sub) | set(ALWAYS_INCLUDED))
+            loader = loader.load_only(*target_columns)
+        options.append(loader)
+
+    options.insert(0, load_only(*_column_names(orm_model, scalar_names)))
+    return options
@@ -0,0 +1,139 @@
+"""
+Readiness checks
+
+`/health/ready` tells load balancers whether this worker should receive
+traffic. It fails (503) when:
+- the database does not answer `SELECT 1` within READINESS_DB_TIMEOUT
+- the connection pool is saturated (READINESS_MAX_POOL_USAGE)
+- the event loop lags more than READINESS_MAX_LOOP_LAG_MS on average over
+  the last READINESS_LOOP_LAG_WINDOW_SECONDS (sustained lag, not one spike)
+- a registered in-memory cache is not warm yet
+
+Results are cached for READINESS_CACHE_SECONDS and at most one DB ping runs
+at a time, so polling every second stays cheap even when the DB hangs.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database.base import engine
+from app.core.loop_monitor import loop_monitor
+
+# Cachés en memoria que deben estar cargadas antes de recibir tráfico
+_cache_checks: Dict[str, Callable[[], bool]] = {}
+
+_ping_lock = threading.Lock()
+_refresh_lock = asyncio.Lock()
+_last_result: Optional[Dict] = None
+_last_checked = 0.0
+
+
+def register_cache(name: str, is_warm: Callable[[], bool]) -> None:
+    """Register an in-memory cache whose warm state gates readiness"""
+    _cache_checks[name] = is_warm
+
+
+def _ping_database() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def check_database(timeout: float) -> Dict:
+    """Ping the DB in a worker thread; never runs two pings at once"""
+    if not _ping_lock.acquire(blocking=False):
+        return {"ok": False, "error": "previous ping still running"}
+
+    def ping():
+        try:
+            _ping_database()
+        finally:
+            _ping_lock.release()
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(None, ping), timeout)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"timeout after {timeout}s"}
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def check_pool(max_usage: float) -> Dict:
+    """Checked-out connections vs pool size + overflow"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"ok": True, "detail": f"{type(pool).__name__} has no size limit"}
+
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    in_use = pool.checkedout()
+    usage = in_use / capacity if capacity else 0.0
+    return {
+        "ok": usage < max_usage,
+        "in_use": in_use,
+        "capacity": capacity,
+        "usage": round(usage, 3),
+    }
+
+
+async def measure_loop_lag() -> float:
+    """Milliseconds the loop takes to run a callback scheduled now"""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    future = loop.create_future()
+    loop.call_soon(future.set_result, None)
+    await future
+    return (loop.time() - started) * 1000
+
+
+async def check_loop_lag(max_lag_ms: float, window_seconds: float) -> Dict:
+    if not loop_monitor.running:
+        lag_ms = await measure_loop_lag()
+        return {"ok": lag_ms <= max_lag_ms, "lag_ms": round(lag_ms, 2)}
+
+    # Promedio de la ventana: un login con bcrypt no saca al worker del balanceador
+    lag_ms, worst_ms = loop_monitor.window_lag_ms(window_seconds)
+    return {"ok": lag_ms <= max_lag_ms, "lag_ms": round(lag_ms, 2), "max_lag_ms": round(worst_ms, 2)}
+
+
+def check_caches() -> Dict:
+    caches = {}
+    for name, is_warm in _cache_checks.items():
+        try:
+            caches[name] = bool(is_warm())
+        except Exception:
+            caches[name] = False
+    return {"ok": all(caches.values()), "caches": caches}
+
+
+async def readiness() -> Dict:
+    """Run (or reuse the cached result of) every readiness check"""
+    async with _refresh_lock:
+        # Otro request pudo refrescar el resultado mientras esperábamos
+        if _last_result is not None and time.monotonic() - _last_checked < settings.READINESS_CACHE_SECONDS:
+            return _last_result
+        return await _run_checks()
+
+
+async def _run_checks() -> Dict:
+    global _last_result, _last_checked
+
+    checks = {
+        "database": await check_database(settings.READINESS_DB_TIMEOUT),
+        "pool": check_pool(settings.READINESS_MAX_POOL_USAGE),
+        "event_loop": await check_loop_lag(
+            settings.READINESS_MAX_LOOP_LAG_MS, settings.READINESS_LOOP_LAG_WINDOW_SECONDS
+        ),
+        "cache": check_caches(),
+    }
+    result = {
+        "status": "ready" if all(check["ok"] for check in checks.values()) else "not_ready",
+        "checks": checks,
+    }
+
+    _last_result, _last_checked = result, time.monotonic()
+    return result
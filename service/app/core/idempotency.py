@@ -0,0 +1,208 @@
+"""
+Idempotency keys for booking requests
+
+A client that retries a POST with the same Idempotency-Key header gets the
+first response back instead of booking twice. Responses are stored per
+(scope, patient, key) for IDEMPOTENCY_TTL_SECONDS as the serialized JSON
+body plus a 16-byte fingerprint of the request body:
+
+- replay: a stored key returns the stored status and body (with
+  Idempotent-Replayed: true) without running the handler
+- coalescing: a duplicate that arrives while the first request is still
+  running waits for its result instead of running in parallel
+- misuse: the same key with a different request body is rejected with 422
+
+Success and 4xx responses are stored; 5xx and unexpected errors are not, so
+the retry runs again. The store is per process (like the memory login
+throttle): a retry that lands on another worker runs again, and the slot
+constraints still reject booking the same slot twice.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import IDEMPOTENT_REPLAYS
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# (scope, patient_id, key)
+StoreKey = Tuple[str, int, str]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes
+    status_code: int
+    body: bytes
+    headers: Optional[Dict[str, str]]
+    expires_at: float
+
+
+def fingerprint(payload: BaseModel) -> bytes:
+    return hashlib.blake2b(payload.model_dump_json().encode(), digest_size=16).digest()
+
+
+class IdempotencyStore:
+    """
+    Stored responses and in-flight requests, local to the process. Only used
+    from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, ttl_seconds: float, max_keys: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        # El TTL es fijo: el orden de inserción es también el de expiración
+        self._responses: "OrderedDict[StoreKey, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[StoreKey, Tuple[bytes, asyncio.Future]] = {}
+
+    async def execute(
+        self,
+        key: StoreKey,
+        request_fingerprint: bytes,
+        handler: Callable[[], Any],
+        response_model: Type[BaseModel],
+        status_code: int
+    ) -> Response:
+        """Run handler once per key and return its (stored) response"""
+        while True:
+            self._prune(time.monotonic())
+            stored = self._responses.get(key)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, request_fingerprint)
+                IDEMPOTENT_REPLAYS.inc()
+                return self._response(stored, replayed=True)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            self._check_fingerprint(in_flight[0], request_fingerprint)
+            stored = await asyncio.shield(in_flight[1])
+            if stored is not None:
+                IDEMPOTENT_REPLAYS.inc()
+                return self._response(stored, replayed=True)
+            # La primera falló sin respuesta guardable: se reintenta
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (request_fingerprint, future)
+        stored = None
+        try:
+            try:
+                # En el threadpool (copiando el contexto: traza y contador de
+                # consultas), para que los duplicados puedan esperar
+                result = await run_in_threadpool(handler)
+                stored = self._store(
+                    key, request_fingerprint, status_code,
+                    response_model.model_validate(result).model_dump_json().encode(), None
+                )
+            except HTTPException as exc:
+                if exc.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                    raise
+                stored = self._store(
+                    key, request_fingerprint, exc.status_code,
+                    json.dumps({"detail": exc.detail}).encode(), exc.headers
+                )
+        finally:
+            del self._in_flight[key]
+            future.set_result(stored)
+        return self._response(stored, replayed=False)
+
+    def _store(
+        self,
+        key: StoreKey,
+        request_fingerprint: bytes,
+        status_code: int,
+        body: bytes,
+        headers: Optional[Dict[str, str]]
+    ) -> StoredResponse:
+        stored = StoredResponse(
+            request_fingerprint, status_code, body, headers,
+            time.monotonic() + self.ttl_seconds
+        )
+        self._responses[key] = stored
+        while len(self._responses) > self.max_keys:
+            self._responses.popitem(last=False)
+        return stored
+
+    def _prune(self, now: float) -> None:
+        while self._responses:
+            oldest = next(iter(self._responses.values()))
+            if oldest.expires_at > now:
+                return
+            self._responses.popitem(last=False)
+
+    @staticmethod
+    def _check_fingerprint(stored: bytes, received: bytes) -> None:
+        if stored != received:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_HEADER} was already used with a different request"
+            )
+
+    @staticmethod
+    def _response(stored: StoredResponse, replayed: bool) -> Response:
+        headers = dict(stored.headers or {})
+        if replayed:
+            headers[REPLAYED_HEADER] = "true"
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            headers=headers,
+            media_type="application/json"
+        )
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> Optional[IdempotencyStore]:
+    """Process-wide store built from settings (None when disabled)"""
+    global _store
+    if not settings.IDEMPOTENCY_ENABLED:
+        return None
+    if _store is None:
+        _store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS)
+    return _store
+
+
+async def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    patient_id: int,
+    payload: BaseModel,
+    handler: Callable[[], Any],
+    response_model: Type[BaseModel],
+    status_code: int
+) -> Any:
+    """
+    Run handler under an Idempotency-Key; without a key (or with the feature
+    disabled) it just runs handler.
+    """
+    store = get_idempotency_store()
+    if idempotency_key is None or store is None:
+        return handler()
+
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    return await store.execute(
+        (scope, patient_id, idempotency_key),
+        fingerprint(payload),
+        handler,
+        response_model,
+        status_code
+    )
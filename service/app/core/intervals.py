@@ -0,0 +1,71 @@
+"""
+Time interval helpers for schedule computation
+
+Intervals are half-open (start, end) pairs in minutes since midnight. The
+helpers keep them sorted and non-overlapping, which is the representation
+the compiled room schedules use. normalize and overlaps only compare
+bounds, so they also work on (start_time, end_time) pairs of datetime.time.
+"""
+from bisect import bisect_left
+from datetime import time
+from typing import Iterable, List, Sequence, Tuple
+
+Interval = Tuple[int, int]
+
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+def normalize(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals, dropping empty ones"""
+    merged: List[Interval] = []
+    for start, end in sorted(i for i in intervals if i[0] < i[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(intervals: Iterable[Interval], holes: Iterable[Interval]) -> List[Interval]:
+    """Remove the holes (breaks, closures) from the intervals"""
+    result: List[Interval] = []
+    holes = normalize(holes)
+    for start, end in normalize(intervals):
+        cursor = start
+        for hole_start, hole_end in holes:
+            if hole_end <= cursor or hole_start >= end:
+                continue
+            if hole_start > cursor:
+                result.append((cursor, hole_start))
+            cursor = max(cursor, hole_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def slot_starts(intervals: Iterable[Interval], duration: int) -> List[int]:
+    """Start of every slot of `duration` minutes that fits entirely in an interval"""
+    starts: List[int] = []
+    for start, end in intervals:
+        current = start
+        while current + duration <= end:
+            starts.append(current)
+            current += duration
+    return starts
+
+
+def overlaps(intervals: Sequence[Interval], start: int, end: int) -> bool:
+    """
+    Whether [start, end) overlaps any of the normalized intervals. Binary
+    search: only the last interval starting before `end` can overlap.
+    """
+    index = bisect_left(intervals, (end,))
+    return index > 0 and intervals[index - 1][1] > start
@@ -0,0 +1,114 @@
+"""
+Event loop lag monitor
+
+A background task sleeps LOOP_MONITOR_INTERVAL seconds in a loop and
+records how late it wakes up: that delay is the time the loop spent running
+something else without yielding (blocking SQLAlchemy or bcrypt calls inside
+`async def` handlers). Samples go to the Prometheus metrics and to
+/health/ready, which looks at their average over a recent window so a single
+slow request (one bcrypt login) does not mark the worker unready.
+
+With LOOP_BLOCK_DEBUG a watchdog thread also logs the event loop's stack
+whenever it stays blocked longer than LOOP_BLOCK_THRESHOLD_MS, which points
+at the handler that should move to the threadpool.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from itertools import takewhile
+from typing import Deque, Optional, Tuple
+
+from app.core.metrics import EVENT_LOOP_LAG, EVENT_LOOP_LAG_LAST
+
+logger = logging.getLogger("neumoapp.loop_monitor")
+
+
+class LoopMonitor:
+    """Measures event loop lag and optionally reports blocking stacks"""
+
+    def __init__(self):
+        self.interval = 0.1
+        self.threshold = 0.1
+        self.lag_ms = 0.0
+        # (instante, retraso en ms) de las últimas mediciones
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=10_000)
+        self._last_beat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, interval: float, threshold_ms: float, debug: bool = False) -> None:
+        """Start monitoring the running loop (call from the loop thread)"""
+        if self.running:
+            return
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        if debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_beat = time.monotonic()
+
+            self.lag_ms = lag * 1000
+            self._samples.append((self._last_beat, self.lag_ms))
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+
+    def _watch(self) -> None:
+        """Watchdog thread: dump the loop stack once per stall"""
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_beat = beat
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning("Event loop blocked for %.0f ms:\n%s", blocked * 1000, stack)
+
+    def window_lag_ms(self, window_seconds: float) -> Tuple[float, float]:
+        """(average, worst) lag of the samples taken in the last window_seconds"""
+        since = time.monotonic() - window_seconds
+        recent = [lag_ms for _, lag_ms in takewhile(lambda sample: sample[0] >= since, reversed(self._samples))]
+        recent = recent or [self.lag_ms]
+        return sum(recent) / len(recent), max(recent)
+
+
+loop_monitor = LoopMonitor()
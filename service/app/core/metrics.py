@@ -0,0 +1,196 @@
+"""
+Prometheus metrics
+
+Exposes request latency per route and status, in-flight requests, DB pool
+usage, SQL query counts/durations, bcrypt operations in progress and cache
+hit/miss counters.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers: every process writes its samples there and
+/metrics aggregates all of them.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "neumoapp_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "neumoapp_http_requests_in_flight",
+    "HTTP requests being processed",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "neumoapp_db_pool_connections_in_use",
+    "DB connections checked out from the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "neumoapp_db_pool_connections_capacity",
+    "DB pool size plus max overflow",
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+    "neumoapp_db_query_duration_seconds",
+    "SQL statement duration (the _count series is the query count)",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+BCRYPT_IN_PROGRESS = Gauge(
+    "neumoapp_bcrypt_operations_in_progress",
+    "bcrypt hashes/verifications running or waiting for CPU",
+    ["operation"],
+    multiprocess_mode="livesum",
+)
+BCRYPT_DURATION = Histogram(
+    "neumoapp_bcrypt_duration_seconds",
+    "bcrypt hash/verify duration",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+LOGIN_THROTTLED = Counter(
+    "neumoapp_login_throttled_total",
+    "Login attempts rejected by the throttle",
+)
+IDEMPOTENT_REPLAYS = Counter(
+    "neumoapp_idempotent_replays_total",
+    "Requests answered with the stored response of their Idempotency-Key",
+)
+EVENT_LOOP_LAG = Histogram(
+    "neumoapp_event_loop_lag_seconds",
+    "Delay of the event loop in running a scheduled wake-up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    "neumoapp_event_loop_lag_last_seconds",
+    "Most recent event loop lag sample",
+    multiprocess_mode="livemax",
+)
+CACHE_REQUESTS = Counter(
+    "neumoapp_cache_requests_total",
+    "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count a cache lookup"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+@contextmanager
+def track_bcrypt(operation: str):
+    """Measure a bcrypt operation; in-progress count reflects CPU contention"""
+    in_progress = BCRYPT_IN_PROGRESS.labels(operation=operation)
+    in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        in_progress.dec()
+        BCRYPT_DURATION.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def _sql_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine) -> None:
+    """Track SQL statements and pool usage of a SQLAlchemy engine"""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_start"].pop()
+        DB_QUERY_DURATION.labels(operation=_sql_operation(statement)).observe(time.perf_counter() - started)
+
+    def handle_error(exception_context):
+        # after_cursor_execute no se dispara si la sentencia falla
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            started = conn.info["metrics_query_start"].pop()
+            statement = exception_context.statement or ""
+            DB_QUERY_DURATION.labels(operation=_sql_operation(statement)).observe(time.perf_counter() - started)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+    pool = engine.pool
+    if hasattr(pool, "size") and hasattr(pool, "_max_overflow"):
+        DB_POOL_CAPACITY.set(pool.size() + max(pool._max_overflow, 0))
+
+    event.listen(pool, "checkout", lambda *args: DB_POOL_CHECKED_OUT.inc())
+    event.listen(pool, "checkin", lambda *args: DB_POOL_CHECKED_OUT.dec())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Plantilla de la ruta (/appointments/{appointment_id}) para acotar la cardinalidad
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> tuple:
+    """Return (body, content type) for the /metrics endpoint"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory on shutdown"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
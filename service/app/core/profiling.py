@@ -0,0 +1,166 @@
+"""
+On-demand request profiling
+
+A request carrying the profiling secret in the `X-Profile: <secret>` header
+runs under a profiler and the result is written to PROFILING_DIR; the file
+name comes back in the `X-Profile-File` header. The secret is not accepted in
+the query string, which ends up in access and proxy logs.
+
+Modes (`X-Profile-Mode` header):
+- sampling (default): samples the stacks of the event loop thread and of any
+  threadpool worker running app code every millisecond and writes collapsed
+  stacks (`.folded`), which speedscope and flamegraph.pl open directly
+- cprofile: deterministic cProfile of the event loop thread (`.prof`, open
+  with snakeviz or `python -m pstats`)
+
+Both modes record everything the event loop thread runs while the request is
+in progress, so work of concurrent requests on the same worker shows up in
+the profile too; profile on an otherwise idle worker for a clean picture.
+
+The middleware is only installed when PROFILING_SECRET is set, so there is no
+cost at all otherwise. One request is profiled at a time per worker.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+PROFILE_MODES = ("sampling", "cprofile")
+SAMPLE_INTERVAL = 0.001  # segundos entre muestras
+
+logger = logging.getLogger("neumoapp.profiling")
+
+# Raíz del servicio: un hilo del threadpool solo se muestrea si ejecuta código propio
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Background thread collecting stack samples as collapsed stacks"""
+
+    def __init__(self, main_thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.main_thread_id = main_thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                stack = []
+                in_project = False
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    in_project = in_project or frame.f_code.co_filename.startswith(_PROJECT_ROOT)
+                    frame = frame.f_back
+
+                # Hilos ociosos del threadpool no aportan nada
+                if thread_id != self.main_thread_id and not in_project:
+                    continue
+
+                if thread_id not in names:
+                    thread = threading._active.get(thread_id)
+                    names[thread_id] = thread.name if thread else str(thread_id)
+                stack.append(names[thread_id])
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that carry the profiling secret"""
+
+    def __init__(self, app, secret: str, output_dir: str):
+        self.app = app
+        self.secret = secret.encode()
+        self.output_dir = output_dir
+        self._busy = threading.Lock()
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        """Return the profiler mode if the request is authorized, else None"""
+        headers = dict(scope["headers"])
+        token = headers.get(b"x-profile")
+        mode = headers.get(b"x-profile-mode", b"").decode()
+
+        if not token or not hmac.compare_digest(token, self.secret):
+            return None
+        return mode if mode in PROFILE_MODES else "sampling"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            slug = scope["path"].strip("/").replace("/", "_") or "root"
+            filename = f"{stamp}-{scope['method']}-{slug}.{'folded' if mode == 'sampling' else 'prof'}"
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", filename.encode()),
+                    ]
+                await send(message)
+
+            started = time.perf_counter()
+            if mode == "sampling":
+                profiler = SamplingProfiler(threading.get_ident())
+                profiler.start()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.stop()
+                    with open(os.path.join(self.output_dir, filename), "w") as f:
+                        f.write(profiler.collapsed())
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(os.path.join(self.output_dir, filename))
+
+            logger.info(
+                "Profiled %s %s (%s) in %.1f ms -> %s",
+                scope["method"], scope["path"], mode, (time.perf_counter() - started) * 1000, filename
+            )
+        finally:
+            self._busy.release()
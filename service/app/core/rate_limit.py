@@ -0,0 +1,257 @@
+"""
+Login throttling with token buckets
+
+Every login attempt takes one token from the bucket of its document number
+and one from the bucket of its client IP, before any DB lookup or bcrypt
+work. Buckets refill one token every *_REFILL_SECONDS up to *_CAPACITY; an
+attempt with an empty bucket is rejected with 429 and Retry-After.
+
+Backends (LOGIN_THROTTLE_BACKEND):
+- memory: per-process dict (limits are multiplied by the number of workers)
+- shm: fixed-size hash table in a memory-mapped file under /dev/shm, locked
+  with fcntl, so all workers on one host share the same buckets
+
+Behind a load balancer every connection comes from the proxy, so the client
+IP is taken from X-Forwarded-For when the peer is in TRUSTED_PROXIES;
+otherwise all users would share the proxy's bucket.
+"""
+import fcntl
+import hashlib
+import ipaddress
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import LOGIN_THROTTLED
+
+# (key, capacity, segundos por token)
+BucketSpec = Tuple[str, int, float]
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, refill_seconds: float) -> float:
+    return min(float(capacity), tokens + max(0.0, now - updated) / refill_seconds)
+
+
+def _take_all(buckets: List[Tuple[float, BucketSpec]]) -> float:
+    """Seconds to wait until every bucket has a token (0 = allowed)"""
+    retry_after = 0.0
+    for tokens, (_, _, refill_seconds) in buckets:
+        if tokens < 1:
+            retry_after = max(retry_after, (1 - tokens) * refill_seconds)
+    return retry_after
+
+
+class MemoryBucketStore:
+    """Token buckets in a dict, local to the process"""
+
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float, int, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, specs: Sequence[BucketSpec]) -> float:
+        """Take one token from every bucket, or none; returns retry-after seconds"""
+        now = time.time()
+        with self._lock:
+            current = []
+            for spec in specs:
+                key, capacity, refill_seconds = spec
+                tokens, updated, _, _ = self._buckets.get(key, (capacity, now, capacity, refill_seconds))
+                current.append((_refill(tokens, updated, now, capacity, refill_seconds), spec))
+
+            retry_after = _take_all(current)
+            if retry_after:
+                return retry_after
+
+            for tokens, (key, capacity, refill_seconds) in current:
+                self._buckets[key] = (tokens - 1, now, capacity, refill_seconds)
+
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now: float) -> None:
+        # Un bucket que ya se habría rellenado por completo equivale a no tenerlo
+        self._buckets = {
+            key: value for key, value in self._buckets.items()
+            if _refill(value[0], value[1], now, value[2], value[3]) < value[2]
+        }
+
+
+class SharedMemoryBucketStore:
+    """Token buckets in an mmap'd open-addressing table shared by all workers"""
+
+    SLOT = struct.Struct("<Qdd")  # huella de la clave, tokens, última actualización
+    PROBES = 8
+
+    def __init__(self, path: str, slots: int):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            size = slots * self.SLOT.size
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            size = os.fstat(self._fd).st_size
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._slots = size // self.SLOT.size
+        self._mm = mmap.mmap(self._fd, self._slots * self.SLOT.size)
+        # flock no excluye hilos del mismo proceso (comparten el descriptor)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(key: str) -> int:
+        value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        return value or 1  # 0 marca un slot vacío
+
+    def _find_slot(self, fingerprint: int) -> Tuple[int, bool]:
+        """Return (offset, found); falls back to an empty or the stalest slot"""
+        start = fingerprint % self._slots
+        candidate: Optional[int] = None
+        candidate_updated = math.inf
+
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self._slots) * self.SLOT.size
+            stored, _, updated = self.SLOT.unpack_from(self._mm, offset)
+            if stored == fingerprint:
+                return offset, True
+            if stored == 0:
+                updated = -math.inf
+            if updated < candidate_updated:
+                candidate, candidate_updated = offset, updated
+
+        return candidate, False
+
+    def consume(self, specs: Sequence[BucketSpec]) -> float:
+        """Take one token from every bucket, or none; returns retry-after seconds"""
+        now = time.time()
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                current = []
+                offsets = []
+                for spec in specs:
+                    key, capacity, refill_seconds = spec
+                    fingerprint = self._fingerprint(key)
+                    offset, found = self._find_slot(fingerprint)
+                    if found:
+                        _, tokens, updated = self.SLOT.unpack_from(self._mm, offset)
+                        tokens = _refill(tokens, updated, now, capacity, refill_seconds)
+                    else:
+                        tokens = float(capacity)
+                        # Reservar el slot para que otra clave del mismo lote no lo reutilice
+                        self.SLOT.pack_into(self._mm, offset, fingerprint, tokens, now)
+                    current.append((tokens, spec))
+                    offsets.append((offset, fingerprint))
+
+                retry_after = _take_all(current)
+                if retry_after:
+                    return retry_after
+
+                for (tokens, _), (offset, fingerprint) in zip(current, offsets):
+                    self.SLOT.pack_into(self._mm, offset, fingerprint, tokens - 1, now)
+                return 0.0
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks(value: str) -> Tuple[Network, ...]:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+def _is_trusted(host: str, networks: Tuple[Network, ...]) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    Client IP of a request. When the peer is a trusted proxy, X-Forwarded-For
+    is read from the right, skipping trusted proxies, up to the first address
+    a client could not have forged.
+    """
+    peer = request.client.host if request.client else None
+    networks = _trusted_networks(settings.TRUSTED_PROXIES)
+    if peer is None or not networks or not _is_trusted(peer, networks):
+        return peer
+
+    forwarded = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(forwarded):
+        if not _is_trusted(hop, networks):
+            return hop
+    # Todos los saltos son proxies de confianza
+    return forwarded[0] if forwarded else peer
+
+
+class LoginThrottle:
+    """Per-document and per-IP limits for login attempts"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def check(self, document_number: str, client_ip: Optional[str]) -> None:
+        """Consume an attempt or raise 429"""
+        specs = [(
+            f"doc:{document_number}",
+            settings.LOGIN_THROTTLE_DOCUMENT_CAPACITY,
+            settings.LOGIN_THROTTLE_DOCUMENT_REFILL_SECONDS,
+        )]
+        if client_ip:
+            specs.append((
+                f"ip:{client_ip}",
+                settings.LOGIN_THROTTLE_IP_CAPACITY,
+                settings.LOGIN_THROTTLE_IP_REFILL_SECONDS,
+            ))
+
+        retry_after = self.store.consume(specs)
+        if retry_after:
+            LOGIN_THROTTLED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+_login_throttle: Optional[LoginThrottle] = None
+_init_lock = threading.Lock()
+
+
+def get_login_throttle() -> Optional[LoginThrottle]:
+    """Process-wide throttle built from settings (None when disabled)"""
+    global _login_throttle
+    if not settings.LOGIN_THROTTLE_ENABLED:
+        return None
+
+    if _login_throttle is None:
+        with _init_lock:
+            if _login_throttle is None:
+                backend = settings.LOGIN_THROTTLE_BACKEND.lower()
+                if backend == "shm":
+                    store = SharedMemoryBucketStore(settings.LOGIN_THROTTLE_SHM_PATH, settings.LOGIN_THROTTLE_SHM_SLOTS)
+                elif backend == "memory":
+                    store = MemoryBucketStore()
+                else:
+                    raise ValueError(f"Unknown LOGIN_THROTTLE_BACKEND '{settings.LOGIN_THROTTLE_BACKEND}'")
+                _login_throttle = LoginThrottle(store)
+    return _login_throttle
@@ -4,9 +4,11 @@ import hashlib
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import track_bcrypt
 
 # Configuración de bcrypt para hashear contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Los hashes con otro costo se marcan para rehash (password_needs_rehash)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def _normalize_password(password: str) -> str:
@@ -23,7 +25,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Normaliza la contraseña con SHA256 antes de verificar con bcrypt.
     """
     normalized_password = _normalize_password(plain_password)
-    return pwd_context.verify(normalized_password, hashed_password)
+    with track_bcrypt("verify"):
+        return pwd_context.verify(normalized_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -32,7 +35,13 @@ def get_password_hash(password: str) -> str:
     Primero normaliza con SHA256, luego aplica bcrypt.
     """
     normalized_password = _normalize_password(password)
-    return pwd_context.hash(normalized_password)
+    with track_bcrypt("hash"):
+        return pwd_context.hash(normalized_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash usa un costo distinto de BCRYPT_ROUNDS"""
+    return pwd_context.needs_update(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,303 @@
+"""
+Request tracing
+
+Opens nested spans for each request (root), controller, service and
+repository method and SQL statement, and hands every finished trace to an
+exporter:
+- stdout: indented tree per request, for local runs
+- json: one JSON object per span (JSON lines) appended to TRACING_FILE
+
+The sampling decision is taken once per request (TRACING_SAMPLE_RATE); when
+a request is not sampled every instrumentation point costs a single
+ContextVar lookup.
+"""
+import functools
+import inspect
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+# Span activo del request en curso (None = sin traza o no muestreado)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("tracing_current_span", default=None)
+
+
+class Span:
+    """A timed operation inside a trace"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "end", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], attributes: Optional[Dict] = None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return round(((self.end or time.time()) - self.start) * 1000, 3)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.time()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {getattr(error, 'detail', error)}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Spans collected for one request"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+
+
+# =====================================================
+# Exporters
+# =====================================================
+
+class SpanExporter:
+    """Base exporter: receives the spans of a finished trace"""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class StdoutExporter(SpanExporter):
+    """Print each trace as an indented tree"""
+
+    def export(self, spans: List[Span]) -> None:
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+
+        lines = [f"trace {spans[0].trace.trace_id}"]
+
+        def walk(parent_id: Optional[str], depth: int) -> None:
+            for span in children.get(parent_id, []):
+                error = f" ! {span.error}" if span.error else ""
+                lines.append(f"{'  ' * depth}{span.duration_ms:>10.3f} ms  {span.name}{error}")
+                walk(span.span_id, depth + 1)
+
+        walk(None, 1)
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+class JsonFileExporter(SpanExporter):
+    """Append spans as JSON lines to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        payload = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(payload)
+
+
+_exporter: Optional[SpanExporter] = None
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Install an exporter (None disables tracing)"""
+    global _exporter
+    _exporter = exporter
+
+
+def configure_from_settings() -> bool:
+    """Install the exporter selected by TRACING_EXPORTER; returns whether tracing is on"""
+    name = settings.TRACING_EXPORTER.lower()
+    if name == "stdout":
+        set_exporter(StdoutExporter())
+    elif name == "json":
+        set_exporter(JsonFileExporter(settings.TRACING_FILE))
+    elif name in ("", "none"):
+        set_exporter(None)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER '{settings.TRACING_EXPORTER}'")
+    return _exporter is not None
+
+
+# =====================================================
+# Instrumentation
+# =====================================================
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """Open a child span of the current one (no-op outside a sampled trace)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(parent.trace, name, parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.finish(exc)
+        raise
+    else:
+        span.finish()
+    finally:
+        _current_span.reset(token)
+
+
+def _wrap(func, name: str):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await func(*args, **kwargs)
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_span.get() is None:
+            return func(*args, **kwargs)
+        with start_span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def traced(target):
+    """
+    Trace a function, or every public method of a class.
+
+    Spans are named `Class.method` (or the function's qualified name).
+    """
+    if not inspect.isclass(target):
+        return _wrap(target, target.__qualname__)
+
+    for attr, value in list(vars(target).items()):
+        if attr.startswith("_"):
+            continue
+        name = f"{target.__name__}.{attr}"
+        if isinstance(value, staticmethod):
+            setattr(target, attr, staticmethod(_wrap(value.__func__, name)))
+        elif isinstance(value, classmethod):
+            setattr(target, attr, classmethod(_wrap(value.__func__, name)))
+        elif inspect.isfunction(value):
+            setattr(target, attr, _wrap(value, name))
+    return target
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that wraps the controller (validation, endpoint, serialization) in a span"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = f"{self.endpoint.__module__.rsplit('.', 1)[-1]}.{self.endpoint.__name__}"
+
+        async def traced_handler(request):
+            if _current_span.get() is None:
+                return await handler(request)
+            with start_span(name):
+                return await handler(request)
+
+        return traced_handler
+
+
+def instrument_engine(engine) -> None:
+    """Open a span per SQL statement"""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        span = Span(parent.trace, f"sql {operation}", parent, {"db.statement": statement[:500]})
+        conn.info.setdefault("tracing_spans", []).append(span)
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_span.get() is not None and conn.info.get("tracing_spans"):
+            conn.info["tracing_spans"].pop().finish()
+
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and _current_span.get() is not None and conn.info.get("tracing_spans"):
+            conn.info["tracing_spans"].pop().finish(exception_context.original_exception)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span and exporting the finished trace"""
+
+    def __init__(self, app, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _exporter is None or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        root = Span(trace, f"{scope['method']} {scope['path']}", None, {"http.method": scope["method"]})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-trace-id", trace.trace_id.encode())]
+            await send(message)
+
+        token = _current_span.set(root)
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current_span.reset(token)
+            root.finish(error)
+            # Nombre final con la plantilla de la ruta
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+            _export(trace)
+
+
+def _export(trace: Trace) -> None:
+    exporter = _exporter
+    if exporter is None:
+        return
+    try:
+        exporter.export(trace.spans)
+    except Exception as exc:  # el tracing nunca debe romper un request
+        sys.stderr.write(f"Tracing export failed: {exc}\n")
@@ -13,6 +13,21 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def dialect_insert(db, model):
+    """
+    INSERT of the session's dialect, which supports on_conflict_do_nothing
+    (PostgreSQL and SQLite)
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Insert with conflict handling is not supported on {dialect}")
+    return insert(model)
+
+
 # Dependency para obtener la sesión de base de datos
 def get_db():
     db = SessionLocal()
@@ -3,6 +3,10 @@ from app.models.specialty import Specialty
 from app.models.hospital import Hospital, hospital_specialties
 from app.models.consultation_room import ConsultationRoom, specialty_rooms
 from app.models.appointment import Appointment, AppointmentStatus, ShiftType
+from app.models.slot_inventory import SlotInventory, SlotState
+from app.models.schedule import ScheduleTemplate, ScheduleBreak, ScheduleException
+from app.models.closure import Closure, ClosureScope
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
 
 __all__ = [
     "Patient", 
@@ -13,5 +17,14 @@ __all__ = [
     "specialty_rooms",
     "Appointment", 
     "AppointmentStatus", 
-    "ShiftType"
+    "ShiftType",
+    "SlotInventory",
+    "SlotState",
+    "ScheduleTemplate",
+    "ScheduleBreak",
+    "ScheduleException",
+    "Closure",
+    "ClosureScope",
+    "WaitlistEntry",
+    "WaitlistStatus"
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Date, Time
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Date, Time, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -13,6 +13,10 @@ class AppointmentStatus(str, enum.Enum):
     COMPLETED = "completed"
 
 
+# Estados que ocupan el slot
+ACTIVE_STATUSES = (AppointmentStatus.PENDING.value, AppointmentStatus.CONFIRMED.value, AppointmentStatus.RESCHEDULED.value)
+
+
 class ShiftType(str, enum.Enum):
     MORNING = "morning"  # 8:00 - 13:00
     AFTERNOON = "afternoon"  # 14:00 - 18:00
@@ -43,3 +47,16 @@ class Appointment(Base):
     specialty = relationship("Specialty", back_populates="appointments")
     consultation_room = relationship("ConsultationRoom", back_populates="appointments")
 
+    __table_args__ = (
+        # Un consultorio no puede tener dos citas activas en el mismo slot
+        Index(
+            "uq_appointments_active_room_slot",
+            "consultation_room_id", "appointment_date", "start_time",
+            unique=True,
+            postgresql_where=status.in_(ACTIVE_STATUSES),
+            sqlite_where=status.in_(ACTIVE_STATUSES)
+        ),
+        # Citas solapadas (duraciones distintas): excl_appointments_active_room_overlap,
+        # restricción EXCLUDE de PostgreSQL creada en scripts/migration_add_slot_duration.sql
+    )
+
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Index
+from datetime import datetime
+import enum
+from app.database.base import Base
+
+
+class ClosureScope(str, enum.Enum):
+    GLOBAL = "global"      # feriado: todos los hospitales
+    HOSPITAL = "hospital"  # cierre de un hospital
+    ROOM = "room"          # mantenimiento de un consultorio
+
+
+class Closure(Base):
+    """
+    Days without attention, from start_date to end_date (both inclusive):
+    national holidays, hospital closures and room maintenance windows.
+    """
+    __tablename__ = "closures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(20), nullable=False)  # 'global', 'hospital' o 'room'
+    hospital_id = Column(Integer, ForeignKey("hospitals.id", ondelete="CASCADE"), nullable=True)
+    consultation_room_id = Column(Integer, ForeignKey("consultation_rooms.id", ondelete="CASCADE"), nullable=True)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    reason = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Carga del calendario: cierres vigentes desde hoy
+        Index("idx_closures_end_date", "end_date"),
+    )
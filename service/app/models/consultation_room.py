@@ -25,6 +25,7 @@ class ConsultationRoom(Base):
     building = Column(String(50), nullable=True)  # Ej: "Edificio A", "Torre Principal"
     description = Column(String(255), nullable=True)
     active = Column(Boolean, default=True)
+    schedule_version = Column(Integer, nullable=False, default=0, server_default="0")  # se incrementa al cambiar su horario
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
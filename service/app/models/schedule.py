@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Date, Time, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database.base import Base
+
+
+class ScheduleTemplate(Base):
+    """
+    Working hours of a room for one weekday and shift. Rooms without
+    templates use the default grid (monday to friday, 8-13 / 14-18).
+    """
+    __tablename__ = "schedule_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consultation_room_id = Column(Integer, ForeignKey("consultation_rooms.id", ondelete="CASCADE"), nullable=False, index=True)
+    weekday = Column(Integer, nullable=False)  # 0=lunes ... 6=domingo
+    shift = Column(String(20), nullable=False)  # 'morning' o 'afternoon'
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    breaks = relationship(
+        "ScheduleBreak",
+        back_populates="template",
+        cascade="all, delete-orphan",
+        order_by="ScheduleBreak.start_time"
+    )
+
+    __table_args__ = (
+        UniqueConstraint("consultation_room_id", "weekday", "shift", name="uq_schedule_templates_room_weekday_shift"),
+    )
+
+
+class ScheduleBreak(Base):
+    """Break inside a template (no slots are offered during it)"""
+    __tablename__ = "schedule_breaks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_id = Column(Integer, ForeignKey("schedule_templates.id", ondelete="CASCADE"), nullable=False, index=True)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    template = relationship("ScheduleTemplate", back_populates="breaks")
+
+
+class ScheduleException(Base):
+    """
+    Override of a room's shift on a specific date: different hours, or the
+    shift is off when start_time/end_time are empty.
+    """
+    __tablename__ = "schedule_exceptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consultation_room_id = Column(Integer, ForeignKey("consultation_rooms.id", ondelete="CASCADE"), nullable=False)
+    exception_date = Column(Date, nullable=False)
+    shift = Column(String(20), nullable=False)  # 'morning' o 'afternoon'
+    start_time = Column(Time, nullable=True)  # NULL = turno sin atención
+    end_time = Column(Time, nullable=True)
+    reason = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("consultation_room_id", "exception_date", "shift", name="uq_schedule_exceptions_room_date_shift"),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Time, Index, UniqueConstraint
+from datetime import datetime
+import enum
+from app.database.base import Base
+
+
+class SlotState(str, enum.Enum):
+    FREE = "free"
+    BOOKED = "booked"
+
+
+class SlotInventory(Base):
+    """
+    Precomputed slot (room, specialty, date, start time) materialized from
+    the shift rules of SlotService. Only used with SLOT_INVENTORY_ENABLED.
+    """
+    __tablename__ = "slot_inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consultation_room_id = Column(Integer, ForeignKey("consultation_rooms.id", ondelete="CASCADE"), nullable=False)
+    specialty_id = Column(Integer, ForeignKey("specialties.id", ondelete="CASCADE"), nullable=False)
+    slot_date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    shift = Column(String(20), nullable=False)  # 'morning' o 'afternoon'
+    state = Column(String(20), nullable=False, default=SlotState.FREE.value)  # 'free' o 'booked'
+    appointment_id = Column(Integer, ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "consultation_room_id", "specialty_id", "slot_date", "start_time",
+            name="uq_slot_inventory_room_specialty_date_time"
+        ),
+        # Lectura de disponibilidad: especialidad + fecha + turno
+        Index("idx_slot_inventory_lookup", "specialty_id", "slot_date", "shift", "consultation_room_id", "start_time"),
+        Index("idx_slot_inventory_appointment", "appointment_id"),
+    )
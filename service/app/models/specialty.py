@@ -3,6 +3,9 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.base import Base
 
+# Minutos por consulta si la especialidad no define otro valor
+DEFAULT_SLOT_DURATION = 20
+
 
 class Specialty(Base):
     __tablename__ = "specialties"
@@ -10,6 +13,7 @@ class Specialty(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False)
     description = Column(Text, nullable=True)
+    slot_duration = Column(Integer, nullable=False, default=DEFAULT_SLOT_DURATION, server_default=str(DEFAULT_SLOT_DURATION))  # minutos por consulta
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
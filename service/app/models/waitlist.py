@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Index
+from datetime import datetime
+import enum
+from app.database.base import Base
+
+
+class WaitlistStatus(str, enum.Enum):
+    WAITING = "waiting"      # esperando un slot liberado
+    BOOKED = "booked"        # se le asignó una cita
+    CANCELLED = "cancelled"  # el paciente salió de la lista
+
+
+class WaitlistEntry(Base):
+    """
+    A patient waiting for a freed slot of a specialty in a hospital, between
+    date_from and date_to (both inclusive), optionally in one shift.
+    """
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
+    hospital_id = Column(Integer, ForeignKey("hospitals.id", ondelete="CASCADE"), nullable=False)
+    specialty_id = Column(Integer, ForeignKey("specialties.id", ondelete="CASCADE"), nullable=False)
+    date_from = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=False)
+    shift = Column(String(20), nullable=True)  # NULL = cualquier turno
+    status = Column(String(20), nullable=False, default=WaitlistStatus.WAITING.value)
+    appointment_id = Column(Integer, ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Carga del índice en memoria: inscripciones en espera vigentes
+        Index("idx_waitlist_entries_status_date_to", "status", "date_to"),
+    )
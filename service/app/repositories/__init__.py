@@ -3,6 +3,10 @@ from app.repositories.specialty_repository import SpecialtyRepository
 from app.repositories.hospital_repository import HospitalRepository
 from app.repositories.consultation_room_repository import ConsultationRoomRepository
 from app.repositories.appointment_repository import AppointmentRepository
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
+from app.repositories.schedule_repository import ScheduleRepository
+from app.repositories.closure_repository import ClosureRepository
+from app.repositories.waitlist_repository import WaitlistRepository
 
 __all__ = [
     "PatientRepository",
@@ -10,4 +14,8 @@ __all__ = [
     "HospitalRepository",
     "ConsultationRoomRepository",
     "AppointmentRepository",
+    "SlotInventoryRepository",
+    "ScheduleRepository",
+    "ClosureRepository",
+    "WaitlistRepository",
 ]
@@ -1,10 +1,18 @@
-from typing import Optional, List
-from datetime import date
+from typing import Optional, List, Iterator, Sequence
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.models.appointment import Appointment, AppointmentStatus
+from sqlalchemy import and_, cast, exists, func, literal, select, true, update, Row, Time
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.patient import Patient
+from app.models.specialty import Specialty
+from app.models.consultation_room import ConsultationRoom
+from app.models.hospital import Hospital
+from app.core.fieldsets import FieldSelection, build_load_options
+from app.database.base import dialect_insert
+from app.core.tracing import traced
 
 
+@traced
 class AppointmentRepository:
     """Repository for Appointment data access"""
     
@@ -19,10 +27,13 @@ class AppointmentRepository:
         self, 
         patient_id: int, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
     ) -> List[Appointment]:
         """Get appointments by patient, ordered by date and time"""
-        return self.db.query(Appointment).filter(
+        return self.db.query(Appointment).options(
+            *build_load_options(Appointment, fields)
+        ).filter(
             Appointment.patient_id == patient_id
         ).order_by(
             Appointment.appointment_date.desc(),
@@ -34,10 +45,13 @@ class AppointmentRepository:
         patient_id: int,
         from_date: date,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
     ) -> List[Appointment]:
         """Get upcoming appointments for a patient"""
-        return self.db.query(Appointment).filter(
+        return self.db.query(Appointment).options(
+            *build_load_options(Appointment, fields)
+        ).filter(
             and_(
                 Appointment.patient_id == patient_id,
                 Appointment.appointment_date >= from_date,
@@ -48,6 +62,119 @@ class AppointmentRepository:
             Appointment.start_time.asc()
         ).offset(skip).limit(limit).all()
     
+    def get_active_intervals(self, room_ids: List[int], check_date: date) -> List[Row]:
+        """
+        Get (consultation_room_id, start_time, end_time) of active appointments
+        in the given rooms on a date, whatever their specialty.
+        """
+        if not room_ids:
+            return []
+        return self.db.query(
+            Appointment.consultation_room_id,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                Appointment.consultation_room_id.in_(room_ids),
+                Appointment.appointment_date == check_date,
+                Appointment.status.in_(ACTIVE_STATUSES)
+            )
+        ).all()
+    
+    def exists_overlapping(
+        self,
+        consultation_room_id: int,
+        appointment_date: date,
+        start_time: time,
+        end_time: time,
+        exclude_appointment_id: Optional[int] = None
+    ) -> bool:
+        """
+        Check if an active appointment of the room overlaps [start_time, end_time),
+        ignoring exclude_appointment_id (the appointment being moved)
+        """
+        query = self.db.query(Appointment.id).filter(
+            and_(
+                Appointment.consultation_room_id == consultation_room_id,
+                Appointment.appointment_date == appointment_date,
+                Appointment.start_time < end_time,
+                Appointment.end_time > start_time,
+                Appointment.status.in_(ACTIVE_STATUSES)
+            )
+        )
+        if exclude_appointment_id is not None:
+            query = query.filter(Appointment.id != exclude_appointment_id)
+        return query.first() is not None
+    
+    def get_active_intervals_in_range(
+        self,
+        room_ids: List[int],
+        date_from: date,
+        date_to: date
+    ) -> List[Row]:
+        """
+        Get (consultation_room_id, appointment_date, start_time, end_time) of
+        active appointments in the given rooms and date range.
+        """
+        if not room_ids:
+            return []
+        return self.db.query(
+            Appointment.consultation_room_id,
+            Appointment.appointment_date,
+            Appointment.start_time,
+            Appointment.end_time
+        ).filter(
+            and_(
+                Appointment.consultation_room_id.in_(room_ids),
+                Appointment.appointment_date >= date_from,
+                Appointment.appointment_date <= date_to,
+                Appointment.status.in_(ACTIVE_STATUSES)
+            )
+        ).all()
+    
+    def get_slot_grid(
+        self,
+        room_ids: List[int],
+        check_date: date,
+        shift_start: time,
+        shift_end: time,
+        slot_duration: timedelta
+    ) -> List[Row]:
+        """
+        (consultation_room_id, start_time, end_time, available) for every slot
+        of a shift in the given rooms. The time grid is built with
+        generate_series and availability with an anti-join against overlapping
+        active appointments, so only the final rows leave the database (PostgreSQL).
+        """
+        if not room_ids:
+            return []
+        grid = select(
+            cast(func.generate_series(
+                datetime.combine(check_date, shift_start),
+                datetime.combine(check_date, shift_end) - slot_duration,
+                slot_duration
+            ), Time).label("start_time")
+        ).subquery("grid")
+        taken = exists().where(and_(
+            Appointment.consultation_room_id == ConsultationRoom.id,
+            Appointment.appointment_date == check_date,
+            Appointment.start_time < grid.c.start_time + slot_duration,
+            Appointment.end_time > grid.c.start_time,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ))
+        return self.db.execute(
+            select(
+                ConsultationRoom.id.label("consultation_room_id"),
+                grid.c.start_time,
+                cast(grid.c.start_time + slot_duration, Time).label("end_time"),
+                (~taken).label("available")
+            )
+            .select_from(ConsultationRoom)
+            .join(grid, true())
+            .where(ConsultationRoom.id.in_(room_ids))
+            .order_by(ConsultationRoom.id, grid.c.start_time)
+        ).all()
+    
     def get_by_status(
         self, 
         status: AppointmentStatus, 
@@ -63,6 +190,64 @@ class AppointmentRepository:
         """Get all appointments"""
         return self.db.query(Appointment).offset(skip).limit(limit).all()
     
+    def stream_for_export(
+        self,
+        hospital_id: int,
+        date_from: date,
+        date_to: date,
+        batch_size: int = 1000
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Stream appointments of a hospital in a date range, in batches.
+        
+        Uses a server-side cursor (yield_per) so only one batch is held in
+        memory at a time. Room, specialty, hospital and patient names are
+        joined in the same query.
+        """
+        query = (
+            select(
+                Appointment.id,
+                Appointment.appointment_date,
+                Appointment.start_time,
+                Appointment.end_time,
+                Appointment.shift,
+                Appointment.status,
+                Appointment.reason,
+                Appointment.created_at,
+                Hospital.name.label("hospital_name"),
+                Specialty.name.label("specialty_name"),
+                ConsultationRoom.room_number,
+                ConsultationRoom.name.label("room_name"),
+                Patient.document_number.label("patient_document_number"),
+                Patient.last_name.label("patient_last_name"),
+                Patient.first_name.label("patient_first_name")
+            )
+            .join(ConsultationRoom, Appointment.consultation_room_id == ConsultationRoom.id)
+            .join(Hospital, ConsultationRoom.hospital_id == Hospital.id)
+            .join(Specialty, Appointment.specialty_id == Specialty.id)
+            .join(Patient, Appointment.patient_id == Patient.id)
+            .where(
+                and_(
+                    ConsultationRoom.hospital_id == hospital_id,
+                    Appointment.appointment_date >= date_from,
+                    Appointment.appointment_date <= date_to
+                )
+            )
+            .order_by(
+                Appointment.appointment_date.asc(),
+                Appointment.start_time.asc(),
+                Appointment.id.asc()
+            )
+            .execution_options(yield_per=batch_size)
+        )
+        
+        result = self.db.execute(query)
+        try:
+            for batch in result.partitions():
+                yield batch
+        finally:
+            result.close()
+    
     def create(self, appointment: Appointment) -> Appointment:
         """Create a new appointment"""
         self.db.add(appointment)
@@ -70,6 +255,46 @@ class AppointmentRepository:
         self.db.refresh(appointment)
         return appointment
     
+    def insert_in_first_free_room(self, values: dict, room_ids: List[int]) -> Optional[Appointment]:
+        """
+        Book the first free room among room_ids for a slot in a single
+        INSERT ... SELECT and commit. A room is free when no active appointment
+        overlaps [start_time, end_time). Candidate rooms are locked with
+        FOR UPDATE SKIP LOCKED so concurrent bookings pick different rooms;
+        a remaining race hits the room constraints and inserts nothing.
+        Returns None if no room is free.
+        """
+        taken = exists().where(and_(
+            Appointment.consultation_room_id == ConsultationRoom.id,
+            Appointment.appointment_date == values["appointment_date"],
+            Appointment.start_time < values["end_time"],
+            Appointment.end_time > values["start_time"],
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ))
+        columns = Appointment.__table__.c
+        candidate = (
+            select(
+                *[literal(value, columns[name].type) for name, value in values.items()],
+                ConsultationRoom.id
+            )
+            .where(and_(
+                ConsultationRoom.id.in_(room_ids),
+                ~taken
+            ))
+            .order_by(ConsultationRoom.id)
+            .limit(1)
+            .with_for_update(skip_locked=True, of=ConsultationRoom)
+        )
+        statement = (
+            dialect_insert(self.db, Appointment)
+            .from_select([*values, "consultation_room_id"], candidate)
+            .on_conflict_do_nothing()
+            .returning(Appointment.id)
+        )
+        appointment_id = self.db.execute(statement).scalar()
+        self.db.commit()
+        return self.get_by_id(appointment_id) if appointment_id is not None else None
+    
     def update(self, appointment: Appointment) -> Appointment:
         """Update appointment"""
         self.db.commit()
@@ -85,3 +310,47 @@ class AppointmentRepository:
         """Cancel appointment"""
         appointment.status = AppointmentStatus.CANCELLED
         return self.update(appointment)
+    
+    def cancel_matching(
+        self,
+        date_from: date,
+        date_to: date,
+        consultation_room_ids: Optional[List[int]] = None,
+        hospital_id: Optional[int] = None,
+        observations: Optional[str] = None
+    ) -> List[Row]:
+        """
+        Cancel every active appointment of some rooms (or of a hospital) in a
+        date range with a single UPDATE ... RETURNING, no commit. Returns (id, patient_id, consultation_room_id, appointment_date,
+        start_time, end_time) of the cancelled appointments.
+        """
+        conditions = [
+            Appointment.appointment_date >= date_from,
+            Appointment.appointment_date <= date_to,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ]
+        if consultation_room_ids is not None:
+            conditions.append(Appointment.consultation_room_id.in_(consultation_room_ids))
+        if hospital_id is not None:
+            conditions.append(Appointment.consultation_room_id.in_(
+                select(ConsultationRoom.id).where(ConsultationRoom.hospital_id == hospital_id)
+            ))
+        
+        values = {"status": AppointmentStatus.CANCELLED.value, "updated_at": datetime.utcnow()}
+        if observations is not None:
+            values["observations"] = observations
+        
+        return self.db.execute(
+            update(Appointment)
+            .where(and_(*conditions))
+            .values(**values)
+            .returning(
+                Appointment.id,
+                Appointment.patient_id,
+                Appointment.consultation_room_id,
+                Appointment.appointment_date,
+                Appointment.start_time,
+                Appointment.end_time
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
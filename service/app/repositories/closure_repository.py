@@ -0,0 +1,56 @@
+from typing import List, Optional, Tuple
+from datetime import date
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from app.models.closure import Closure
+from app.core.tracing import traced
+
+
+@traced
+class ClosureRepository:
+    """Repository for holidays, hospital closures and room maintenance windows"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_by_id(self, closure_id: int) -> Optional[Closure]:
+        """Get closure by ID"""
+        return self.db.query(Closure).filter(Closure.id == closure_id).first()
+    
+    def get_active(self, from_date: date) -> List[Closure]:
+        """Closures that end on or after a date"""
+        return self.db.query(Closure).filter(
+            Closure.end_date >= from_date
+        ).order_by(Closure.start_date, Closure.id).all()
+    
+    def get_in_range(self, date_from: date, date_to: date) -> List[Closure]:
+        """Closures that overlap [date_from, date_to]"""
+        return self.db.query(Closure).filter(
+            and_(
+                Closure.start_date <= date_to,
+                Closure.end_date >= date_from
+            )
+        ).order_by(Closure.start_date, Closure.id).all()
+    
+    def get_fingerprint(self) -> Tuple[int, int]:
+        """(count, max id): changes whenever a closure is created or deleted"""
+        count, max_id = self.db.query(func.count(Closure.id), func.max(Closure.id)).one()
+        return count, max_id or 0
+    
+    def create(self, closure: Closure) -> Closure:
+        """Create a new closure"""
+        self.db.add(closure)
+        self.db.commit()
+        self.db.refresh(closure)
+        return closure
+    
+    def add(self, closure: Closure) -> Closure:
+        """Add a closure to the current transaction (no commit)"""
+        self.db.add(closure)
+        self.db.flush()
+        return closure
+    
+    def delete(self, closure: Closure) -> None:
+        """Delete closure"""
+        self.db.delete(closure)
+        self.db.commit()
@@ -1,9 +1,13 @@
 from typing import Optional, List
+from sqlalchemy import select, Row
 from sqlalchemy.orm import Session, joinedload
-from app.models.consultation_room import ConsultationRoom
+from app.models.consultation_room import ConsultationRoom, specialty_rooms
 from app.models.specialty import Specialty
+from app.core.fieldsets import FieldSelection, build_load_options
+from app.core.tracing import traced
 
 
+@traced
 class ConsultationRoomRepository:
     """Repository for ConsultationRoom data access"""
     
@@ -23,6 +27,12 @@ class ConsultationRoomRepository:
             .first()
         )
     
+    def get_by_ids(self, room_ids: List[int]) -> List[ConsultationRoom]:
+        """Get consultation rooms by IDs"""
+        if not room_ids:
+            return []
+        return self.db.query(ConsultationRoom).filter(ConsultationRoom.id.in_(room_ids)).all()
+    
     def get_by_room_number(self, room_number: str) -> Optional[ConsultationRoom]:
         """Get consultation room by room number"""
         return self.db.query(ConsultationRoom).filter(ConsultationRoom.room_number == room_number).first()
@@ -31,9 +41,16 @@ class ConsultationRoomRepository:
         """Get all consultation rooms"""
         return self.db.query(ConsultationRoom).offset(skip).limit(limit).all()
     
-    def get_active(self, skip: int = 0, limit: int = 100) -> List[ConsultationRoom]:
+    def get_active(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
+    ) -> List[ConsultationRoom]:
         """Get active consultation rooms"""
-        return self.db.query(ConsultationRoom).filter(
+        return self.db.query(ConsultationRoom).options(
+            *build_load_options(ConsultationRoom, fields)
+        ).filter(
             ConsultationRoom.active == True
         ).offset(skip).limit(limit).all()
     
@@ -72,6 +89,15 @@ class ConsultationRoomRepository:
             query = query.filter(ConsultationRoom.active == True)
         return query.all()
     
+    def get_specialty_assignments(self) -> List[Row]:
+        """(consultation_room_id, hospital_id, specialty_id) of every active room"""
+        return self.db.execute(
+            select(specialty_rooms.c.consultation_room_id, ConsultationRoom.hospital_id, specialty_rooms.c.specialty_id)
+            .join(ConsultationRoom, ConsultationRoom.id == specialty_rooms.c.consultation_room_id)
+            .where(ConsultationRoom.active == True)
+            .order_by(specialty_rooms.c.consultation_room_id)
+        ).all()
+    
     def create(self, room: ConsultationRoom) -> ConsultationRoom:
         """Create a new consultation room"""
         self.db.add(room)
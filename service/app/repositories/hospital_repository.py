@@ -3,20 +3,31 @@ Hospital Repository
 Handles database operations for hospitals
 """
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from app.models.hospital import Hospital
+from sqlalchemy import and_, func
+from typing import List, Optional, Tuple
+from app.models.hospital import Hospital, hospital_specialties
 from app.models.specialty import Specialty
+from app.models.consultation_room import ConsultationRoom, specialty_rooms
+from app.core.fieldsets import FieldSelection, build_load_options
+from app.core.tracing import traced
 
 
+@traced
 class HospitalRepository:
     """Repository for Hospital entity"""
     
     def __init__(self, db: Session):
         self.db = db
     
-    def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Hospital]:
+    def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+        fields: Optional[FieldSelection] = None
+    ) -> List[Hospital]:
         """Get all hospitals"""
-        query = self.db.query(Hospital)
+        query = self.db.query(Hospital).options(*build_load_options(Hospital, fields))
         if active_only:
             query = query.filter(Hospital.active == True)
         return query.offset(skip).limit(limit).all()
@@ -74,6 +85,33 @@ class HospitalRepository:
         
         return specialties
     
+    def get_specialties_with_room_count(self, hospital_id: int) -> List[Tuple[Specialty, int]]:
+        """
+        Get active specialties of a hospital with the number of active rooms
+        assigned to each one in that hospital, in a single grouped query.
+        """
+        room_count = func.count(ConsultationRoom.id)
+        return (
+            self.db.query(Specialty, room_count)
+            .join(hospital_specialties, hospital_specialties.c.specialty_id == Specialty.id)
+            .outerjoin(specialty_rooms, specialty_rooms.c.specialty_id == Specialty.id)
+            .outerjoin(
+                ConsultationRoom,
+                and_(
+                    ConsultationRoom.id == specialty_rooms.c.consultation_room_id,
+                    ConsultationRoom.hospital_id == hospital_id,
+                    ConsultationRoom.active == True
+                )
+            )
+            .filter(
+                hospital_specialties.c.hospital_id == hospital_id,
+                Specialty.active == True
+            )
+            .group_by(Specialty.id)
+            .order_by(Specialty.name)
+            .all()
+        )
+    
     def has_specialty(self, hospital_id: int, specialty_id: int) -> bool:
         """Check if hospital has a specific specialty"""
         hospital = self.get_by_id_with_specialties(hospital_id)
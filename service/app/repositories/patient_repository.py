@@ -1,8 +1,12 @@
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
+from sqlalchemy import insert, or_, select, update, Row
 from sqlalchemy.orm import Session
 from app.models.patient import Patient
+from app.database.base import dialect_insert
+from app.core.tracing import traced
 
 
+@traced
 class PatientRepository:
     """Repository for Patient data access"""
     
@@ -21,6 +25,33 @@ class PatientRepository:
         """Get patient by email"""
         return self.db.query(Patient).filter(Patient.email == email).first()
     
+    def find_registration_conflicts(self, document_number: str, email: Optional[str]) -> Tuple[bool, bool]:
+        """Check in one query whether the document number and/or email are taken"""
+        condition = Patient.document_number == document_number
+        if email:
+            condition = or_(condition, Patient.email == email)
+        rows = self.db.execute(
+            select(Patient.document_number, Patient.email).where(condition).limit(2)
+        ).all()
+        document_taken = any(row.document_number == document_number for row in rows)
+        email_taken = bool(email) and any(row.email == email for row in rows)
+        return document_taken, email_taken
+    
+    def get_contacts(self, patient_ids: List[int]) -> List[Row]:
+        """(id, document_number, first_name, last_name, email, phone) of the given patients"""
+        if not patient_ids:
+            return []
+        return self.db.execute(
+            select(
+                Patient.id,
+                Patient.document_number,
+                Patient.first_name,
+                Patient.last_name,
+                Patient.email,
+                Patient.phone
+            ).where(Patient.id.in_(patient_ids))
+        ).all()
+    
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Patient]:
         """Get all patients with pagination"""
         return self.db.query(Patient).offset(skip).limit(limit).all()
@@ -36,12 +67,64 @@ class PatientRepository:
         self.db.refresh(patient)
         return patient
     
+    def insert_returning(self, values: dict) -> Patient:
+        """
+        Insert a patient with INSERT ... RETURNING and commit.
+        The row is detached so reading it does not trigger a refresh query.
+        Raises IntegrityError on unique constraint violations.
+        """
+        patient = self.db.execute(
+            insert(Patient).values(**values).returning(Patient)
+        ).scalar_one()
+        self.db.expunge(patient)
+        self.db.commit()
+        return patient
+    
+    def find_existing(self, document_numbers: List[str], emails: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Return the document numbers and emails among the given ones already registered"""
+        if not document_numbers and not emails:
+            return set(), set()
+        rows = self.db.execute(
+            select(Patient.document_number, Patient.email).where(or_(
+                Patient.document_number.in_(document_numbers),
+                Patient.email.in_(emails)
+            ))
+        ).all()
+        return {row.document_number for row in rows}, {row.email for row in rows}
+    
+    def bulk_insert_ignoring_conflicts(self, rows: List[dict]) -> Set[str]:
+        """
+        Insert many patients in one statement, skipping rows that hit a unique
+        constraint (ON CONFLICT DO NOTHING). Returns the inserted document numbers.
+        """
+        if not rows:
+            return set()
+        statement = (
+            dialect_insert(self.db, Patient)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(Patient.document_number)
+        )
+        inserted = set(self.db.execute(statement).scalars())
+        self.db.commit()
+        return inserted
+    
     def update(self, patient: Patient) -> Patient:
         """Update patient"""
         self.db.commit()
         self.db.refresh(patient)
         return patient
     
+    def replace_password_hash(self, patient_id: int, current_hash: str, new_hash: str) -> bool:
+        """Swap the password hash only if it is still current_hash"""
+        result = self.db.execute(
+            update(Patient)
+            .where(Patient.id == patient_id, Patient.password_hash == current_hash)
+            .values(password_hash=new_hash)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+    
     def delete(self, patient: Patient) -> None:
         """Delete patient"""
         self.db.delete(patient)
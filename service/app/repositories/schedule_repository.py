@@ -0,0 +1,85 @@
+from typing import List, Optional
+from datetime import date
+from sqlalchemy import and_, update
+from sqlalchemy.orm import Session, selectinload
+from app.models.consultation_room import ConsultationRoom
+from app.models.schedule import ScheduleTemplate, ScheduleException
+from app.core.tracing import traced
+
+
+@traced
+class ScheduleRepository:
+    """Repository for room schedule templates and exceptions"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_templates(self, room_ids: List[int]) -> List[ScheduleTemplate]:
+        """Templates (with breaks) of the given rooms"""
+        if not room_ids:
+            return []
+        return self.db.query(ScheduleTemplate).options(
+            selectinload(ScheduleTemplate.breaks)
+        ).filter(
+            ScheduleTemplate.consultation_room_id.in_(room_ids)
+        ).order_by(
+            ScheduleTemplate.consultation_room_id,
+            ScheduleTemplate.weekday,
+            ScheduleTemplate.start_time
+        ).all()
+    
+    def get_exceptions(self, room_ids: List[int], from_date: date) -> List[ScheduleException]:
+        """Exceptions of the given rooms from a date on"""
+        if not room_ids:
+            return []
+        return self.db.query(ScheduleException).filter(
+            and_(
+                ScheduleException.consultation_room_id.in_(room_ids),
+                ScheduleException.exception_date >= from_date
+            )
+        ).order_by(ScheduleException.exception_date).all()
+    
+    def get_exception(self, exception_id: int) -> Optional[ScheduleException]:
+        """Get exception by ID"""
+        return self.db.query(ScheduleException).filter(ScheduleException.id == exception_id).first()
+    
+    def get_exception_for_shift(self, room_id: int, exception_date: date, shift: str) -> Optional[ScheduleException]:
+        """Exception of a room's shift on a date, if any"""
+        return self.db.query(ScheduleException).filter(
+            and_(
+                ScheduleException.consultation_room_id == room_id,
+                ScheduleException.exception_date == exception_date,
+                ScheduleException.shift == shift
+            )
+        ).first()
+    
+    def replace_templates(self, room_id: int, templates: List[ScheduleTemplate]) -> None:
+        """Replace all templates of a room and bump its schedule version"""
+        for template in self.get_templates([room_id]):
+            self.db.delete(template)
+        self.db.flush()
+        self.db.add_all(templates)
+        self._bump_version(room_id)
+        self.db.commit()
+    
+    def create_exception(self, exception: ScheduleException) -> ScheduleException:
+        """Create an exception and bump the room's schedule version"""
+        self.db.add(exception)
+        self._bump_version(exception.consultation_room_id)
+        self.db.commit()
+        self.db.refresh(exception)
+        return exception
+    
+    def delete_exception(self, exception: ScheduleException) -> None:
+        """Delete an exception and bump the room's schedule version"""
+        self.db.delete(exception)
+        self._bump_version(exception.consultation_room_id)
+        self.db.commit()
+    
+    def _bump_version(self, room_id: int) -> None:
+        # Invalida el horario compilado en todos los workers
+        self.db.execute(
+            update(ConsultationRoom)
+            .where(ConsultationRoom.id == room_id)
+            .values(schedule_version=ConsultationRoom.schedule_version + 1)
+        )
@@ -0,0 +1,290 @@
+from typing import Optional, List, Set
+from datetime import date, time
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, exists, select, text, update, Row
+from app.models.appointment import Appointment, ACTIVE_STATUSES
+from app.models.consultation_room import ConsultationRoom, specialty_rooms
+from app.models.specialty import Specialty
+from app.models.slot_inventory import SlotInventory, SlotState
+from app.database.base import dialect_insert
+from app.core.tracing import traced
+
+# Clave del advisory lock que serializa la materialización entre workers
+MATERIALIZATION_LOCK_KEY = 4_102_001
+
+
+@traced
+class SlotInventoryRepository:
+    """Repository for the precomputed slot inventory"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ----- Materialización -----
+
+    def try_lock_materialization(self) -> bool:
+        """Take a transaction-level advisory lock (PostgreSQL); True elsewhere"""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MATERIALIZATION_LOCK_KEY}
+        ).scalar())
+
+    def get_room_specialty_pairs(self) -> List[Row]:
+        """(consultation_room_id, specialty_id, slot_duration) of active rooms and specialties"""
+        return self.db.execute(
+            select(specialty_rooms.c.consultation_room_id, specialty_rooms.c.specialty_id, Specialty.slot_duration)
+            .join(ConsultationRoom, ConsultationRoom.id == specialty_rooms.c.consultation_room_id)
+            .join(Specialty, Specialty.id == specialty_rooms.c.specialty_id)
+            .where(and_(ConsultationRoom.active == True, Specialty.active == True))
+        ).all()
+
+    def insert_missing(self, rows: List[dict]) -> int:
+        """Insert inventory rows, ignoring the ones that already exist (no commit)"""
+        if not rows:
+            return 0
+        result = self.db.execute(
+            dialect_insert(self.db, SlotInventory).values(rows).on_conflict_do_nothing()
+        )
+        return max(result.rowcount, 0)
+
+    def mark_booked_from_appointments(self, date_from: date) -> int:
+        """
+        Mark as booked the free rows overlapped by an active appointment of the
+        room, whatever its specialty (no commit)
+        """
+        return self._mark_overlapped(SlotInventory.slot_date >= date_from)
+
+    def _mark_overlapped(self, *conditions) -> int:
+        result = self.db.execute(
+            update(SlotInventory)
+            .where(and_(
+                SlotInventory.consultation_room_id == Appointment.consultation_room_id,
+                SlotInventory.slot_date == Appointment.appointment_date,
+                SlotInventory.start_time < Appointment.end_time,
+                SlotInventory.end_time > Appointment.start_time,
+                SlotInventory.state == SlotState.FREE.value,
+                Appointment.status.in_(ACTIVE_STATUSES),
+                *conditions
+            ))
+            .values(state=SlotState.BOOKED.value, appointment_id=Appointment.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def release_orphans(self, date_from: date) -> int:
+        """Free booked rows whose appointment is no longer active (no commit)"""
+        return self._release_inactive(SlotInventory.slot_date >= date_from)
+
+    def _release_inactive(self, *conditions) -> int:
+        active_appointment = exists().where(and_(
+            Appointment.id == SlotInventory.appointment_id,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        ))
+        result = self.db.execute(
+            update(SlotInventory)
+            .where(and_(
+                SlotInventory.state == SlotState.BOOKED.value,
+                ~active_appointment,
+                *conditions
+            ))
+            .values(state=SlotState.FREE.value, appointment_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def delete_for_room(self, consultation_room_id: int, date_from: date) -> int:
+        """
+        Delete the rows of a room from a date on, e.g. after a schedule change (no commit).
+        The room falls back to the dynamic calculation until it is materialized again.
+        """
+        result = self.db.execute(
+            delete(SlotInventory).where(and_(
+                SlotInventory.consultation_room_id == consultation_room_id,
+                SlotInventory.slot_date >= date_from
+            ))
+        )
+        return result.rowcount
+
+    def delete_for_specialty(self, specialty_id: int, date_from: date) -> int:
+        """Delete the rows of a specialty from a date on, e.g. after its slot duration changed (no commit)"""
+        result = self.db.execute(
+            delete(SlotInventory).where(and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.slot_date >= date_from
+            ))
+        )
+        return result.rowcount
+
+    def delete_before(self, before: date) -> int:
+        """Delete rows of past days (no commit)"""
+        result = self.db.execute(
+            delete(SlotInventory).where(SlotInventory.slot_date < before)
+        )
+        return result.rowcount
+
+    # ----- Lectura y reserva -----
+
+    def get_slots(
+        self,
+        specialty_id: int,
+        room_ids: List[int],
+        slot_date: date,
+        shift: str
+    ) -> List[Row]:
+        """(consultation_room_id, start_time, end_time, available) of a specialty, date and shift"""
+        if not room_ids:
+            return []
+        return self.db.execute(
+            select(
+                SlotInventory.consultation_room_id,
+                SlotInventory.start_time,
+                SlotInventory.end_time,
+                (SlotInventory.state == SlotState.FREE.value).label("available")
+            )
+            .where(and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.slot_date == slot_date,
+                SlotInventory.shift == shift,
+                SlotInventory.consultation_room_id.in_(room_ids)
+            ))
+            .order_by(SlotInventory.consultation_room_id, SlotInventory.start_time)
+        ).all()
+
+    def has_slots(self, specialty_id: int, slot_date: date, consultation_room_id: Optional[int] = None) -> bool:
+        """Check whether the day was materialized for a specialty (and optionally a room)"""
+        query = self.db.query(SlotInventory.id).filter(
+            and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.slot_date == slot_date
+            )
+        )
+        if consultation_room_id is not None:
+            query = query.filter(SlotInventory.consultation_room_id == consultation_room_id)
+        return query.first() is not None
+
+    def get_materialized_room_ids(self, specialty_id: int, slot_date: date, room_ids: List[int]) -> Set[int]:
+        """Rooms among room_ids that have rows for a specialty and date"""
+        if not room_ids:
+            return set()
+        return set(self.db.execute(
+            select(SlotInventory.consultation_room_id)
+            .where(and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.slot_date == slot_date,
+                SlotInventory.consultation_room_id.in_(room_ids)
+            ))
+            .distinct()
+        ).scalars())
+
+    def claim(
+        self,
+        specialty_id: int,
+        consultation_room_id: int,
+        slot_date: date,
+        start_time: time,
+        shift: str
+    ) -> Optional[SlotInventory]:
+        """
+        Lock the free row of a slot with FOR UPDATE SKIP LOCKED.
+        Returns None if it is booked or locked by a concurrent booking.
+        """
+        return self.db.query(SlotInventory).filter(
+            and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.consultation_room_id == consultation_room_id,
+                SlotInventory.slot_date == slot_date,
+                SlotInventory.start_time == start_time,
+                SlotInventory.shift == shift,
+                SlotInventory.state == SlotState.FREE.value
+            )
+        ).with_for_update(skip_locked=True).first()
+
+    def claim_any_room(
+        self,
+        specialty_id: int,
+        room_ids: List[int],
+        slot_date: date,
+        start_time: time,
+        shift: str
+    ) -> Optional[SlotInventory]:
+        """
+        Lock the first free row of a slot among the given rooms
+        (FOR UPDATE SKIP LOCKED): concurrent bookings get different rooms.
+        """
+        return self.db.query(SlotInventory).filter(
+            and_(
+                SlotInventory.specialty_id == specialty_id,
+                SlotInventory.consultation_room_id.in_(room_ids),
+                SlotInventory.slot_date == slot_date,
+                SlotInventory.start_time == start_time,
+                SlotInventory.shift == shift,
+                SlotInventory.state == SlotState.FREE.value
+            )
+        ).order_by(SlotInventory.consultation_room_id).with_for_update(skip_locked=True).first()
+
+    def assign(self, slot: SlotInventory, appointment: Appointment) -> None:
+        """
+        Book a claimed row for an appointment, and the free rows it overlaps in
+        the same room (other specialties or durations). Flushes the appointment, no commit.
+        """
+        self.db.add(appointment)
+        self.db.flush()
+        slot.state = SlotState.BOOKED.value
+        slot.appointment_id = appointment.id
+
+        # Filas solapadas: las que otra reserva tiene bloqueadas se saltan; si esa
+        # reserva choca con esta cita la rechaza la restricción de la tabla
+        overlapped = (
+            select(SlotInventory.id)
+            .where(and_(
+                SlotInventory.consultation_room_id == appointment.consultation_room_id,
+                SlotInventory.slot_date == appointment.appointment_date,
+                SlotInventory.start_time < appointment.end_time,
+                SlotInventory.end_time > appointment.start_time,
+                SlotInventory.state == SlotState.FREE.value,
+                SlotInventory.id != slot.id
+            ))
+            .with_for_update(skip_locked=True)
+        )
+        self.db.execute(
+            update(SlotInventory)
+            .where(SlotInventory.id.in_(overlapped.scalar_subquery()))
+            .values(state=SlotState.BOOKED.value, appointment_id=appointment.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    def release(self, appointment: Appointment) -> int:
+        """
+        Free the rows booked by an appointment, keeping booked the ones another
+        active appointment of the room still overlaps (no commit)
+        """
+        result = self.db.execute(
+            update(SlotInventory)
+            .where(SlotInventory.appointment_id == appointment.id)
+            .values(state=SlotState.FREE.value, appointment_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        self._mark_overlapped(
+            SlotInventory.consultation_room_id == appointment.consultation_room_id,
+            SlotInventory.slot_date == appointment.appointment_date,
+            Appointment.id != appointment.id
+        )
+        return result.rowcount
+
+    def release_cancelled(self, room_ids: List[int], date_from: date, date_to: date) -> int:
+        """
+        Free the rows of appointments cancelled in bulk: two set-based UPDATEs
+        over the affected rooms and dates, whatever the number of appointments.
+        Rows still overlapped by another active appointment stay booked (no commit).
+        """
+        if not room_ids:
+            return 0
+        in_range = (
+            SlotInventory.consultation_room_id.in_(room_ids),
+            SlotInventory.slot_date >= date_from,
+            SlotInventory.slot_date <= date_to
+        )
+        released = self._release_inactive(*in_range)
+        self._mark_overlapped(*in_range)
+        return released
@@ -1,8 +1,10 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from app.models.specialty import Specialty
+from app.core.tracing import traced
 
 
+@traced
 class SpecialtyRepository:
     """Repository for Specialty data access"""
     
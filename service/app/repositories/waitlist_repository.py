@@ -0,0 +1,90 @@
+from typing import List, Optional
+from datetime import date, datetime
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.core.tracing import traced
+
+
+@traced
+class WaitlistRepository:
+    """Repository for waitlist entries"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_by_id(self, entry_id: int) -> Optional[WaitlistEntry]:
+        """Get waitlist entry by ID"""
+        return self.db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+    
+    def get_by_patient(self, patient_id: int) -> List[WaitlistEntry]:
+        """Entries of a patient, most recent first"""
+        return self.db.query(WaitlistEntry).filter(
+            WaitlistEntry.patient_id == patient_id
+        ).order_by(WaitlistEntry.id.desc()).all()
+    
+    def get_waiting(self, from_date: date) -> List[WaitlistEntry]:
+        """Waiting entries that end on or after a date, in arrival order"""
+        return self.db.query(WaitlistEntry).filter(
+            and_(
+                WaitlistEntry.status == WaitlistStatus.WAITING.value,
+                WaitlistEntry.date_to >= from_date
+            )
+        ).order_by(WaitlistEntry.id).all()
+    
+    def get_waiting_ids(self, from_date: date) -> List[int]:
+        """IDs of the waiting entries that end on or after a date"""
+        return self.db.scalars(
+            select(WaitlistEntry.id).where(and_(
+                WaitlistEntry.status == WaitlistStatus.WAITING.value,
+                WaitlistEntry.date_to >= from_date
+            ))
+        ).all()
+    
+    def get_by_ids(self, entry_ids: List[int]) -> List[WaitlistEntry]:
+        """Entries by ID, in arrival order"""
+        if not entry_ids:
+            return []
+        return self.db.query(WaitlistEntry).filter(
+            WaitlistEntry.id.in_(entry_ids)
+        ).order_by(WaitlistEntry.id).all()
+    
+    def create(self, entry: WaitlistEntry) -> WaitlistEntry:
+        """Create a new entry"""
+        self.db.add(entry)
+        self.db.commit()
+        self.db.refresh(entry)
+        return entry
+    
+    def claim(self, entry_id: int) -> bool:
+        """
+        Mark a waiting entry as booked (no commit). False if it already left
+        the list or was served by another worker.
+        """
+        result = self.db.execute(
+            update(WaitlistEntry)
+            .where(and_(
+                WaitlistEntry.id == entry_id,
+                WaitlistEntry.status == WaitlistStatus.WAITING.value
+            ))
+            .values(status=WaitlistStatus.BOOKED.value, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+    
+    def set_appointment(self, entry_id: int, appointment_id: int) -> None:
+        """Link a booked entry to its appointment"""
+        self.db.execute(
+            update(WaitlistEntry)
+            .where(WaitlistEntry.id == entry_id)
+            .values(appointment_id=appointment_id)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+    
+    def cancel(self, entry: WaitlistEntry) -> WaitlistEntry:
+        """Remove a patient from the list"""
+        entry.status = WaitlistStatus.CANCELLED.value
+        self.db.commit()
+        self.db.refresh(entry)
+        return entry
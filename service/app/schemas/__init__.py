@@ -23,13 +23,28 @@ from app.schemas.consultation_room import (
 )
 from app.schemas.appointment import (
     AppointmentCreate, 
+    AppointmentAutoCreate,
     AppointmentResponse, 
     AppointmentDetailResponse,
     AppointmentUpdate,
+    AppointmentReschedule,
+    AppointmentBulkCancel,
+    AppointmentBulkCancelResponse,
+    CancelledAppointment,
+    PatientContact,
     TimeSlot,
     AvailableSlotsResponse,
     ConsultationRoomSimple
 )
+from app.schemas.booking import BookingBootstrapResponse
+from app.schemas.schedule import (
+    RoomScheduleUpdate,
+    RoomScheduleResponse,
+    ScheduleExceptionCreate,
+    ScheduleExceptionResponse
+)
+from app.schemas.closure import ClosureCreate, ClosureResponse
+from app.schemas.waitlist import WaitlistCreate, WaitlistResponse
 
 __all__ = [
     "PatientCreate",
@@ -53,10 +68,25 @@ __all__ = [
     "ConsultationRoomResponse",
     "ConsultationRoomWithSpecialtiesResponse",
     "AppointmentCreate",
+    "AppointmentAutoCreate",
     "AppointmentResponse",
     "AppointmentDetailResponse",
     "AppointmentUpdate",
+    "AppointmentReschedule",
+    "AppointmentBulkCancel",
+    "AppointmentBulkCancelResponse",
+    "CancelledAppointment",
+    "PatientContact",
     "TimeSlot",
     "AvailableSlotsResponse",
     "ConsultationRoomSimple",
+    "BookingBootstrapResponse",
+    "RoomScheduleUpdate",
+    "RoomScheduleResponse",
+    "ScheduleExceptionCreate",
+    "ScheduleExceptionResponse",
+    "ClosureCreate",
+    "ClosureResponse",
+    "WaitlistCreate",
+    "WaitlistResponse",
 ]
@@ -48,11 +48,66 @@ class AppointmentCreate(AppointmentBase):
     pass
 
 
+class AppointmentAutoCreate(BaseModel):
+    """Booking without a room: the first free eligible room is assigned"""
+    hospital_id: int = Field(..., description="Hospital ID")
+    specialty_id: int
+    appointment_date: date = Field(..., description="Appointment date (YYYY-MM-DD)")
+    start_time: time = Field(..., description="Start time (HH:MM:SS)")
+    shift: str = Field(..., description="Shift: morning or afternoon")
+    reason: Optional[str] = Field(None, max_length=500, description="Reason for appointment")
+
+
 class AppointmentUpdate(BaseModel):
     status: Optional[str] = Field(None, description="Status: pending, confirmed, rescheduled, cancelled, completed")
     observations: Optional[str] = Field(None, max_length=500)
 
 
+class AppointmentReschedule(BaseModel):
+    """New slot for an existing appointment (same specialty)"""
+    consultation_room_id: Optional[int] = Field(None, description="Optional: new consultation room (same room by default)")
+    appointment_date: date = Field(..., description="New date (YYYY-MM-DD)")
+    start_time: time = Field(..., description="New start time (HH:MM:SS)")
+    shift: str = Field(..., description="Shift: morning or afternoon")
+
+
+class AppointmentBulkCancel(BaseModel):
+    """Close a room, or a hospital (optionally only the rooms of one specialty), and cancel its active appointments"""
+    consultation_room_id: Optional[int] = Field(None, description="Consultation room ID")
+    hospital_id: Optional[int] = Field(None, description="Hospital ID (when no room is given)")
+    specialty_id: Optional[int] = Field(None, description="Optional: only this specialty")
+    date_from: date = Field(..., description="Start date (YYYY-MM-DD), inclusive")
+    date_to: date = Field(..., description="End date (YYYY-MM-DD), inclusive")
+    observations: Optional[str] = Field(None, max_length=500, description="Cancellation note stored on each appointment")
+
+
+class PatientContact(BaseModel):
+    """Patient contact data for notifications"""
+    id: int
+    document_number: str
+    first_name: str
+    last_name: str
+    email: str
+    phone: Optional[str]
+
+
+class CancelledAppointment(BaseModel):
+    """Appointment cancelled in bulk"""
+    id: int
+    patient_id: int
+    consultation_room_id: int
+    appointment_date: date
+    start_time: time
+    end_time: time
+
+
+class AppointmentBulkCancelResponse(BaseModel):
+    cancelled: int
+    appointments: list[CancelledAppointment]
+    patients: list[PatientContact] = Field(..., description="Affected patients, once each, to notify")
+    closure_ids: list[int] = Field(..., description="Closures created so the days stop offering slots")
+
+
 class AppointmentResponse(BaseModel):
     id: int
     patient_id: int
@@ -0,0 +1,18 @@
+"""
+Booking Schemas
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+from app.schemas.hospital import HospitalResponse
+from app.schemas.specialty import SpecialtyWithRoomCount
+from app.schemas.appointment import AvailableSlotsResponse
+
+
+class BookingBootstrapResponse(BaseModel):
+    """Everything the first booking screen needs, in one response"""
+    hospital: HospitalResponse
+    specialties: List[SpecialtyWithRoomCount] = []
+    selected_specialty_id: Optional[int] = None
+    first_available_date: Optional[date] = None
+    availability: List[AvailableSlotsResponse] = []  # Un elemento por turno con slots libres
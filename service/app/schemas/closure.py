@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class ClosureCreate(BaseModel):
+    scope: str = Field(..., description="global (holiday), hospital or room (maintenance)")
+    hospital_id: Optional[int] = Field(None, description="Required for scope hospital")
+    consultation_room_id: Optional[int] = Field(None, description="Required for scope room")
+    start_date: date = Field(..., description="First closed day (YYYY-MM-DD)")
+    end_date: date = Field(..., description="Last closed day, inclusive (YYYY-MM-DD)")
+    reason: Optional[str] = Field(None, max_length=255)
+
+
+class ClosureResponse(ClosureCreate):
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,64 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date, time
+
+
+class ScheduleBreakBase(BaseModel):
+    start_time: time = Field(..., description="Break start (HH:MM)")
+    end_time: time = Field(..., description="Break end (HH:MM)")
+
+
+class ScheduleBreakResponse(ScheduleBreakBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleTemplateBase(BaseModel):
+    weekday: int = Field(..., ge=0, le=6, description="0=Monday ... 6=Sunday")
+    shift: str = Field(..., description="Shift: morning or afternoon")
+    start_time: time = Field(..., description="Shift start (HH:MM)")
+    end_time: time = Field(..., description="Shift end (HH:MM)")
+
+
+class ScheduleTemplateCreate(ScheduleTemplateBase):
+    breaks: List[ScheduleBreakBase] = Field(default=[], description="Breaks without slots")
+
+
+class ScheduleTemplateResponse(ScheduleTemplateBase):
+    id: int
+    active: bool
+    breaks: List[ScheduleBreakResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class RoomScheduleUpdate(BaseModel):
+    """Full weekly schedule of a room; an empty list restores the default grid"""
+    templates: List[ScheduleTemplateCreate] = Field(default=[])
+
+
+class ScheduleExceptionCreate(BaseModel):
+    exception_date: date = Field(..., description="Date (YYYY-MM-DD)")
+    shift: str = Field(..., description="Shift: morning or afternoon")
+    start_time: Optional[time] = Field(None, description="Hours for that date; empty = shift off")
+    end_time: Optional[time] = Field(None, description="Hours for that date; empty = shift off")
+    reason: Optional[str] = Field(None, max_length=255)
+
+
+class ScheduleExceptionResponse(ScheduleExceptionCreate):
+    id: int
+    consultation_room_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class RoomScheduleResponse(BaseModel):
+    consultation_room_id: int
+    schedule_version: int
+    uses_default: bool = Field(..., description="True when the room has no templates")
+    templates: List[ScheduleTemplateResponse] = []
+    exceptions: List[ScheduleExceptionResponse] = []
@@ -6,6 +6,7 @@ from datetime import datetime
 class SpecialtyBase(BaseModel):
     name: str = Field(..., min_length=3, max_length=100)
     description: Optional[str] = None
+    slot_duration: int = Field(20, ge=5, le=240)  # minutos por consulta
 
 
 class SpecialtyCreate(SpecialtyBase):
@@ -15,6 +16,7 @@ class SpecialtyCreate(SpecialtyBase):
 class SpecialtyUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=3, max_length=100)
     description: Optional[str] = None
+    slot_duration: Optional[int] = Field(None, ge=5, le=240)
     active: Optional[bool] = None
 
 
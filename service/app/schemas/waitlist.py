@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date, datetime
+
+
+class WaitlistCreate(BaseModel):
+    hospital_id: int = Field(..., description="Hospital ID")
+    specialty_id: int = Field(..., description="Specialty ID")
+    date_from: date = Field(..., description="First acceptable date (YYYY-MM-DD)")
+    date_to: date = Field(..., description="Last acceptable date, inclusive (YYYY-MM-DD)")
+    shift: Optional[str] = Field(None, description="Optional: morning or afternoon (any shift by default)")
+
+
+class WaitlistResponse(WaitlistCreate):
+    id: int
+    patient_id: int
+    status: str
+    appointment_id: Optional[int]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -5,6 +5,12 @@ from app.services.hospital_service import HospitalService
 from app.services.consultation_room_service import ConsultationRoomService
 from app.services.slot_service import SlotService
 from app.services.appointment_service import AppointmentService
+from app.services.booking_service import BookingService
+from app.services.patient_import_service import PatientImportService
+from app.services.slot_inventory_service import SlotInventoryService
+from app.services.schedule_service import ScheduleService
+from app.services.closure_service import ClosureService
+from app.services.waitlist_service import WaitlistService
 
 __all__ = [
     "AuthService",
@@ -14,4 +20,10 @@ __all__ = [
     "ConsultationRoomService",
     "SlotService",
     "AppointmentService",
+    "BookingService",
+    "PatientImportService",
+    "SlotInventoryService",
+    "ScheduleService",
+    "ClosureService",
+    "WaitlistService",
 ]
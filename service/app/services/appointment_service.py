@@ -1,18 +1,69 @@
-from typing import List
-from datetime import date, datetime, timedelta
+import csv
+import io
+import json
+from typing import List, Iterator, Optional
+from datetime import date, datetime
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.appointment import Appointment, AppointmentStatus, ShiftType
+from app.models.appointment import Appointment, AppointmentStatus, ShiftType, ACTIVE_STATUSES
 from app.models.patient import Patient
-from app.schemas.appointment import AppointmentCreate, AppointmentUpdate
+from app.models.specialty import Specialty
+from app.models.consultation_room import ConsultationRoom
+from app.models.slot_inventory import SlotInventory
+from app.models.closure import Closure, ClosureScope
+from app.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentAutoCreate,
+    AppointmentUpdate,
+    AppointmentReschedule,
+    AppointmentBulkCancel,
+    AppointmentBulkCancelResponse,
+    CancelledAppointment,
+    PatientContact
+)
 from app.repositories.appointment_repository import AppointmentRepository
 from app.repositories.specialty_repository import SpecialtyRepository
 from app.repositories.consultation_room_repository import ConsultationRoomRepository
 from app.repositories.hospital_repository import HospitalRepository
+from app.repositories.patient_repository import PatientRepository
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
+from app.repositories.closure_repository import ClosureRepository
 from app.services.slot_service import SlotService
+from app.services.closure_service import ClosureService
+from app.core.config import settings
+from app.core.events import FreedSlot, slot_events
+from app.core.fieldsets import FieldSelection
+from app.core.tracing import traced
 
 
+# Columnas del export, en el orden en que se escriben
+EXPORT_COLUMNS = [
+    "id",
+    "appointment_date",
+    "start_time",
+    "end_time",
+    "shift",
+    "status",
+    "hospital_name",
+    "specialty_name",
+    "room_number",
+    "room_name",
+    "patient_document_number",
+    "patient_last_name",
+    "patient_first_name",
+    "reason",
+    "created_at",
+]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Motivo de los cierres creados por una cancelación masiva sin observaciones
+BULK_CANCEL_REASON = "Bulk cancellation"
+
+
+@traced
 class AppointmentService:
     """Service for appointment business logic"""
     
@@ -22,6 +73,9 @@ class AppointmentService:
         self.specialty_repo = SpecialtyRepository(db)
         self.room_repo = ConsultationRoomRepository(db)
         self.hospital_repo = HospitalRepository(db)
+        self.patient_repo = PatientRepository(db)
+        self.inventory_repo = SlotInventoryRepository(db)
+        self.closure_repo = ClosureRepository(db)
         self.slot_service = SlotService(db)
     
     def book_appointment(
@@ -39,48 +93,41 @@ class AppointmentService:
                 detail="Specialty not found"
             )
         
-        # Validate consultation room exists and is assigned to specialty
-        consultation_room = self.room_repo.get_by_id_with_specialties(appointment_data.consultation_room_id)
-        if not consultation_room or not consultation_room.active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Consultation room not found"
-            )
+        self._validate_room(specialty, appointment_data.consultation_room_id, appointment_data.appointment_date)
         
-        # Verify room is assigned to this specialty
-        if specialty not in consultation_room.specialties:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This consultation room is not assigned to the selected specialty"
+        # Validate slot availability
+        inventory_slot = None
+        if settings.SLOT_INVENTORY_ENABLED and self.inventory_repo.has_slots(
+            appointment_data.specialty_id,
+            appointment_data.appointment_date,
+            appointment_data.consultation_room_id
+        ):
+            # Día materializado: bloquear la fila del slot (SKIP LOCKED)
+            inventory_slot = self.slot_service.claim_inventory_slot(
+                specialty_id=appointment_data.specialty_id,
+                appointment_date=appointment_data.appointment_date,
+                start_time=appointment_data.start_time,
+                shift=appointment_data.shift,
+                consultation_room_id=appointment_data.consultation_room_id
             )
-        
-        # Verify hospital offers this specialty
-        hospital = consultation_room.hospital
-        if not self.hospital_repo.has_specialty(hospital.id, specialty.id):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Hospital '{hospital.name}' does not offer the specialty '{specialty.name}'"
+            is_available = inventory_slot is not None
+        else:
+            is_available = self.slot_service.validate_slot_availability(
+                specialty=specialty,
+                appointment_date=appointment_data.appointment_date,
+                start_time=appointment_data.start_time,
+                shift=appointment_data.shift,
+                consultation_room_id=appointment_data.consultation_room_id
             )
         
-        # Validate slot availability
-        is_available = self.slot_service.validate_slot_availability(
-            specialty_id=appointment_data.specialty_id,
-            appointment_date=appointment_data.appointment_date,
-            start_time=appointment_data.start_time,
-            shift=appointment_data.shift,
-            consultation_room_id=appointment_data.consultation_room_id
-        )
-        
         if not is_available:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="This time slot is not available"
             )
         
-        # Calculate end time (20 minutes after start)
-        start_datetime = datetime.combine(date.today(), appointment_data.start_time)
-        end_datetime = start_datetime + timedelta(minutes=20)
-        end_time = end_datetime.time()
+        # Calculate end time (slot duration of the specialty)
+        end_time = self.slot_service.slot_end_time(appointment_data.start_time, specialty.slot_duration)
         
         # Validate shift
         try:
@@ -104,29 +151,189 @@ class AppointmentService:
             status=AppointmentStatus.CONFIRMED
         )
         
-        return self.appointment_repo.create(new_appointment)
+        # La cita y la fila del inventario se confirman en el mismo commit
+        return self._create(new_appointment, inventory_slot)
+    
+    def book_any_room(
+        self,
+        appointment_data: AppointmentAutoCreate,
+        current_patient: Patient
+    ) -> Appointment:
+        """Book a slot in the first free consultation room of the hospital"""
+        
+        # Check if specialty exists
+        specialty = self.specialty_repo.get_by_id(appointment_data.specialty_id)
+        if not specialty or not specialty.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Specialty not found"
+            )
+        
+        hospital = self.hospital_repo.get_by_id(appointment_data.hospital_id)
+        if not hospital or not hospital.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Hospital not found"
+            )
+        
+        # Verify hospital offers this specialty
+        if not self.hospital_repo.has_specialty(hospital.id, specialty.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Hospital '{hospital.name}' does not offer the specialty '{specialty.name}'"
+            )
+        
+        # Fecha, hora y turno válidos
+        shift_enum = self.slot_service.get_bookable_shift(
+            appointment_data.appointment_date,
+            appointment_data.start_time,
+            appointment_data.shift
+        )
+        if shift_enum is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is not available"
+            )
+        
+        # Consultorios cuyo horario ofrece un slot que empieza a esa hora
+        room_ids = [
+            room.id
+            for room in self.room_repo.get_by_hospital_and_specialty(hospital.id, specialty.id)
+            if self.slot_service.is_scheduled_slot(
+                room, appointment_data.appointment_date, shift_enum, appointment_data.start_time, specialty.slot_duration
+            )
+        ]
+        if not room_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is not available"
+            )
+        
+        end_time = self.slot_service.slot_end_time(appointment_data.start_time, specialty.slot_duration)
+        
+        now = datetime.utcnow()
+        values = {
+            "patient_id": current_patient.id,
+            "specialty_id": specialty.id,
+            "appointment_date": appointment_data.appointment_date,
+            "start_time": appointment_data.start_time,
+            "end_time": end_time,
+            "shift": shift_enum.value,
+            "reason": appointment_data.reason,
+            "status": AppointmentStatus.CONFIRMED.value,
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        inventory_room_ids = set()
+        if settings.SLOT_INVENTORY_ENABLED:
+            inventory_room_ids = self.inventory_repo.get_materialized_room_ids(
+                specialty.id, appointment_data.appointment_date, room_ids
+            )
+        
+        if inventory_room_ids:
+            # Consultorios materializados: bloquear la primera fila libre entre ellos
+            inventory_slot = self.inventory_repo.claim_any_room(
+                specialty.id,
+                sorted(inventory_room_ids),
+                appointment_data.appointment_date,
+                appointment_data.start_time,
+                shift_enum.value
+            )
+            if inventory_slot is not None:
+                new_appointment = Appointment(consultation_room_id=inventory_slot.consultation_room_id, **values)
+                return self._create(new_appointment, inventory_slot)
+        
+        # Resto de consultorios: cálculo dinámico
+        dynamic_room_ids = [room_id for room_id in room_ids if room_id not in inventory_room_ids]
+        appointment = None
+        if dynamic_room_ids:
+            appointment = self.appointment_repo.insert_in_first_free_room(values, dynamic_room_ids)
+        if appointment is None:
+            self._raise_no_room_available()
+        return appointment
+    
+    def _validate_room(self, specialty: Specialty, consultation_room_id: int, appointment_date: date) -> ConsultationRoom:
+        """Room exists, serves the specialty in a hospital that offers it and is open that day"""
+        
+        # Validate consultation room exists and is assigned to specialty
+        consultation_room = self.room_repo.get_by_id_with_specialties(consultation_room_id)
+        if not consultation_room or not consultation_room.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consultation room not found"
+            )
+        
+        # Verify room is assigned to this specialty
+        if specialty not in consultation_room.specialties:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This consultation room is not assigned to the selected specialty"
+            )
+        
+        # Verify hospital offers this specialty
+        hospital = consultation_room.hospital
+        if not self.hospital_repo.has_specialty(hospital.id, specialty.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Hospital '{hospital.name}' does not offer the specialty '{specialty.name}'"
+            )
+        
+        # Holidays, hospital closures and room maintenance
+        if self.slot_service.is_room_closed(consultation_room, appointment_date):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The consultation room is closed on this date"
+            )
+        
+        return consultation_room
+    
+    def _create(self, appointment: Appointment, inventory_slot: Optional[SlotInventory] = None) -> Appointment:
+        """
+        Insert an appointment (and book its claimed inventory row); a concurrent
+        booking that overlaps it in the same room becomes a 400
+        """
+        try:
+            if inventory_slot is not None:
+                self.inventory_repo.assign(inventory_slot, appointment)
+            return self.appointment_repo.create(appointment)
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is not available"
+            )
+    
+    def _raise_no_room_available(self) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No consultation room available for this time slot"
+        )
     
     def get_my_appointments(
         self, 
         current_patient: Patient, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
     ) -> List[Appointment]:
         """Get all appointments for current patient"""
-        return self.appointment_repo.get_by_patient(current_patient.id, skip, limit)
+        return self.appointment_repo.get_by_patient(current_patient.id, skip, limit, fields)
     
     def get_upcoming_appointments(
         self, 
         current_patient: Patient, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
     ) -> List[Appointment]:
         """Get upcoming appointments for current patient"""
         return self.appointment_repo.get_upcoming_by_patient(
             current_patient.id, 
             date.today(),
             skip, 
-            limit
+            limit,
+            fields
         )
     
     def get_appointment_by_id(
@@ -161,22 +368,36 @@ class AppointmentService:
         """Update appointment status or observations"""
         
         appointment = self.get_appointment_by_id(appointment_id, current_patient)
+        freed = False
         
         # Update fields if provided
         if appointment_update.status:
             try:
                 status_enum = AppointmentStatus(appointment_update.status)
-                appointment.status = status_enum
             except ValueError:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid status. Must be: pending, confirmed, rescheduled, cancelled, completed"
                 )
+            # Reactivar saltaría la validación y el inventario del slot (que otro pudo tomar)
+            if status_enum.value in ACTIVE_STATUSES and appointment.status not in ACTIVE_STATUSES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"A {AppointmentStatus(appointment.status).value} appointment cannot be reactivated; book a new appointment"
+                )
+            freed = status_enum == AppointmentStatus.CANCELLED and appointment.status in ACTIVE_STATUSES
+            appointment.status = status_enum
+            
+            if status_enum == AppointmentStatus.CANCELLED and settings.SLOT_INVENTORY_ENABLED:
+                self.inventory_repo.release(appointment)
         
         if appointment_update.observations is not None:
             appointment.observations = appointment_update.observations
         
-        return self.appointment_repo.update(appointment)
+        appointment = self.appointment_repo.update(appointment)
+        if freed:
+            self._publish_freed(appointment)
+        return appointment
     
     def cancel_appointment(
         self, 
@@ -195,6 +416,312 @@ class AppointmentService:
             )
         
         # Change status to cancelled (slot automatically becomes available)
+        if settings.SLOT_INVENTORY_ENABLED:
+            self.inventory_repo.release(appointment)
         self.appointment_repo.cancel(appointment)
+        self._publish_freed(appointment)
         
         return {"message": "Appointment cancelled successfully"}
+    
+    def reschedule_appointment(
+        self,
+        appointment_id: int,
+        reschedule: AppointmentReschedule,
+        current_patient: Patient
+    ) -> Appointment:
+        """
+        Move an active appointment to another slot in one transaction: the old
+        slot is released and the new one claimed, so the patient never holds
+        both or neither. Conflicts are detected like in booking (inventory row
+        lock or overlap check, backed by the table constraints).
+        """
+        appointment = self.get_appointment_by_id(appointment_id, current_patient)
+        
+        if appointment.status not in ACTIVE_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only pending or confirmed or rescheduled appointments can be rescheduled"
+            )
+        
+        room_id = reschedule.consultation_room_id or appointment.consultation_room_id
+        if (room_id, reschedule.appointment_date, reschedule.start_time) == (
+            appointment.consultation_room_id, appointment.appointment_date, appointment.start_time
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The appointment is already in this time slot"
+            )
+        
+        specialty = appointment.specialty
+        self._validate_room(specialty, room_id, reschedule.appointment_date)
+        
+        shift_enum = self.slot_service.get_bookable_shift(
+            reschedule.appointment_date,
+            reschedule.start_time,
+            reschedule.shift
+        )
+        if shift_enum is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is not available"
+            )
+        
+        freed = FreedSlot(
+            appointment.consultation_room_id,
+            appointment.appointment_date,
+            appointment.start_time,
+            appointment.end_time,
+            ShiftType(appointment.shift).value
+        )
+        
+        try:
+            # Liberar primero: el slot nuevo puede solaparse con el anterior
+            inventory_slot = None
+            if settings.SLOT_INVENTORY_ENABLED:
+                self.inventory_repo.release(appointment)
+            
+            if settings.SLOT_INVENTORY_ENABLED and self.inventory_repo.has_slots(
+                specialty.id, reschedule.appointment_date, room_id
+            ):
+                inventory_slot = self.inventory_repo.claim(
+                    specialty.id,
+                    room_id,
+                    reschedule.appointment_date,
+                    reschedule.start_time,
+                    shift_enum.value
+                )
+                is_available = inventory_slot is not None
+            else:
+                is_available = self.slot_service.validate_slot_availability(
+                    specialty=specialty,
+                    appointment_date=reschedule.appointment_date,
+                    start_time=reschedule.start_time,
+                    shift=shift_enum.value,
+                    consultation_room_id=room_id,
+                    exclude_appointment_id=appointment.id
+                )
+            
+            if not is_available:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="This time slot is not available"
+                )
+            
+            appointment.consultation_room_id = room_id
+            appointment.appointment_date = reschedule.appointment_date
+            appointment.start_time = reschedule.start_time
+            appointment.end_time = self.slot_service.slot_end_time(reschedule.start_time, specialty.slot_duration)
+            appointment.shift = shift_enum.value
+            appointment.status = AppointmentStatus.RESCHEDULED.value
+            
+            if inventory_slot is not None:
+                self.inventory_repo.assign(inventory_slot, appointment)
+            appointment = self.appointment_repo.update(appointment)
+        except IntegrityError:
+            # Otra reserva tomó el slot nuevo (restricciones de la tabla)
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This time slot is not available"
+            )
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        self._publish_freed_slot(freed)
+        return appointment
+    
+    def _publish_freed(self, appointment: Appointment) -> None:
+        self._publish_freed_slot(FreedSlot(
+            appointment.consultation_room_id,
+            appointment.appointment_date,
+            appointment.start_time,
+            appointment.end_time,
+            ShiftType(appointment.shift).value
+        ))
+    
+    def _publish_freed_slot(self, slot: FreedSlot) -> None:
+        # Tras el commit: la lista de espera lo procesa fuera de la petición
+        slot_events.publish(slot)
+    
+    def cancel_in_bulk(self, bulk: AppointmentBulkCancel) -> AppointmentBulkCancelResponse:
+        """
+        Close a room (or hospital, or the rooms of a specialty in a hospital)
+        for a date range and cancel its active appointments in one
+        transaction: the closures, a single UPDATE ... RETURNING and two
+        set-based UPDATEs of the slot inventory. The closures keep the freed
+        slots from being offered or booked again. Returns the cancelled
+        appointments and the contact of each affected patient.
+        """
+        if (bulk.consultation_room_id is None) == (bulk.hospital_id is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide either consultation_room_id or hospital_id"
+            )
+        
+        if bulk.date_from > bulk.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be before or equal to date_to"
+            )
+        
+        if bulk.date_from < date.today():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date cannot be in the past"
+            )
+        
+        if bulk.consultation_room_id is not None and not self.room_repo.get_by_id(bulk.consultation_room_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consultation room not found"
+            )
+        
+        if bulk.hospital_id is not None and not self.hospital_repo.get_by_id(bulk.hospital_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Hospital with ID {bulk.hospital_id} not found"
+            )
+        
+        # Los cierres son por consultorio u hospital: con especialidad se cierran
+        # sus consultorios (también para las otras especialidades que los comparten)
+        room_ids = None
+        if bulk.consultation_room_id is not None:
+            room_ids = [bulk.consultation_room_id]
+        elif bulk.specialty_id is not None:
+            room_ids = [
+                room.id for room in
+                self.room_repo.get_by_hospital_and_specialty(bulk.hospital_id, bulk.specialty_id, active_only=False)
+            ]
+            if not room_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="The hospital has no consultation rooms for this specialty"
+                )
+        
+        reason = (bulk.observations or BULK_CANCEL_REASON)[:255]
+        if room_ids is None:
+            closures = [Closure(
+                scope=ClosureScope.HOSPITAL.value, hospital_id=bulk.hospital_id,
+                start_date=bulk.date_from, end_date=bulk.date_to, reason=reason
+            )]
+        else:
+            closures = [
+                Closure(
+                    scope=ClosureScope.ROOM.value, consultation_room_id=room_id,
+                    start_date=bulk.date_from, end_date=bulk.date_to, reason=reason
+                )
+                for room_id in room_ids
+            ]
+        
+        try:
+            for closure in closures:
+                self.closure_repo.add(closure)
+            rows = self.appointment_repo.cancel_matching(
+                bulk.date_from,
+                bulk.date_to,
+                consultation_room_ids=room_ids,
+                hospital_id=bulk.hospital_id if room_ids is None else None,
+                observations=bulk.observations
+            )
+            if rows and settings.SLOT_INVENTORY_ENABLED:
+                self.inventory_repo.release_cancelled(
+                    sorted({row.consultation_room_id for row in rows}),
+                    bulk.date_from,
+                    bulk.date_to
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        # Este worker deja de ofrecer esos días ya; los demás al refrescar el calendario
+        ClosureService(self.db).reload_calendar()
+        
+        # Sin eventos para la lista de espera: el consultorio deja de atender esos días
+        # Un contacto por paciente, aunque tenga varias citas canceladas
+        contacts = self.patient_repo.get_contacts(sorted({row.patient_id for row in rows}))
+        rows.sort(key=lambda row: (row.appointment_date, row.start_time, row.id))
+        return AppointmentBulkCancelResponse(
+            cancelled=len(rows),
+            appointments=[CancelledAppointment(**row._mapping) for row in rows],
+            patients=[PatientContact(**contact._mapping) for contact in contacts],
+            closure_ids=[closure.id for closure in closures]
+        )
+    
+    def export_appointments(
+        self,
+        hospital_id: int,
+        date_from: date,
+        date_to: date,
+        export_format: str = "ndjson"
+    ) -> Iterator[str]:
+        """
+        Export appointments of a hospital in a date range as NDJSON or CSV.
+        
+        Validation runs eagerly so errors surface before the response starts;
+        the returned iterator streams one chunk per fetched batch.
+        """
+        export_format = export_format.lower()
+        if export_format not in EXPORT_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid format. Must be 'ndjson' or 'csv'"
+            )
+        
+        if date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be before or equal to date_to"
+            )
+        
+        if not self.hospital_repo.get_by_id(hospital_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Hospital with ID {hospital_id} not found"
+            )
+        
+        batches = self.appointment_repo.stream_for_export(
+            hospital_id,
+            date_from,
+            date_to,
+            batch_size=settings.EXPORT_BATCH_SIZE
+        )
+        
+        if export_format == "csv":
+            return self._export_csv(batches)
+        return self._export_ndjson(batches)
+    
+    @staticmethod
+    def _export_value(value):
+        """Convierte fechas y horas a ISO 8601 para el export"""
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+    
+    def _export_ndjson(self, batches) -> Iterator[str]:
+        """Una línea JSON por cita"""
+        for batch in batches:
+            yield "".join(
+                json.dumps(
+                    {column: self._export_value(row._mapping[column]) for column in EXPORT_COLUMNS},
+                    ensure_ascii=False
+                ) + "\n"
+                for row in batch
+            )
+    
+    def _export_csv(self, batches) -> Iterator[str]:
+        """CSV con cabecera; un chunk por batch"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        
+        for batch in batches:
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(
+                [self._export_value(row._mapping[column]) for column in EXPORT_COLUMNS]
+                for row in batch
+            )
+            yield buffer.getvalue()
@@ -1,15 +1,33 @@
 from typing import Optional
 from datetime import timedelta
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.patient import Patient
 from app.schemas.patient import PatientCreate, PatientLogin, Token
 from app.repositories.patient_repository import PatientRepository
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_token
+from app.core.security import verify_password, get_password_hash, create_access_token, decode_token, password_needs_rehash
 from app.core.config import settings
+from app.core.rate_limit import get_login_throttle
+from app.core.tracing import traced
+from app.database.base import SessionLocal
 
 
+def rehash_patient_password(patient_id: int, password: str, current_hash: str) -> None:
+    """
+    Rehash a password with the configured bcrypt cost (background task).
+    Skips the update if the hash changed meanwhile (e.g. password change).
+    """
+    new_hash = get_password_hash(password)
+    db = SessionLocal()
+    try:
+        PatientRepository(db).replace_password_hash(patient_id, current_hash, new_hash)
+    finally:
+        db.close()
+
+
+@traced
 class AuthService:
     """Service for authentication logic"""
     
@@ -18,44 +36,65 @@ class AuthService:
         self.patient_repo = PatientRepository(db)
     
     def register_patient(self, patient_data: PatientCreate) -> Patient:
-        """Register a new patient"""
+        """
+        Register a new patient.
+        Duplicates are rejected before hashing; the unique constraints cover
+        concurrent registrations that slip past the check.
+        """
+        
+        # Una sola consulta por documento o email, antes del hash de bcrypt
+        document_taken, email_taken = self.patient_repo.find_registration_conflicts(
+            patient_data.document_number, patient_data.email
+        )
+        self._raise_if_taken(document_taken, email_taken)
+        
+        password_hash = get_password_hash(patient_data.password)
         
-        # Check if document number already exists
-        existing_patient = self.patient_repo.get_by_document_number(patient_data.document_number)
-        if existing_patient:
+        try:
+            return self.patient_repo.insert_returning({
+                "document_number": patient_data.document_number,
+                "last_name": patient_data.last_name,
+                "first_name": patient_data.first_name,
+                "birth_date": patient_data.birth_date,
+                "gender": patient_data.gender,
+                "address": patient_data.address,
+                "phone": patient_data.phone,
+                "email": patient_data.email,
+                "password_hash": password_hash,
+            })
+        except IntegrityError as exc:
+            self.db.rollback()
+            message = str(exc.orig).lower()
+            self._raise_if_taken("document_number" in message, "email" in message)
+            raise
+    
+    def _raise_if_taken(self, document_taken: bool, email_taken: bool) -> None:
+        if document_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Document number already registered"
             )
-        
-        # Check if email already exists (if provided)
-        if patient_data.email:
-            existing_email = self.patient_repo.get_by_email(patient_data.email)
-            if existing_email:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-        
-        # Create new patient
-        password_hash = get_password_hash(patient_data.password)
-        
-        new_patient = Patient(
-            document_number=patient_data.document_number,
-            last_name=patient_data.last_name,
-            first_name=patient_data.first_name,
-            birth_date=patient_data.birth_date,
-            gender=patient_data.gender,
-            address=patient_data.address,
-            phone=patient_data.phone,
-            email=patient_data.email,
-            password_hash=password_hash
-        )
-        
-        return self.patient_repo.create(new_patient)
+        if email_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
     
-    def login(self, credentials: PatientLogin) -> Token:
-        """Authenticate patient and return JWT token"""
+    def login(
+        self,
+        credentials: PatientLogin,
+        client_ip: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Token:
+        """
+        Authenticate patient and return JWT token.
+        Hashes with an outdated bcrypt cost are upgraded after the response.
+        """
+        
+        # Throttling antes de cualquier consulta o hash
+        throttle = get_login_throttle()
+        if throttle is not None:
+            throttle.check(credentials.document_number, client_ip)
         
         # Find patient by document number
         patient = self.patient_repo.get_by_document_number(credentials.document_number)
@@ -82,6 +121,12 @@ class AuthService:
                 detail="Inactive patient"
             )
         
+        # Rehash fuera del request si el costo de bcrypt cambió
+        if background_tasks is not None and password_needs_rehash(patient.password_hash):
+            background_tasks.add_task(
+                rehash_patient_password, patient.id, credentials.password, patient.password_hash
+            )
+        
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -0,0 +1,86 @@
+"""
+Booking Service
+Composite reads for the booking flow
+"""
+from typing import Optional
+from datetime import date
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.hospital_repository import HospitalRepository
+from app.repositories.specialty_repository import SpecialtyRepository
+from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.services.hospital_service import HospitalService
+from app.services.slot_service import SlotService
+from app.schemas.booking import BookingBootstrapResponse
+from app.schemas.specialty import SpecialtyWithRoomCount
+from app.core.tracing import traced
+
+
+@traced
+class BookingService:
+    """Service for the booking flow screens"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.hospital_repo = HospitalRepository(db)
+        self.hospital_service = HospitalService(self.hospital_repo, SpecialtyRepository(db))
+        self.room_repo = ConsultationRoomRepository(db)
+        self.slot_service = SlotService(db)
+    
+    def get_bootstrap(
+        self,
+        hospital_id: int,
+        specialty_id: Optional[int] = None
+    ) -> BookingBootstrapResponse:
+        """
+        Build the first booking screen for a hospital.
+        
+        Replaces the chained GET /hospitals/{id}, GET /hospitals/{id}/specialties
+        and GET /slots/available calls:
+        - Hospital details
+        - Its specialties with room counts (one grouped query)
+        - If a specialty is selected, the first day with free slots
+          (one query for rooms, one for occupied slots of the whole window)
+        """
+        hospital = self.hospital_service.get_hospital_by_id(hospital_id)
+        if not hospital.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Hospital with ID {hospital_id} not found"
+            )
+        
+        # El hospital ya se validó: sin volver a consultarlo
+        specialties = self.hospital_repo.get_specialties_with_room_count(hospital_id)
+        response = BookingBootstrapResponse(
+            hospital=hospital,
+            specialties=[
+                SpecialtyWithRoomCount(**specialty.__dict__, available_rooms=room_count)
+                for specialty, room_count in specialties
+            ],
+            selected_specialty_id=specialty_id
+        )
+        
+        if specialty_id is None:
+            return response
+        
+        # La especialidad debe ser ofrecida por el hospital (reutiliza la consulta anterior)
+        specialty = next((s for s, _ in specialties if s.id == specialty_id), None)
+        if specialty is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Hospital '{hospital.name}' does not offer the specialty {specialty_id}"
+            )
+        
+        rooms = self.room_repo.get_by_hospital_and_specialty(hospital_id, specialty_id)
+        first_date, availability = self.slot_service.find_first_available_day(
+            specialty,
+            rooms,
+            date.today(),
+            settings.BOOKING_SEARCH_DAYS
+        )
+        
+        response.first_available_date = first_date
+        response.availability = availability
+        return response
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.closure import Closure, ClosureScope
+from app.repositories.closure_repository import ClosureRepository
+from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.repositories.hospital_repository import HospitalRepository
+from app.schemas.closure import ClosureCreate
+from app.database.base import SessionLocal
+from app.core.config import settings
+from app.core.health import register_cache
+from app.core.metrics import record_cache_access
+from app.core.tracing import traced
+
+logger = logging.getLogger("neumoapp.closures")
+
+
+class ClosureCalendar:
+    """
+    Closed days precomputed into per-date sets up to CLOSURE_CALENDAR_HORIZON_DAYS
+    ahead, so a lookup is a set membership test. Immutable: a reload builds a
+    new calendar and swaps it in.
+    """
+
+    __slots__ = ("fingerprint", "loaded_on", "horizon", "global_days", "hospitals", "rooms", "_beyond_horizon")
+
+    def __init__(self, fingerprint: Tuple[int, int], closures: List[Closure], loaded_on: date, horizon_days: int):
+        self.fingerprint = fingerprint
+        self.loaded_on = loaded_on
+        self.horizon = loaded_on + timedelta(days=horizon_days)
+
+        global_days: Set[date] = set()
+        hospitals: Dict[date, Set[int]] = {}
+        rooms: Dict[date, Set[int]] = {}
+        # Cierres que pasan el horizonte: se revisan uno por uno (son pocos)
+        self._beyond_horizon = tuple(closure_key(c) for c in closures if c.end_date > self.horizon)
+
+        for closure in closures:
+            day = max(closure.start_date, loaded_on)
+            last = min(closure.end_date, self.horizon)
+            while day <= last:
+                if closure.scope == ClosureScope.GLOBAL.value:
+                    global_days.add(day)
+                elif closure.scope == ClosureScope.HOSPITAL.value:
+                    hospitals.setdefault(day, set()).add(closure.hospital_id)
+                else:
+                    rooms.setdefault(day, set()).add(closure.consultation_room_id)
+                day += timedelta(days=1)
+
+        self.global_days: FrozenSet[date] = frozenset(global_days)
+        self.hospitals: Dict[date, FrozenSet[int]] = {day: frozenset(ids) for day, ids in hospitals.items()}
+        self.rooms: Dict[date, FrozenSet[int]] = {day: frozenset(ids) for day, ids in rooms.items()}
+
+    def is_closed(self, day: date, hospital_id: int, room_id: int) -> bool:
+        """Whether a room takes no appointments on a day (holiday, hospital closure or maintenance)"""
+        if day > self.horizon:
+            return any(
+                start <= day <= end and (
+                    scope == ClosureScope.GLOBAL.value
+                    or (scope == ClosureScope.HOSPITAL.value and closed_id == hospital_id)
+                    or (scope == ClosureScope.ROOM.value and closed_id == room_id)
+                )
+                for scope, closed_id, start, end in self._beyond_horizon
+            )
+        return (
+            day in self.global_days
+            or hospital_id in self.hospitals.get(day, ())
+            or room_id in self.rooms.get(day, ())
+        )
+
+
+def closure_key(closure: Closure) -> Tuple[str, Optional[int], date, date]:
+    closed_id = closure.hospital_id if closure.scope == ClosureScope.HOSPITAL.value else closure.consultation_room_id
+    return closure.scope, closed_id, closure.start_date, closure.end_date
+
+
+# Calendario vigente del worker (se reemplaza completo al recargar)
+_calendar: Optional[ClosureCalendar] = None
+
+register_cache("closures", lambda: _calendar is not None)
+
+
+@traced
+class ClosureService:
+    """Service for holidays, hospital closures and room maintenance windows"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.closure_repo = ClosureRepository(db)
+        self.hospital_repo = HospitalRepository(db)
+        self.room_repo = ConsultationRoomRepository(db)
+
+    def get_calendar(self) -> ClosureCalendar:
+        """In-memory calendar; only queries on first use and when the day changes"""
+        calendar = _calendar
+        hit = calendar is not None and calendar.loaded_on == date.today()
+        record_cache_access("closures", hit)
+        return calendar if hit else self.reload_calendar()
+
+    def reload_calendar(self) -> ClosureCalendar:
+        """Rebuild the calendar from the closures table"""
+        global _calendar
+        today = date.today()
+        _calendar = ClosureCalendar(
+            self.closure_repo.get_fingerprint(),
+            self.closure_repo.get_active(today),
+            today,
+            settings.CLOSURE_CALENDAR_HORIZON_DAYS
+        )
+        return _calendar
+
+    def refresh_if_changed(self) -> bool:
+        """Reload when closures were created or deleted (e.g. by another worker)"""
+        calendar = _calendar
+        if calendar is not None and calendar.loaded_on == date.today() \
+                and calendar.fingerprint == self.closure_repo.get_fingerprint():
+            return False
+        self.reload_calendar()
+        return True
+
+    def list_closures(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[Closure]:
+        """Closures overlapping a date range (from today on by default)"""
+        date_from = date_from or date.today()
+        if date_to is None:
+            return self.closure_repo.get_active(date_from)
+        if date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be before or equal to date_to"
+            )
+        return self.closure_repo.get_in_range(date_from, date_to)
+
+    def create_closure(self, closure_data: ClosureCreate) -> Closure:
+        """Create a closure and refresh the calendar"""
+        try:
+            scope = ClosureScope(closure_data.scope.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid scope. Must be 'global', 'hospital' or 'room'"
+            )
+
+        if closure_data.start_date > closure_data.end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_date must be before or equal to end_date"
+            )
+
+        hospital_id = None
+        room_id = None
+        if scope == ClosureScope.HOSPITAL:
+            hospital = self.hospital_repo.get_by_id(closure_data.hospital_id) if closure_data.hospital_id else None
+            if not hospital:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Hospital not found"
+                )
+            hospital_id = hospital.id
+        elif scope == ClosureScope.ROOM:
+            room = self.room_repo.get_by_id(closure_data.consultation_room_id) if closure_data.consultation_room_id else None
+            if not room:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Consultation room not found"
+                )
+            room_id = room.id
+
+        closure = self.closure_repo.create(Closure(
+            scope=scope.value,
+            hospital_id=hospital_id,
+            consultation_room_id=room_id,
+            start_date=closure_data.start_date,
+            end_date=closure_data.end_date,
+            reason=closure_data.reason
+        ))
+        self.reload_calendar()
+        return closure
+
+    def delete_closure(self, closure_id: int) -> dict:
+        """Delete a closure and refresh the calendar"""
+        closure = self.closure_repo.get_by_id(closure_id)
+        if not closure:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Closure not found"
+            )
+        self.closure_repo.delete(closure)
+        self.reload_calendar()
+        return {"message": "Closure deleted successfully"}
+
+
+def refresh_closure_calendar() -> bool:
+    """Check for closure changes with its own session"""
+    db = SessionLocal()
+    try:
+        return ClosureService(db).refresh_if_changed()
+    finally:
+        db.close()
+
+
+class ClosureCalendarRefresher:
+    """Picks up closures changed by other workers (every CLOSURE_CALENDAR_REFRESH_SECONDS)"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # Fuera del event loop: son consultas bloqueantes
+                if await loop.run_in_executor(None, refresh_closure_calendar):
+                    logger.info("Closure calendar reloaded")
+            except Exception:
+                logger.exception("Closure calendar refresh failed")
+            if interval <= 0:
+                # Solo la carga inicial; después se recarga al cambiar en este worker
+                return
+            await asyncio.sleep(interval)
+
+
+closure_calendar_refresher = ClosureCalendarRefresher()
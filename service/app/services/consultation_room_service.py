@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -7,8 +7,11 @@ from app.models.specialty import Specialty
 from app.schemas.consultation_room import ConsultationRoomCreate, ConsultationRoomUpdate
 from app.repositories.consultation_room_repository import ConsultationRoomRepository
 from app.repositories.specialty_repository import SpecialtyRepository
+from app.core.fieldsets import FieldSelection
+from app.core.tracing import traced
 
 
+@traced
 class ConsultationRoomService:
     """Service for consultation room business logic"""
     
@@ -17,9 +20,14 @@ class ConsultationRoomService:
         self.room_repo = ConsultationRoomRepository(db)
         self.specialty_repo = SpecialtyRepository(db)
     
-    def get_all_rooms(self, skip: int = 0, limit: int = 100) -> List[ConsultationRoom]:
+    def get_all_rooms(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
+    ) -> List[ConsultationRoom]:
         """Get all active consultation rooms"""
-        return self.room_repo.get_active(skip, limit)
+        return self.room_repo.get_active(skip, limit, fields)
     
     def get_room_by_id(self, room_id: int) -> ConsultationRoom:
         """Get consultation room by ID"""
@@ -2,15 +2,18 @@
 Hospital Service
 Business logic for hospitals
 """
-from typing import List
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from app.repositories.hospital_repository import HospitalRepository
 from app.repositories.specialty_repository import SpecialtyRepository
 from app.models.hospital import Hospital
 from app.models.specialty import Specialty
 from app.schemas.hospital import HospitalCreate, HospitalUpdate
+from app.core.fieldsets import FieldSelection
+from app.core.tracing import traced
 
 
+@traced
 class HospitalService:
     """Service for Hospital business logic"""
     
@@ -18,9 +21,14 @@ class HospitalService:
         self.repository = repository
         self.specialty_repository = specialty_repository
     
-    def get_all_hospitals(self, skip: int = 0, limit: int = 100) -> List[Hospital]:
+    def get_all_hospitals(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[FieldSelection] = None
+    ) -> List[Hospital]:
         """Get all active hospitals"""
-        return self.repository.get_all(skip=skip, limit=limit, active_only=True)
+        return self.repository.get_all(skip=skip, limit=limit, active_only=True, fields=fields)
     
     def get_hospital_by_id(self, hospital_id: int) -> Hospital:
         """Get hospital by ID"""
@@ -102,6 +110,13 @@ class HospitalService:
         
         return self.repository.get_specialties(hospital_id, active_only=True)
     
+    def get_hospital_specialties_with_room_count(self, hospital_id: int) -> List[Tuple[Specialty, int]]:
+        """Get all specialties for a hospital with their active room count"""
+        # Verificar que el hospital existe
+        self.get_hospital_by_id(hospital_id)
+        
+        return self.repository.get_specialties_with_room_count(hospital_id)
+    
     def assign_specialty_to_hospital(self, hospital_id: int, specialty_id: int) -> dict:
         """Assign a specialty to a hospital"""
         # Verificar que el hospital existe
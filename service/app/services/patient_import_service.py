@@ -0,0 +1,163 @@
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.schemas.patient import PatientCreate
+from app.repositories.patient_repository import PatientRepository
+from app.core.security import get_password_hash
+
+# (número de línea, fila cruda)
+RawRow = Tuple[int, Dict]
+
+
+class ImportOutcome:
+    """Result of a rejected row"""
+
+    __slots__ = ("line", "document_number", "status", "detail")
+
+    def __init__(self, line: int, document_number: Optional[str], status: str, detail: str):
+        self.line = line
+        self.document_number = document_number
+        self.status = status  # invalid | conflict
+        self.detail = detail
+
+
+class ImportStats:
+    """Running totals of an import"""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.invalid = 0
+        self.conflicts = 0
+        self.rejected: List[ImportOutcome] = []
+
+    def reject(self, outcome: ImportOutcome) -> None:
+        if outcome.status == "invalid":
+            self.invalid += 1
+        else:
+            self.conflicts += 1
+        self.rejected.append(outcome)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class PatientImportService:
+    """
+    Bulk patient import: validate with PatientCreate, skip duplicates before
+    hashing, hash passwords in a process pool and insert in batches.
+    Hashing of the next batch overlaps with the insert of the current one.
+    """
+
+    def __init__(self, db: Session, executor: Executor, batch_size: int = 1000):
+        self.db = db
+        self.patient_repo = PatientRepository(db)
+        self.executor = executor
+        self.batch_size = batch_size
+
+    def import_rows(
+        self,
+        rows: Iterable[RawRow],
+        on_progress: Optional[Callable[[ImportStats], None]] = None
+    ) -> ImportStats:
+        stats = ImportStats()
+        pending = None  # (lote, futuro con los hashes)
+
+        for batch in self._validated_batches(rows, stats):
+            if not batch:
+                continue
+            hashes = self._submit_hashes(batch)
+            if pending is not None:
+                self._insert_batch(*pending, stats)
+                if on_progress:
+                    on_progress(stats)
+            pending = (batch, hashes)
+
+        if pending is not None:
+            self._insert_batch(*pending, stats)
+        if on_progress:
+            on_progress(stats)
+        return stats
+
+    def _validated_batches(self, rows: Iterable[RawRow], stats: ImportStats) -> Iterator[List[Tuple[int, PatientCreate]]]:
+        """Validate rows and drop in-file and database duplicates, in batches"""
+        seen_documents = set()
+        seen_emails = set()
+        batch: List[Tuple[int, PatientCreate]] = []
+
+        for line, raw in rows:
+            stats.processed += 1
+            if not isinstance(raw, dict):
+                stats.reject(ImportOutcome(line, None, "invalid", "Malformed row"))
+                continue
+            try:
+                patient = PatientCreate(**raw)
+            except ValidationError as exc:
+                stats.reject(ImportOutcome(line, raw.get("document_number"), "invalid", _validation_message(exc)))
+                continue
+
+            if patient.document_number in seen_documents:
+                stats.reject(ImportOutcome(line, patient.document_number, "conflict", "Duplicate document number in file"))
+                continue
+            if patient.email in seen_emails:
+                stats.reject(ImportOutcome(line, patient.document_number, "conflict", "Duplicate email in file"))
+                continue
+            seen_documents.add(patient.document_number)
+            seen_emails.add(patient.email)
+
+            batch.append((line, patient))
+            if len(batch) >= self.batch_size:
+                yield self._without_existing(batch, stats)
+                batch = []
+
+        if batch:
+            yield self._without_existing(batch, stats)
+
+    def _without_existing(self, batch: List[Tuple[int, PatientCreate]], stats: ImportStats) -> List[Tuple[int, PatientCreate]]:
+        """Reject rows already registered, so they never reach bcrypt"""
+        documents, emails = self.patient_repo.find_existing(
+            [patient.document_number for _, patient in batch],
+            [patient.email for _, patient in batch]
+        )
+        remaining = []
+        for line, patient in batch:
+            if patient.document_number in documents:
+                stats.reject(ImportOutcome(line, patient.document_number, "conflict", "Document number already registered"))
+            elif patient.email in emails:
+                stats.reject(ImportOutcome(line, patient.document_number, "conflict", "Email already registered"))
+            else:
+                remaining.append((line, patient))
+        return remaining
+
+    def _submit_hashes(self, batch: List[Tuple[int, PatientCreate]]):
+        workers = getattr(self.executor, "_max_workers", 1)
+        chunksize = max(1, len(batch) // (workers * 4))
+        return self.executor.map(get_password_hash, [patient.password for _, patient in batch], chunksize=chunksize)
+
+    def _insert_batch(self, batch: List[Tuple[int, PatientCreate]], hashes, stats: ImportStats) -> None:
+        now = datetime.utcnow()
+        values = [
+            {
+                **patient.model_dump(exclude={"password"}),
+                "password_hash": password_hash,
+                "active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (_, patient), password_hash in zip(batch, hashes)
+        ]
+        inserted = self.patient_repo.bulk_insert_ignoring_conflicts(values)
+        stats.inserted += len(inserted)
+
+        # Filas que chocaron con un registro concurrente
+        for line, patient in batch:
+            if patient.document_number not in inserted:
+                stats.reject(ImportOutcome(line, patient.document_number, "conflict", "Conflicts with an existing patient"))
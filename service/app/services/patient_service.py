@@ -4,8 +4,10 @@ from sqlalchemy.orm import Session
 
 from app.models.patient import Patient
 from app.repositories.patient_repository import PatientRepository
+from app.core.tracing import traced
 
 
+@traced
 class PatientService:
     """Service for patient business logic"""
     
@@ -0,0 +1,297 @@
+import threading
+from datetime import date, time
+from typing import Dict, FrozenSet, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.appointment import ShiftType
+from app.models.consultation_room import ConsultationRoom
+from app.models.schedule import ScheduleTemplate, ScheduleBreak, ScheduleException
+from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.repositories.schedule_repository import ScheduleRepository
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
+from app.schemas.schedule import RoomScheduleUpdate, RoomScheduleResponse, ScheduleExceptionCreate
+from app.core.intervals import Interval, normalize, slot_starts, subtract, to_minutes, to_time
+from app.core.config import settings
+from app.core.metrics import record_cache_access
+from app.core.tracing import traced
+
+# Horario de los consultorios sin plantilla (lunes a viernes)
+DEFAULT_SHIFT_HOURS = {
+    ShiftType.MORNING: (time(8, 0), time(13, 0)),
+    ShiftType.AFTERNOON: (time(14, 0), time(18, 0)),
+}
+DEFAULT_WEEKDAYS = range(5)
+
+SlotList = Tuple[Tuple[time, time], ...]
+
+
+class CompiledSchedule:
+    """
+    Working intervals of a room by (weekday, shift), with per-date overrides.
+    Slot lists are derived lazily and memoized per intervals and duration.
+    """
+
+    __slots__ = ("version", "weekly", "overrides", "uses_default", "_slots", "_starts")
+
+    def __init__(
+        self,
+        version: int,
+        weekly: Dict[Tuple[int, str], Tuple[Interval, ...]],
+        overrides: Dict[Tuple[date, str], Tuple[Interval, ...]],
+        uses_default: bool
+    ):
+        self.version = version
+        self.weekly = weekly
+        self.overrides = overrides
+        self.uses_default = uses_default
+        self._slots: Dict[Tuple[Tuple[Interval, ...], int], SlotList] = {}
+        self._starts: Dict[Tuple[Tuple[Interval, ...], int], FrozenSet[time]] = {}
+
+    def intervals(self, day: date, shift: str) -> Tuple[Interval, ...]:
+        override = self.overrides.get((day, shift))
+        if override is not None:
+            return override
+        return self.weekly.get((day.weekday(), shift), ())
+
+    def slots(self, day: date, shift: str, duration: int) -> SlotList:
+        """(start_time, end_time) of every slot of the shift on that date"""
+        key = (self.intervals(day, shift), duration)
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = tuple((to_time(start), to_time(start + duration)) for start in slot_starts(key[0], duration))
+            self._slots[key] = slots
+        return slots
+
+    def has_slot(self, day: date, shift: str, start_time: time, duration: int) -> bool:
+        """Whether a slot of the shift starts at start_time on that date"""
+        key = (self.intervals(day, shift), duration)
+        starts = self._starts.get(key)
+        if starts is None:
+            starts = frozenset(start for start, _ in self.slots(day, shift, duration))
+            self._starts[key] = starts
+        return start_time in starts
+
+    def is_open(self, day: date) -> bool:
+        return any(self.intervals(day, shift.value) for shift in ShiftType)
+
+
+def compile_schedule(version: int, templates: List[ScheduleTemplate], exceptions: List[ScheduleException]) -> CompiledSchedule:
+    """Turn a room's templates, breaks and exceptions into sorted minute intervals"""
+    weekly: Dict[Tuple[int, str], Tuple[Interval, ...]] = {}
+    active = [template for template in templates if template.active]
+
+    if active:
+        for template in active:
+            shift_interval = [(to_minutes(template.start_time), to_minutes(template.end_time))]
+            breaks = [(to_minutes(b.start_time), to_minutes(b.end_time)) for b in template.breaks]
+            weekly[(template.weekday, template.shift)] = tuple(subtract(shift_interval, breaks))
+    else:
+        for weekday in DEFAULT_WEEKDAYS:
+            for shift, (start, end) in DEFAULT_SHIFT_HOURS.items():
+                weekly[(weekday, shift.value)] = ((to_minutes(start), to_minutes(end)),)
+
+    overrides: Dict[Tuple[date, str], Tuple[Interval, ...]] = {}
+    for exception in exceptions:
+        if exception.start_time is None or exception.end_time is None:
+            overrides[(exception.exception_date, exception.shift)] = ()
+        else:
+            overrides[(exception.exception_date, exception.shift)] = tuple(
+                normalize([(to_minutes(exception.start_time), to_minutes(exception.end_time))])
+            )
+
+    return CompiledSchedule(version, weekly, overrides, uses_default=not active)
+
+
+# Horarios compilados por consultorio: {room_id: CompiledSchedule}
+_compiled: Dict[int, CompiledSchedule] = {}
+_compiled_lock = threading.Lock()
+
+
+@traced
+class ScheduleService:
+    """Service for per-room schedule templates and their compiled form"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.schedule_repo = ScheduleRepository(db)
+        self.room_repo = ConsultationRoomRepository(db)
+        self.inventory_repo = SlotInventoryRepository(db)
+
+    def get_compiled(self, rooms: List[ConsultationRoom]) -> Dict[int, CompiledSchedule]:
+        """
+        Compiled schedule of each room. Cached per room and recompiled only
+        when the room's schedule_version changed (two queries for all stale rooms).
+        """
+        result: Dict[int, CompiledSchedule] = {}
+        stale: Dict[int, int] = {}
+        for room in rooms:
+            version = room.schedule_version or 0
+            cached = _compiled.get(room.id)
+            if cached is not None and cached.version == version:
+                result[room.id] = cached
+            else:
+                stale[room.id] = version
+        record_cache_access("room_schedule", not stale)
+
+        if stale:
+            templates_by_room: Dict[int, List[ScheduleTemplate]] = {}
+            for template in self.schedule_repo.get_templates(list(stale)):
+                templates_by_room.setdefault(template.consultation_room_id, []).append(template)
+            exceptions_by_room: Dict[int, List[ScheduleException]] = {}
+            for exception in self.schedule_repo.get_exceptions(list(stale), date.today()):
+                exceptions_by_room.setdefault(exception.consultation_room_id, []).append(exception)
+
+            with _compiled_lock:
+                for room_id, version in stale.items():
+                    compiled = compile_schedule(
+                        version,
+                        templates_by_room.get(room_id, []),
+                        exceptions_by_room.get(room_id, [])
+                    )
+                    _compiled[room_id] = compiled
+                    result[room_id] = compiled
+
+        return result
+
+    def get_room_schedule(self, room_id: int) -> RoomScheduleResponse:
+        """Templates and upcoming exceptions of a room"""
+        room = self._get_room(room_id)
+        templates = self.schedule_repo.get_templates([room.id])
+        return RoomScheduleResponse(
+            consultation_room_id=room.id,
+            schedule_version=room.schedule_version or 0,
+            uses_default=not any(template.active for template in templates),
+            templates=templates,
+            exceptions=self.schedule_repo.get_exceptions([room.id], date.today())
+        )
+
+    def replace_room_schedule(self, room_id: int, schedule_data: RoomScheduleUpdate) -> RoomScheduleResponse:
+        """Replace the weekly templates of a room"""
+        room = self._get_room(room_id)
+
+        templates = []
+        seen = set()
+        for item in schedule_data.templates:
+            shift = self._validate_shift(item.shift)
+            self._validate_range(item.start_time, item.end_time)
+            if (item.weekday, shift) in seen:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Duplicate template for weekday {item.weekday} and shift '{shift}'"
+                )
+            seen.add((item.weekday, shift))
+
+            breaks = []
+            for schedule_break in sorted(item.breaks, key=lambda b: b.start_time):
+                self._validate_range(schedule_break.start_time, schedule_break.end_time)
+                if schedule_break.start_time < item.start_time or schedule_break.end_time > item.end_time:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Breaks must be inside the shift hours"
+                    )
+                if breaks and schedule_break.start_time < breaks[-1].end_time:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Breaks cannot overlap"
+                    )
+                breaks.append(ScheduleBreak(start_time=schedule_break.start_time, end_time=schedule_break.end_time))
+
+            templates.append(ScheduleTemplate(
+                consultation_room_id=room.id,
+                weekday=item.weekday,
+                shift=shift,
+                start_time=item.start_time,
+                end_time=item.end_time,
+                breaks=breaks
+            ))
+
+        self._discard_inventory(room.id)
+        self.schedule_repo.replace_templates(room.id, templates)
+        return self.get_room_schedule(room.id)
+
+    def add_exception(self, room_id: int, exception_data: ScheduleExceptionCreate) -> ScheduleException:
+        """Override a room's shift on a date (different hours or no service)"""
+        room = self._get_room(room_id)
+        shift = self._validate_shift(exception_data.shift)
+
+        if exception_data.exception_date < date.today():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date cannot be in the past"
+            )
+        if (exception_data.start_time is None) != (exception_data.end_time is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide both start_time and end_time, or neither to close the shift"
+            )
+        if exception_data.start_time is not None:
+            self._validate_range(exception_data.start_time, exception_data.end_time)
+        if self.schedule_repo.get_exception_for_shift(room.id, exception_data.exception_date, shift):
+            self._raise_duplicate_exception()
+
+        self._discard_inventory(room.id)
+        try:
+            return self.schedule_repo.create_exception(ScheduleException(
+                consultation_room_id=room.id,
+                exception_date=exception_data.exception_date,
+                shift=shift,
+                start_time=exception_data.start_time,
+                end_time=exception_data.end_time,
+                reason=exception_data.reason
+            ))
+        except IntegrityError:
+            # Otra petición creó la misma excepción entre la consulta y el commit
+            self.db.rollback()
+            self._raise_duplicate_exception()
+
+    def _raise_duplicate_exception(self) -> None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The room already has an exception for this date and shift; delete it first"
+        )
+
+    def delete_exception(self, room_id: int, exception_id: int) -> dict:
+        """Remove an exception (the template applies again)"""
+        exception = self.schedule_repo.get_exception(exception_id)
+        if not exception or exception.consultation_room_id != room_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Schedule exception not found"
+            )
+        self._discard_inventory(room_id)
+        self.schedule_repo.delete_exception(exception)
+        return {"message": "Schedule exception deleted successfully"}
+
+    def _discard_inventory(self, room_id: int) -> None:
+        # Las filas precalculadas ya no reflejan el horario: el consultorio usa el
+        # cálculo dinámico hasta la próxima materialización
+        if settings.SLOT_INVENTORY_ENABLED:
+            self.inventory_repo.delete_for_room(room_id, date.today())
+
+    def _get_room(self, room_id: int) -> ConsultationRoom:
+        room = self.room_repo.get_by_id(room_id)
+        if not room:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consultation room not found"
+            )
+        return room
+
+    def _validate_shift(self, shift: str) -> str:
+        try:
+            return ShiftType(shift.lower()).value
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid shift. Must be 'morning' or 'afternoon'"
+            )
+
+    def _validate_range(self, start_time: time, end_time: time) -> None:
+        if start_time >= end_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_time must be before end_time"
+            )
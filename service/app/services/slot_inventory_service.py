@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.appointment import ShiftType
+from app.models.slot_inventory import SlotState
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
+from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.services.schedule_service import ScheduleService
+from app.services.closure_service import ClosureService
+from app.database.base import SessionLocal
+from app.core.config import settings
+from app.core.tracing import traced
+
+logger = logging.getLogger("neumoapp.slot_inventory")
+
+# Filas por INSERT al materializar
+INSERT_BATCH_SIZE = 5000
+
+
+@traced
+class SlotInventoryService:
+    """
+    Materializes the slots of the next SLOT_INVENTORY_WEEKS into slot_inventory,
+    so availability is a single indexed read and booking locks one row.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.inventory_repo = SlotInventoryRepository(db)
+        self.room_repo = ConsultationRoomRepository(db)
+        self.schedule_service = ScheduleService(db)
+        self.closure_service = ClosureService(db)
+
+    def materialize(self, from_date: Optional[date] = None, weeks: Optional[int] = None) -> Optional[Dict[str, int]]:
+        """
+        Create the missing rows, sync them with active appointments and drop
+        past days, in one transaction. Returns None if another worker holds the lock.
+        """
+        from_date = from_date or date.today()
+        weeks = weeks or settings.SLOT_INVENTORY_WEEKS
+
+        try:
+            if not self.inventory_repo.try_lock_materialization():
+                self.db.rollback()
+                return None
+
+            inserted = 0
+            batch: List[dict] = []
+            for row in self._generate_rows(from_date, from_date + timedelta(weeks=weeks)):
+                batch.append(row)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    inserted += self.inventory_repo.insert_missing(batch)
+                    batch = []
+            inserted += self.inventory_repo.insert_missing(batch)
+
+            # Primero liberar: una fila liberada puede seguir solapada por otra cita
+            released = self.inventory_repo.release_orphans(from_date)
+            summary = {
+                "inserted": inserted,
+                "booked": self.inventory_repo.mark_booked_from_appointments(from_date),
+                "released": released,
+                "deleted": self.inventory_repo.delete_before(date.today()),
+            }
+            self.db.commit()
+            return summary
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _generate_rows(self, from_date: date, to_date: date) -> Iterator[dict]:
+        """
+        Inventory rows of every active room/specialty pair for the days in
+        [from_date, to_date), with the slot duration of the specialty
+        """
+        pairs = self.inventory_repo.get_room_specialty_pairs()
+        rooms = self.room_repo.get_by_ids(list({pair.consultation_room_id for pair in pairs}))
+        hospital_ids = {room.id: room.hospital_id for room in rooms}
+        # Días y horas según el horario de cada consultorio; sin filas los días cerrados
+        schedules = self.schedule_service.get_compiled(rooms)
+        calendar = self.closure_service.get_calendar()
+
+        day = from_date
+        while day < to_date:
+            for room_id, specialty_id, slot_duration in pairs:
+                if calendar.is_closed(day, hospital_ids[room_id], room_id):
+                    continue
+                schedule = schedules[room_id]
+                for shift in ShiftType:
+                    for start_time, end_time in schedule.slots(day, shift.value, slot_duration):
+                        yield {
+                            "consultation_room_id": room_id,
+                            "specialty_id": specialty_id,
+                            "slot_date": day,
+                            "start_time": start_time,
+                            "end_time": end_time,
+                            "shift": shift.value,
+                            "state": SlotState.FREE.value,
+                        }
+            day += timedelta(days=1)
+
+
+def materialize_slot_inventory(weeks: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """Run a materialization with its own session"""
+    db = SessionLocal()
+    try:
+        return SlotInventoryService(db).materialize(weeks=weeks)
+    finally:
+        db.close()
+
+
+class SlotInventoryRefresher:
+    """Periodic in-app materialization (every SLOT_INVENTORY_REFRESH_SECONDS)"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float) -> None:
+        if self._task is not None or interval <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # Fuera del event loop: son consultas bloqueantes
+                summary = await loop.run_in_executor(None, materialize_slot_inventory)
+                if summary is not None:
+                    logger.info("Slot inventory refreshed: %s", summary)
+            except Exception:
+                logger.exception("Slot inventory refresh failed")
+            await asyncio.sleep(interval)
+
+
+slot_inventory_refresher = SlotInventoryRefresher()
@@ -1,75 +1,218 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from datetime import date, time, datetime, timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
-from app.models.appointment import Appointment, AppointmentStatus, ShiftType
+from app.models.appointment import ShiftType
+from app.models.consultation_room import ConsultationRoom
+from app.models.specialty import Specialty, DEFAULT_SLOT_DURATION
+from app.models.slot_inventory import SlotInventory
 from app.repositories.specialty_repository import SpecialtyRepository
 from app.repositories.appointment_repository import AppointmentRepository
 from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
 from app.schemas.appointment import TimeSlot, AvailableSlotsResponse, ConsultationRoomSimple
+from app.services.schedule_service import DEFAULT_SHIFT_HOURS, CompiledSchedule, ScheduleService, SlotList
+from app.services.closure_service import ClosureService
+from app.core.intervals import Interval, normalize, overlaps, to_minutes, to_time
+from app.core.config import settings
+from app.core.tracing import traced
 
 
+@traced
 class SlotService:
     """Service for dynamic slot generation and availability checking"""
     
-    # Configuración de horarios
-    MORNING_START = time(8, 0)    # 8:00 AM
-    MORNING_END = time(13, 0)      # 1:00 PM
-    AFTERNOON_START = time(14, 0)  # 2:00 PM
-    AFTERNOON_END = time(18, 0)    # 6:00 PM
-    SLOT_DURATION = 20             # minutos por consulta
+    # Horario por defecto (consultorios sin plantilla, ver ScheduleService)
+    MORNING_START, MORNING_END = DEFAULT_SHIFT_HOURS[ShiftType.MORNING]        # 8:00 AM - 1:00 PM
+    AFTERNOON_START, AFTERNOON_END = DEFAULT_SHIFT_HOURS[ShiftType.AFTERNOON]  # 2:00 PM - 6:00 PM
+    # La duración de cada consulta depende de la especialidad (Specialty.slot_duration)
     
     def __init__(self, db: Session):
         self.db = db
         self.specialty_repo = SpecialtyRepository(db)
         self.appointment_repo = AppointmentRepository(db)
         self.room_repo = ConsultationRoomRepository(db)
+        self.inventory_repo = SlotInventoryRepository(db)
+        self.schedule_service = ScheduleService(db)
+        self.closure_service = ClosureService(db)
     
     def _is_weekday(self, check_date: date) -> bool:
         """Verifica si la fecha es día laboral (lunes a viernes)"""
         return check_date.weekday() < 5  # 0=Monday, 4=Friday
     
-    def _generate_time_slots(self, start_time: time, end_time: time) -> List[time]:
-        """Genera lista de horarios con intervalos de SLOT_DURATION minutos"""
+    def _generate_time_slots(
+        self,
+        start_time: time,
+        end_time: time,
+        slot_duration: int = DEFAULT_SLOT_DURATION
+    ) -> List[time]:
+        """Genera lista de horarios con intervalos de slot_duration minutos (solo slots completos)"""
         slots = []
         current_datetime = datetime.combine(date.today(), start_time)
         end_datetime = datetime.combine(date.today(), end_time)
+        step = timedelta(minutes=slot_duration)
         
-        while current_datetime < end_datetime:
+        while current_datetime + step <= end_datetime:
             slots.append(current_datetime.time())
-            current_datetime += timedelta(minutes=self.SLOT_DURATION)
+            current_datetime += step
         
         return slots
     
-    def _get_occupied_slots(
-        self, 
-        specialty_id: int, 
-        check_date: date, 
-        shift: ShiftType
-    ) -> dict:
-        """
-        Obtiene los slots ocupados para una especialidad, fecha y turno.
-        Retorna dict con estructura: {consultation_room_id: [list of occupied times]}
-        """
-        appointments = self.db.query(Appointment).filter(
-            and_(
-                Appointment.specialty_id == specialty_id,
-                Appointment.appointment_date == check_date,
-                Appointment.shift == shift,
-                Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED])
+    def generate_shift_slots(
+        self,
+        shift_enum: ShiftType,
+        slot_duration: int = DEFAULT_SLOT_DURATION
+    ) -> List[Tuple[time, time]]:
+        """(start_time, end_time) de todos los slots de un turno"""
+        if shift_enum == ShiftType.MORNING:
+            start_time, end_time = self.MORNING_START, self.MORNING_END
+        else:
+            start_time, end_time = self.AFTERNOON_START, self.AFTERNOON_END
+        
+        step = timedelta(minutes=slot_duration)
+        return [
+            (slot_time, (datetime.combine(date.today(), slot_time) + step).time())
+            for slot_time in self._generate_time_slots(start_time, end_time, slot_duration)
+        ]
+    
+    def _get_room_slots(
+        self,
+        consultation_rooms: List[ConsultationRoom],
+        schedules: Dict[int, CompiledSchedule],
+        check_date: date,
+        shift_enum: ShiftType,
+        slot_duration: int
+    ) -> Dict[int, SlotList]:
+        """
+        Slots (start_time, end_time) de cada consultorio según su horario compilado
+        y la duración de la especialidad. Si la fecha es hoy, descarta los horarios pasados.
+        """
+        current_time = datetime.now().time() if check_date == date.today() else None
+        room_slots = {}
+        for room in consultation_rooms:
+            slots = schedules[room.id].slots(check_date, shift_enum.value, slot_duration)
+            if current_time is not None:
+                slots = tuple(slot for slot in slots if slot[0] > current_time)
+            room_slots[room.id] = slots
+        return room_slots
+    
+    def _build_slots(
+        self,
+        consultation_rooms: List[ConsultationRoom],
+        room_slots: Dict[int, SlotList],
+        busy_intervals: Dict[int, List[Tuple[time, time]]]
+    ) -> List[TimeSlot]:
+        """
+        Construye los TimeSlot de cada consultorio marcando los que se solapan
+        con una cita (búsqueda binaria sobre los intervalos ordenados).
+        room_slots: {consultation_room_id: ((start_time, end_time), ...)}
+        busy_intervals: {consultation_room_id: intervalos ocupados normalizados}
+        """
+        slots = []
+        
+        for room in consultation_rooms:
+            room_busy = busy_intervals.get(room.id, ())
+            room_info = ConsultationRoomSimple(
+                id=room.id,
+                room_number=room.room_number,
+                name=room.name
             )
-        ).all()
+            
+            for slot_time, slot_end in room_slots.get(room.id, ()):
+                slots.append(TimeSlot(
+                    start_time=slot_time,
+                    end_time=slot_end,
+                    consultation_room=room_info,
+                    available=not (room_busy and overlaps(room_busy, slot_time, slot_end))
+                ))
+        
+        return slots
+    
+    def _build_slots_from_rows(
+        self,
+        consultation_rooms: List[ConsultationRoom],
+        rows: list,
+        check_date: date
+    ) -> List[TimeSlot]:
+        """
+        Construye los TimeSlot a partir de filas (consultation_room_id, start_time,
+        end_time, available) ya calculadas en la base. Si la fecha es hoy, descarta los pasados.
+        """
+        current_time = datetime.now().time() if check_date == date.today() else None
+        rows_by_room = {}
+        for row in rows:
+            if current_time is None or row.start_time > current_time:
+                rows_by_room.setdefault(row.consultation_room_id, []).append(row)
         
-        occupied = {}
-        for apt in appointments:
-            room_id = apt.consultation_room_id
-            if room_id not in occupied:
-                occupied[room_id] = []
-            occupied[room_id].append(apt.start_time)
+        slots = []
+        for room in consultation_rooms:
+            room_info = ConsultationRoomSimple(
+                id=room.id,
+                room_number=room.room_number,
+                name=room.name
+            )
+            for row in rows_by_room.get(room.id, []):
+                slots.append(TimeSlot(
+                    start_time=row.start_time,
+                    end_time=row.end_time,
+                    consultation_room=room_info,
+                    available=row.available
+                ))
         
-        return occupied
+        return slots
+    
+    def _get_slot_rows_sql(
+        self,
+        room_ids: List[int],
+        check_date: date,
+        interval: Interval,
+        slot_duration: int
+    ) -> list:
+        """Grilla del turno calculada en PostgreSQL (generate_series + anti-join)"""
+        start, end = interval
+        # Fin de la grilla: el último slot completo que entra en el intervalo
+        grid_end = start + (end - start) // slot_duration * slot_duration
+        return self.appointment_repo.get_slot_grid(
+            room_ids,
+            check_date,
+            to_time(start),
+            to_time(grid_end),
+            timedelta(minutes=slot_duration)
+        )
+    
+    def _shared_interval(
+        self,
+        consultation_rooms: List[ConsultationRoom],
+        schedules: Dict[int, CompiledSchedule],
+        check_date: date,
+        shift_enum: ShiftType
+    ) -> Optional[Interval]:
+        """El intervalo del turno si todos los consultorios tienen el mismo y sin pausas"""
+        intervals = {schedules[room.id].intervals(check_date, shift_enum.value) for room in consultation_rooms}
+        if len(intervals) != 1:
+            return None
+        shared = intervals.pop()
+        return shared[0] if len(shared) == 1 else None
+    
+    def _get_busy_intervals(
+        self,
+        consultation_rooms: List[ConsultationRoom],
+        check_date: date
+    ) -> Dict[int, List[Tuple[time, time]]]:
+        """
+        Intervalos ocupados de cada consultorio en la fecha, de cualquier especialidad.
+        Retorna dict con estructura: {consultation_room_id: [(start_time, end_time) ordenados y sin solapes]}
+        """
+        rows = self.appointment_repo.get_active_intervals([room.id for room in consultation_rooms], check_date)
+        return self._index_busy_intervals(rows)
+    
+    def _index_busy_intervals(self, rows) -> Dict[int, List[Tuple[time, time]]]:
+        """Agrupa (consultation_room_id, start_time, end_time) por consultorio y los normaliza"""
+        by_room: Dict[int, List[Tuple[time, time]]] = {}
+        for room_id, start_time, end_time in rows:
+            by_room.setdefault(room_id, []).append((start_time, end_time))
+        return {room_id: normalize(intervals) for room_id, intervals in by_room.items()}
     
     def get_available_slots(
         self, 
@@ -86,7 +229,7 @@ class SlotService:
         - Considera múltiples consultorios del hospital
         - Opcionalmente filtra por consultorio específico
         - Filtra slots ya reservados
-        - Solo días laborales (lunes a viernes)
+        - Días y horas según el horario de cada consultorio (por defecto lunes a viernes)
         - Solo slots futuros si es hoy
         """
         
@@ -105,13 +248,6 @@ class SlotService:
                 detail="Date cannot be in the past"
             )
         
-        # Validar que sea día laboral
-        if not self._is_weekday(check_date):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Appointments are only available Monday through Friday"
-            )
-        
         # Validar turno
         try:
             shift_enum = ShiftType(shift.lower())
@@ -121,25 +257,8 @@ class SlotService:
                 detail="Invalid shift. Must be 'morning' or 'afternoon'"
             )
         
-        # Determinar horarios según turno
-        if shift_enum == ShiftType.MORNING:
-            start_time = self.MORNING_START
-            end_time = self.MORNING_END
-        else:  # AFTERNOON
-            start_time = self.AFTERNOON_START
-            end_time = self.AFTERNOON_END
-        
-        # Generar todos los slots posibles
-        time_slots = self._generate_time_slots(start_time, end_time)
-        
-        # Si es hoy, filtrar horarios pasados
-        if check_date == date.today():
-            current_time = datetime.now().time()
-            time_slots = [t for t in time_slots if t > current_time]
-        
         # Obtener consultorios asignados a esta especialidad en este hospital
-        all_rooms = self.room_repo.get_by_specialty(specialty_id)
-        consultation_rooms = [room for room in all_rooms if room.hospital_id == hospital_id and room.active]
+        consultation_rooms = self.room_repo.get_by_hospital_and_specialty(hospital_id, specialty_id)
         
         # Si se especificó un room_id, filtrar por ese consultorio
         if room_id is not None:
@@ -157,32 +276,68 @@ class SlotService:
                 detail="No consultation rooms assigned to this specialty in the selected hospital"
             )
         
-        # Obtener slots ocupados
-        occupied_slots = self._get_occupied_slots(specialty_id, check_date, shift_enum)
+        # Horario compilado de cada consultorio (plantillas, pausas y excepciones)
+        schedules = self.schedule_service.get_compiled(consultation_rooms)
         
-        # Construir respuesta con disponibilidad por consultorio
-        available_slots = []
+        # Validar que sea día laboral (fin de semana solo con plantilla que lo habilite)
+        if not self._is_weekday(check_date) and not any(
+            schedules[room.id].is_open(check_date) for room in consultation_rooms
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Appointments are only available Monday through Friday"
+            )
         
-        for room in consultation_rooms:
-            room_occupied = occupied_slots.get(room.id, [])
-            
-            for slot_time in time_slots:
-                # Calcular end_time del slot
-                slot_datetime = datetime.combine(date.today(), slot_time)
-                end_datetime = slot_datetime + timedelta(minutes=self.SLOT_DURATION)
-                
-                is_available = slot_time not in room_occupied
-                
-                available_slots.append(TimeSlot(
-                    start_time=slot_time,
-                    end_time=end_datetime.time(),
-                    consultation_room=ConsultationRoomSimple(
-                        id=room.id,
-                        room_number=room.room_number,
-                        name=room.name
-                    ),
-                    available=is_available
-                ))
+        # Feriados, cierres y mantenimiento (calendario en memoria, sin consultas)
+        calendar = self.closure_service.get_calendar()
+        consultation_rooms = [
+            room for room in consultation_rooms
+            if not calendar.is_closed(check_date, room.hospital_id, room.id)
+        ]
+        if not consultation_rooms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No appointments on this date (holiday or closure)"
+            )
+        
+        # Con inventario materializado: lectura directa de slot_inventory
+        inventory_rows = []
+        if settings.SLOT_INVENTORY_ENABLED:
+            inventory_rows = self.inventory_repo.get_slots(
+                specialty_id,
+                [room.id for room in consultation_rooms],
+                check_date,
+                shift_enum.value
+            )
+        
+        # Motor sql: solo PostgreSQL y con el mismo horario en todos los consultorios
+        shared_interval = None
+        if not inventory_rows and settings.SLOT_ENGINE == "sql" and self.db.get_bind().dialect.name == "postgresql":
+            shared_interval = self._shared_interval(consultation_rooms, schedules, check_date, shift_enum)
+        
+        if inventory_rows:
+            available_slots = self._build_slots_from_rows(consultation_rooms, inventory_rows, check_date)
+            # Consultorios sin filas (horario cambiado, aún no rematerializado): cálculo dinámico
+            materialized = {row.consultation_room_id for row in inventory_rows}
+            pending_rooms = [room for room in consultation_rooms if room.id not in materialized]
+            if pending_rooms:
+                room_slots = self._get_room_slots(pending_rooms, schedules, check_date, shift_enum, specialty.slot_duration)
+                busy_intervals = self._get_busy_intervals(pending_rooms, check_date)
+                available_slots += self._build_slots(pending_rooms, room_slots, busy_intervals)
+        elif shared_interval:
+            # Grilla y disponibilidad calculadas en la base (todos los consultorios con el mismo horario)
+            slot_rows = self._get_slot_rows_sql(
+                [room.id for room in consultation_rooms],
+                check_date,
+                shared_interval,
+                specialty.slot_duration
+            )
+            available_slots = self._build_slots_from_rows(consultation_rooms, slot_rows, check_date)
+        else:
+            # Generar los slots de cada consultorio y marcar los que se solapan con una cita
+            room_slots = self._get_room_slots(consultation_rooms, schedules, check_date, shift_enum, specialty.slot_duration)
+            busy_intervals = self._get_busy_intervals(consultation_rooms, check_date)
+            available_slots = self._build_slots(consultation_rooms, room_slots, busy_intervals)
         
         # Devolver TODOS los slots (disponibles y ocupados)
         # El campo 'available' indica el estado de cada slot
@@ -195,48 +350,177 @@ class SlotService:
             slots=available_slots
         )
     
+    def find_first_available_day(
+        self,
+        specialty: Specialty,
+        consultation_rooms: List[ConsultationRoom],
+        from_date: date,
+        days_ahead: int
+    ) -> Tuple[Optional[date], List[AvailableSlotsResponse]]:
+        """
+        Busca el primer día con atención y al menos un slot libre.
+        
+        Carga las citas activas de toda la ventana en una sola consulta.
+        Retorna la fecha y los slots de cada turno con disponibilidad, o
+        (None, []) si no hay disponibilidad en la ventana.
+        """
+        if not consultation_rooms:
+            return None, []
+        
+        to_date = from_date + timedelta(days=days_ahead)
+        rows = self.appointment_repo.get_active_intervals_in_range(
+            [room.id for room in consultation_rooms],
+            from_date,
+            to_date
+        )
+        
+        # {appointment_date: [(consultation_room_id, start_time, end_time)]}
+        rows_by_day = {}
+        for room_id, appointment_date, start_time, end_time in rows:
+            rows_by_day.setdefault(appointment_date, []).append((room_id, start_time, end_time))
+        
+        schedules = self.schedule_service.get_compiled(consultation_rooms)
+        calendar = self.closure_service.get_calendar()
+        
+        check_date = from_date
+        while check_date <= to_date:
+            open_rooms = [
+                room for room in consultation_rooms
+                if schedules[room.id].is_open(check_date) and not calendar.is_closed(check_date, room.hospital_id, room.id)
+            ]
+            if open_rooms:
+                busy_intervals = self._index_busy_intervals(rows_by_day.get(check_date, []))
+                day_availability = []
+                
+                for shift_enum in ShiftType:
+                    room_slots = self._get_room_slots(
+                        open_rooms, schedules, check_date, shift_enum, specialty.slot_duration
+                    )
+                    slots = self._build_slots(open_rooms, room_slots, busy_intervals)
+                    
+                    if any(slot.available for slot in slots):
+                        day_availability.append(AvailableSlotsResponse(
+                            specialty_id=specialty.id,
+                            specialty_name=specialty.name,
+                            date=check_date,
+                            shift=shift_enum.value,
+                            slots=slots
+                        ))
+                
+                if day_availability:
+                    return check_date, day_availability
+            
+            check_date += timedelta(days=1)
+        
+        return None, []
+    
     def validate_slot_availability(
         self, 
-        specialty_id: int, 
+        specialty: Specialty, 
         appointment_date: date,
         start_time: time,
         shift: str,
-        consultation_room_id: int
+        consultation_room_id: int,
+        exclude_appointment_id: Optional[int] = None
     ) -> bool:
         """
-        Valida que un slot específico esté disponible antes de crear la cita.
+        Valida que un slot específico esté disponible antes de crear la cita:
+        el horario del consultorio lo ofrece y ninguna cita activa del
+        consultorio (de cualquier especialidad) se solapa con él.
+        exclude_appointment_id ignora la cita que se está reprogramando.
         
         Retorna True si está disponible, False si no.
         """
         
-        # Validar que sea día laboral
-        if not self._is_weekday(appointment_date):
+        shift_enum = self.get_bookable_shift(appointment_date, start_time, shift)
+        if shift_enum is None:
             return False
         
+        # El horario del consultorio debe ofrecer ese slot ese día
+        consultation_room = self.room_repo.get_by_id(consultation_room_id)
+        if not consultation_room or not self.is_scheduled_slot(
+            consultation_room, appointment_date, shift_enum, start_time, specialty.slot_duration
+        ):
+            return False
+        
+        # Verificar que ninguna cita se solape con el slot
+        return not self.appointment_repo.exists_overlapping(
+            consultation_room_id,
+            appointment_date,
+            start_time,
+            self.slot_end_time(start_time, specialty.slot_duration),
+            exclude_appointment_id
+        )
+    
+    def claim_inventory_slot(
+        self,
+        specialty_id: int,
+        appointment_date: date,
+        start_time: time,
+        shift: str,
+        consultation_room_id: int
+    ) -> Optional[SlotInventory]:
+        """
+        Bloquea la fila libre de slot_inventory para reservarla
+        (SELECT ... FOR UPDATE SKIP LOCKED).
+        
+        Retorna None si el slot no es reservable, ya está tomado o lo está
+        reservando otra transacción en este momento.
+        """
+        shift_enum = self.get_bookable_shift(appointment_date, start_time, shift)
+        if shift_enum is None:
+            return None
+        
+        return self.inventory_repo.claim(
+            specialty_id,
+            consultation_room_id,
+            appointment_date,
+            start_time,
+            shift_enum.value
+        )
+    
+    def is_scheduled_slot(
+        self,
+        consultation_room: ConsultationRoom,
+        appointment_date: date,
+        shift_enum: ShiftType,
+        start_time: time,
+        slot_duration: int
+    ) -> bool:
+        """
+        Verifica que el horario del consultorio tenga un slot que empiece a esa hora
+        y que ese día no esté cerrado
+        """
+        if self.is_room_closed(consultation_room, appointment_date):
+            return False
+        schedule = self.schedule_service.get_compiled([consultation_room])[consultation_room.id]
+        return schedule.has_slot(appointment_date, shift_enum.value, start_time, slot_duration)
+    
+    def is_room_closed(self, consultation_room: ConsultationRoom, check_date: date) -> bool:
+        """Feriado, cierre del hospital o mantenimiento del consultorio ese día"""
+        return self.closure_service.get_calendar().is_closed(
+            check_date, consultation_room.hospital_id, consultation_room.id
+        )
+    
+    def slot_end_time(self, start_time: time, slot_duration: int) -> time:
+        """Hora de fin de un slot de slot_duration minutos"""
+        return to_time(to_minutes(start_time) + slot_duration)
+    
+    def get_bookable_shift(self, appointment_date: date, start_time: time, shift: str) -> Optional[ShiftType]:
+        """
+        Reglas de fecha, hora y turno; retorna el turno o None si no es reservable.
+        Los días y horas de atención dependen del horario de cada consultorio.
+        """
+        
         # Validar que no sea fecha pasada
         if appointment_date < date.today():
-            return False
+            return None
         
         # Si es hoy, validar que no sea hora pasada
         if appointment_date == date.today() and start_time <= datetime.now().time():
-            return False
+            return None
         
         try:
-            shift_enum = ShiftType(shift.lower())
+            return ShiftType(shift.lower())
         except ValueError:
-            return False
-        
-        # Verificar si ya existe una cita en ese slot
-        existing = self.db.query(Appointment).filter(
-            and_(
-                Appointment.specialty_id == specialty_id,
-                Appointment.appointment_date == appointment_date,
-                Appointment.start_time == start_time,
-                Appointment.shift == shift_enum,
-                Appointment.consultation_room_id == consultation_room_id,
-                Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED])
-            )
-        ).first()
-        
-        return existing is None
-
+            return None
@@ -1,18 +1,24 @@
 from typing import List
+from datetime import date
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.models.specialty import Specialty
-from app.schemas.specialty import SpecialtyCreate
+from app.schemas.specialty import SpecialtyCreate, SpecialtyUpdate
 from app.repositories.specialty_repository import SpecialtyRepository
+from app.repositories.slot_inventory_repository import SlotInventoryRepository
+from app.core.config import settings
+from app.core.tracing import traced
 
 
+@traced
 class SpecialtyService:
     """Service for specialty business logic"""
     
     def __init__(self, db: Session):
         self.db = db
         self.specialty_repo = SpecialtyRepository(db)
+        self.inventory_repo = SlotInventoryRepository(db)
     
     def get_all_specialties(self, skip: int = 0, limit: int = 100) -> List[Specialty]:
         """Get all active specialties"""
@@ -43,3 +49,32 @@ class SpecialtyService:
         
         new_specialty = Specialty(**specialty_data.model_dump())
         return self.specialty_repo.create(new_specialty)
+    
+    def update_specialty(self, specialty_id: int, specialty_update: SpecialtyUpdate) -> Specialty:
+        """Update specialty"""
+        
+        specialty = self.specialty_repo.get_by_id(specialty_id)
+        if not specialty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Specialty not found"
+            )
+        
+        if specialty_update.name is not None and specialty_update.name != specialty.name:
+            if self.specialty_repo.get_by_name(specialty_update.name):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Specialty already exists"
+                )
+            specialty.name = specialty_update.name
+        if specialty_update.description is not None:
+            specialty.description = specialty_update.description
+        if specialty_update.active is not None:
+            specialty.active = specialty_update.active
+        if specialty_update.slot_duration is not None and specialty_update.slot_duration != specialty.slot_duration:
+            specialty.slot_duration = specialty_update.slot_duration
+            # Las filas precalculadas tienen la duración anterior: se vuelven a materializar
+            if settings.SLOT_INVENTORY_ENABLED:
+                self.inventory_repo.delete_for_specialty(specialty.id, date.today())
+        
+        return self.specialty_repo.update(specialty)
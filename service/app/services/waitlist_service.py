@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.appointment import ShiftType
+from app.models.patient import Patient
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.repositories.waitlist_repository import WaitlistRepository
+from app.repositories.consultation_room_repository import ConsultationRoomRepository
+from app.repositories.hospital_repository import HospitalRepository
+from app.repositories.patient_repository import PatientRepository
+from app.repositories.specialty_repository import SpecialtyRepository
+from app.schemas.appointment import AppointmentCreate
+from app.schemas.waitlist import WaitlistCreate
+from app.services.appointment_service import AppointmentService
+from app.database.base import SessionLocal
+from app.core.config import settings
+from app.core.events import FreedSlot, slot_events
+from app.core.tracing import traced
+
+logger = logging.getLogger("neumoapp.waitlist")
+
+WAITLIST_BOOKING_REASON = "Booked from the waitlist"
+
+
+class Waiter(NamedTuple):
+    entry_id: int
+    patient_id: int
+    specialty_id: int
+    shift: Optional[str]
+
+
+class WaitlistIndex:
+    """
+    Waiting entries indexed by (room, day): every room of the hospital assigned
+    to the specialty, for every day of the entry's range. A freed slot looks up
+    its room-day and gets the waiters in arrival order without a query.
+    """
+
+    def __init__(self):
+        self.loaded_on: Optional[date] = None
+        self._by_room_day: Dict[Tuple[int, date], Dict[int, Waiter]] = {}
+        self._keys_by_entry: Dict[int, List[Tuple[int, date]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, entries: List[WaitlistEntry], rooms: Dict[Tuple[int, int], List[int]], today: date) -> None:
+        """Replace the index with the given entries (in id order)"""
+        with self._lock:
+            self._by_room_day = {}
+            self._keys_by_entry = {}
+            self.loaded_on = today
+            self._add_all(entries, rooms, today)
+
+    def merge(self, entries: List[WaitlistEntry], rooms: Dict[Tuple[int, int], List[int]], today: date) -> None:
+        """Add entries that are not indexed yet"""
+        with self._lock:
+            self._add_all(entries, rooms, today)
+
+    def _add_all(self, entries: List[WaitlistEntry], rooms: Dict[Tuple[int, int], List[int]], today: date) -> None:
+        for entry in entries:
+            if entry.id in self._keys_by_entry:
+                continue
+            waiter = Waiter(entry.id, entry.patient_id, entry.specialty_id, entry.shift)
+            keys = []
+            day = max(entry.date_from, today)
+            while day <= entry.date_to:
+                for room_id in rooms.get((entry.hospital_id, entry.specialty_id), ()):
+                    key = (room_id, day)
+                    self._by_room_day.setdefault(key, {})[entry.id] = waiter
+                    keys.append(key)
+                day += timedelta(days=1)
+            self._keys_by_entry[entry.id] = keys
+
+    def remove(self, entry_id: int) -> None:
+        with self._lock:
+            for key in self._keys_by_entry.pop(entry_id, ()):
+                waiters = self._by_room_day.get(key)
+                if waiters is not None:
+                    waiters.pop(entry_id, None)
+                    if not waiters:
+                        del self._by_room_day[key]
+
+    def candidates(self, room_id: int, day: date) -> List[Waiter]:
+        """Waiters of a room-day, first come first"""
+        with self._lock:
+            waiters = list(self._by_room_day.get((room_id, day), {}).values())
+        # Una inscripción puede llegar después de otras con id mayor: FIFO por id
+        return sorted(waiters, key=lambda waiter: waiter.entry_id)
+
+    def entry_ids(self) -> Set[int]:
+        with self._lock:
+            return set(self._keys_by_entry)
+
+    def __len__(self) -> int:
+        return len(self._keys_by_entry)
+
+
+# Índice del worker (los cambios de otros workers se cargan por id creciente)
+waitlist_index = WaitlistIndex()
+
+
+@traced
+class WaitlistService:
+    """Service for the waitlist and the backfill of freed slots"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.waitlist_repo = WaitlistRepository(db)
+        self.room_repo = ConsultationRoomRepository(db)
+        self.hospital_repo = HospitalRepository(db)
+        self.specialty_repo = SpecialtyRepository(db)
+        self.patient_repo = PatientRepository(db)
+
+    def join_waitlist(self, entry_data: WaitlistCreate, current_patient: Patient) -> WaitlistEntry:
+        """Register a patient's interest in freed slots"""
+        hospital = self.hospital_repo.get_by_id(entry_data.hospital_id)
+        if not hospital or not hospital.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Hospital not found"
+            )
+
+        specialty = self.specialty_repo.get_by_id(entry_data.specialty_id)
+        if not specialty or not specialty.active:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Specialty not found"
+            )
+
+        if not self.hospital_repo.has_specialty(hospital.id, specialty.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Hospital '{hospital.name}' does not offer the specialty '{specialty.name}'"
+            )
+
+        shift = None
+        if entry_data.shift is not None:
+            try:
+                shift = ShiftType(entry_data.shift.lower()).value
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid shift. Must be 'morning' or 'afternoon'"
+                )
+
+        if entry_data.date_from < date.today():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Date cannot be in the past"
+            )
+        if entry_data.date_from > entry_data.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be before or equal to date_to"
+            )
+        if (entry_data.date_to - entry_data.date_from).days >= settings.WAITLIST_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range cannot exceed {settings.WAITLIST_MAX_DAYS} days"
+            )
+
+        entry = self.waitlist_repo.create(WaitlistEntry(
+            patient_id=current_patient.id,
+            hospital_id=hospital.id,
+            specialty_id=specialty.id,
+            date_from=entry_data.date_from,
+            date_to=entry_data.date_to,
+            shift=shift,
+            status=WaitlistStatus.WAITING.value
+        ))
+        room_ids = [room.id for room in self.room_repo.get_by_hospital_and_specialty(hospital.id, specialty.id)]
+        waitlist_index.merge([entry], {(hospital.id, specialty.id): room_ids}, date.today())
+        return entry
+
+    def get_my_entries(self, current_patient: Patient) -> List[WaitlistEntry]:
+        """Waitlist entries of the current patient"""
+        return self.waitlist_repo.get_by_patient(current_patient.id)
+
+    def leave_waitlist(self, entry_id: int, current_patient: Patient) -> dict:
+        """Remove a waiting entry of the current patient"""
+        entry = self.waitlist_repo.get_by_id(entry_id)
+        if not entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Waitlist entry not found"
+            )
+        if entry.patient_id != current_patient.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this waitlist entry"
+            )
+        if entry.status != WaitlistStatus.WAITING.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only waiting entries can be removed"
+            )
+
+        self.waitlist_repo.cancel(entry)
+        waitlist_index.remove(entry.id)
+        return {"message": "Waitlist entry removed successfully"}
+
+    def refresh_index(self) -> None:
+        """
+        Full load once a day; otherwise sync the index with the waiting IDs:
+        add the unseen ones (ids are not committed in order, so no high-water
+        mark) and drop the ones that left the list in other workers.
+        """
+        today = date.today()
+        if waitlist_index.loaded_on != today:
+            waitlist_index.load(self.waitlist_repo.get_waiting(today), self._rooms_by_hospital_specialty(), today)
+            return
+        # Antes de la consulta: lo que se indexe mientras tanto no se descarta
+        indexed = waitlist_index.entry_ids()
+        waiting = set(self.waitlist_repo.get_waiting_ids(today))
+        for entry_id in indexed - waiting:
+            waitlist_index.remove(entry_id)
+        unseen = waiting - indexed
+        if unseen:
+            entries = self.waitlist_repo.get_by_ids(sorted(unseen))
+            waitlist_index.merge(entries, self._rooms_by_hospital_specialty(), today)
+
+    def backfill(self, slot: FreedSlot) -> Optional[int]:
+        """
+        Book a freed slot for the first matching waiter. Waiters whose entry is
+        no longer waiting, or who cannot take the slot (other specialty
+        duration, shift), are skipped. Returns the served entry ID, if any.
+        """
+        if slot.appointment_date < date.today():
+            return None
+
+        for waiter in waitlist_index.candidates(slot.consultation_room_id, slot.appointment_date):
+            if waiter.shift is not None and waiter.shift != slot.shift:
+                continue
+
+            patient = self.patient_repo.get_by_id(waiter.patient_id)
+            # La inscripción se marca en la misma transacción que la cita
+            if not patient or not patient.active or not self.waitlist_repo.claim(waiter.entry_id):
+                self.db.rollback()
+                waitlist_index.remove(waiter.entry_id)
+                continue
+
+            try:
+                appointment = AppointmentService(self.db).book_appointment(
+                    AppointmentCreate(
+                        specialty_id=waiter.specialty_id,
+                        consultation_room_id=slot.consultation_room_id,
+                        appointment_date=slot.appointment_date,
+                        start_time=slot.start_time,
+                        shift=slot.shift,
+                        reason=WAITLIST_BOOKING_REASON
+                    ),
+                    patient
+                )
+            except HTTPException:
+                # No le sirve este slot: sigue esperando
+                self.db.rollback()
+                continue
+
+            self.waitlist_repo.set_appointment(waiter.entry_id, appointment.id)
+            waitlist_index.remove(waiter.entry_id)
+            return waiter.entry_id
+
+        return None
+
+    def _rooms_by_hospital_specialty(self) -> Dict[Tuple[int, int], List[int]]:
+        rooms: Dict[Tuple[int, int], List[int]] = {}
+        for room_id, hospital_id, specialty_id in self.room_repo.get_specialty_assignments():
+            rooms.setdefault((hospital_id, specialty_id), []).append(room_id)
+        return rooms
+
+
+def process_freed_slots(slots: List[FreedSlot]) -> int:
+    """Refresh the index and backfill the freed slots with its own session"""
+    db = SessionLocal()
+    try:
+        service = WaitlistService(db)
+        service.refresh_index()
+        served = 0
+        for slot in slots:
+            if service.backfill(slot) is not None:
+                served += 1
+        return served
+    finally:
+        db.close()
+
+
+class WaitlistWorker:
+    """
+    Consumes the freed slots published by cancellations, outside the request
+    path, and reloads new entries every WAITLIST_REFRESH_SECONDS
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float) -> None:
+        if self._task is not None:
+            return
+        wakeup = slot_events.attach()
+        self._task = asyncio.get_running_loop().create_task(self._run(wakeup, interval))
+
+    async def stop(self) -> None:
+        slot_events.detach()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, wakeup: asyncio.Event, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # Fuera del event loop: son consultas bloqueantes
+                served = await loop.run_in_executor(None, process_freed_slots, slot_events.drain())
+                if served:
+                    logger.info("Waitlist backfilled %d freed slots", served)
+            except Exception:
+                logger.exception("Waitlist processing failed")
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=interval if interval > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+
+waitlist_worker = WaitlistWorker()
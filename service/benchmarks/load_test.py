@@ -0,0 +1,346 @@
+"""
+Load test for the patient booking flow
+
+Seeds a configurable dataset and drives the full flow for every virtual
+patient, at a configurable concurrency:
+
+    login → GET /hospitals → GET /hospitals/{id}/specialties
+          → GET /slots/available → POST /appointments → DELETE /appointments/{id}
+
+Reports throughput and p50/p95/p99 latency per endpoint as JSON, so runs
+can be compared across commits. When run in-process (default) it also
+counts the SQL statements issued by each endpoint.
+
+Usage (from service/):
+    python -m benchmarks.load_test --patients 200 --concurrency 20 --output results.json
+    python -m benchmarks.load_test --base-url http://localhost:3000 --no-seed
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Todos los pacientes virtuales comparten IP: sin throttling de login en modo in-process
+os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "false")
+
+from app.core.security import get_password_hash
+from app.database.base import Base, SessionLocal, engine
+from app.models.consultation_room import ConsultationRoom
+from app.models.hospital import Hospital
+from app.models.patient import Patient
+from app.models.specialty import Specialty
+
+PASSWORD = "bench-password"
+DOCUMENT_PREFIX = "7"
+
+# Contador de consultas SQL del request en curso (solo en modo in-process)
+_query_counter: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "bench_query_counter", default=None
+)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# =====================================================
+# Dataset
+# =====================================================
+
+def seed(hospitals: int, specialties: int, rooms_per_specialty: int, patients: int) -> None:
+    """Create the benchmark dataset (idempotent: skips if already seeded)"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    try:
+        if db.query(Hospital).filter(Hospital.code == "BENCH-H1").first():
+            print("Benchmark dataset already present, skipping seed")
+            return
+
+        started = time.perf_counter()
+        specialty_objs = [
+            Specialty(name=f"Bench Specialty {j}", description="Load test")
+            for j in range(1, specialties + 1)
+        ]
+        db.add_all(specialty_objs)
+
+        for i in range(1, hospitals + 1):
+            hospital = Hospital(
+                name=f"Bench Hospital {i}",
+                code=f"BENCH-H{i}",
+                address="Load test",
+                specialties=list(specialty_objs)
+            )
+            db.add(hospital)
+
+            for j, specialty in enumerate(specialty_objs, start=1):
+                for k in range(1, rooms_per_specialty + 1):
+                    db.add(ConsultationRoom(
+                        hospital=hospital,
+                        room_number=f"BH{i}-S{j}-R{k}",
+                        name=f"Bench Room {i}-{j}-{k}",
+                        specialties=[specialty]
+                    ))
+
+        # Un único hash para todos los pacientes
+        password_hash = get_password_hash(PASSWORD)
+        db.add_all([
+            Patient(
+                document_number=f"{DOCUMENT_PREFIX}{n:07d}",
+                last_name="Bench",
+                first_name=f"Patient {n}",
+                birth_date=date(1990, 1, 1),
+                gender="M" if n % 2 else "F",
+                email=f"bench{n}@example.com",
+                password_hash=password_hash
+            )
+            for n in range(1, patients + 1)
+        ])
+
+        db.commit()
+        print(f"Seeded benchmark dataset in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+
+def next_weekday(from_date: date) -> date:
+    check_date = from_date + timedelta(days=1)
+    while check_date.weekday() >= 5:
+        check_date += timedelta(days=1)
+    return check_date
+
+
+# =====================================================
+# Runner
+# =====================================================
+
+class Recorder:
+    """Collects latency, status and SQL counts per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        counter = [0]
+        token = _query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _query_counter.reset(token)
+
+        self.latencies[label].append(elapsed)
+        self.statuses[label][response.status_code] += 1
+        self.queries[label].append(counter[0])
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+
+async def patient_flow(client: httpx.AsyncClient, recorder: Recorder, patient_number: int, booking_date: date) -> None:
+    """Run the full booking flow for one patient"""
+    response = await recorder.request(
+        client, "POST /auth/login", "POST", "/auth/login",
+        json={"document_number": f"{DOCUMENT_PREFIX}{patient_number:07d}", "password": PASSWORD}
+    )
+    if response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await recorder.request(client, "GET /hospitals", "GET", "/hospitals/", headers=headers)
+    bench_hospitals = [h for h in response.json() if h["code"].startswith("BENCH-")] if response.status_code == 200 else []
+    if not bench_hospitals:
+        return
+    hospital = random.choice(bench_hospitals)
+
+    response = await recorder.request(
+        client, "GET /hospitals/{id}/specialties", "GET", f"/hospitals/{hospital['id']}/specialties",
+        headers=headers
+    )
+    if response.status_code != 200 or not response.json():
+        return
+    specialty = random.choice(response.json())
+
+    shift = random.choice(["morning", "afternoon"])
+    response = await recorder.request(
+        client, "GET /slots/available", "GET", "/slots/available", headers=headers,
+        params={
+            "hospital_id": hospital["id"],
+            "specialty_id": specialty["id"],
+            "date": booking_date.isoformat(),
+            "shift": shift
+        }
+    )
+    if response.status_code != 200:
+        return
+    free_slots = [slot for slot in response.json()["slots"] if slot["available"]]
+    if not free_slots:
+        return
+    slot = random.choice(free_slots)
+
+    response = await recorder.request(
+        client, "POST /appointments", "POST", "/appointments/", headers=headers,
+        json={
+            "specialty_id": specialty["id"],
+            "consultation_room_id": slot["consultation_room"]["id"],
+            "appointment_date": booking_date.isoformat(),
+            "start_time": slot["start_time"],
+            "shift": shift,
+            "reason": "Load test"
+        }
+    )
+    if response.status_code != 201:
+        return
+
+    await recorder.request(
+        client, "DELETE /appointments/{id}", "DELETE", f"/appointments/{response.json()['id']}",
+        headers=headers
+    )
+
+
+async def run(base_url: Optional[str], patients: int, concurrency: int, iterations: int) -> Dict:
+    recorder = Recorder()
+    booking_date = next_weekday(date.today())
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from sqlalchemy import event
+        from main import app
+        event.listen(engine, "before_cursor_execute", _count_query)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(iterations):
+        for patient_number in range(1, patients + 1):
+            queue.put_nowait(patient_number)
+
+    async def worker():
+        while True:
+            try:
+                patient_number = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await patient_flow(client, recorder, patient_number, booking_date)
+
+    started = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    return summarize(recorder, duration, in_process=base_url is None)
+
+
+# =====================================================
+# Report
+# =====================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(recorder: Recorder, duration: float, in_process: bool) -> Dict:
+    endpoints = {}
+    total_requests = 0
+
+    for label, latencies in recorder.latencies.items():
+        total_requests += len(latencies)
+        queries = recorder.queries[label]
+        endpoints[label] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[label],
+            "status_codes": {str(code): count for code, count in sorted(recorder.statuses[label].items())},
+            "throughput_rps": round(len(latencies) / duration, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "db_queries_mean": round(sum(queries) / len(queries), 2) if in_process else None,
+            "db_queries_max": max(queries) if in_process else None,
+        }
+
+    return {
+        "total": {
+            "requests": total_requests,
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(total_requests / duration, 2) if duration else 0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the booking flow")
+    parser.add_argument("--base-url", default=None, help="Target a running instance instead of the in-process app")
+    parser.add_argument("--hospitals", type=int, default=3)
+    parser.add_argument("--specialties", type=int, default=5)
+    parser.add_argument("--rooms-per-specialty", type=int, default=3)
+    parser.add_argument("--patients", type=int, default=100, help="Virtual patients (one flow each per iteration)")
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--random-seed", type=int, default=42, help="Random seed for slot/hospital choices")
+    parser.add_argument("--no-seed", action="store_true", help="Do not create the dataset")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.random_seed)
+    if not args.no_seed:
+        seed(args.hospitals, args.specialties, args.rooms_per_specialty, args.patients)
+
+    report = asyncio.run(run(args.base_url, args.patients, args.concurrency, args.iterations))
+    report["meta"] = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "config": {
+            "hospitals": args.hospitals,
+            "specialties": args.specialties,
+            "rooms_per_specialty": args.rooms_per_specialty,
+            "patients": args.patients,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "random_seed": args.random_seed,
+        },
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
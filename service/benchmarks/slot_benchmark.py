@@ -0,0 +1,282 @@
+"""
+Microbenchmarks for SlotService
+
+Measures the pure computation of slot generation against in-memory
+repositories (no database), with 1, 10, 100 and 1,000 rooms and several
+booking densities:
+- SlotService._generate_time_slots
+- SlotService.get_available_slots
+- SlotService.validate_slot_availability
+
+Each case reports min/median/mean/stddev per call. With --baseline, the
+run fails (exit code 1) when a case's median is slower than the baseline by
+more than --max-regression, so it can gate CI.
+
+Usage (from service/):
+    python -m benchmarks.slot_benchmark --save-baseline benchmarks/slot_baseline.json
+    python -m benchmarks.slot_benchmark --baseline benchmarks/slot_baseline.json --max-regression 0.25
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.appointment import ShiftType
+from app.models.consultation_room import ConsultationRoom
+from app.models.specialty import Specialty, DEFAULT_SLOT_DURATION
+from app.services.slot_service import SlotService
+
+HOSPITAL_ID = 1
+SPECIALTY_ID = 1
+
+
+# =====================================================
+# In-memory repositories
+# =====================================================
+
+class InMemorySpecialtyRepository:
+    def __init__(self, specialty: Specialty):
+        self.specialty = specialty
+
+    def get_by_id(self, specialty_id: int) -> Optional[Specialty]:
+        return self.specialty if specialty_id == self.specialty.id else None
+
+
+class InMemoryConsultationRoomRepository:
+    def __init__(self, rooms: List[ConsultationRoom]):
+        self.rooms = rooms
+        self.by_id = {room.id: room for room in rooms}
+
+    def get_by_hospital_and_specialty(self, hospital_id: int, specialty_id: int, active_only: bool = True):
+        return self.rooms
+
+    def get_by_id(self, room_id: int) -> Optional[ConsultationRoom]:
+        return self.by_id.get(room_id)
+
+
+class InMemoryScheduleRepository:
+    """Rooms without templates: the default grid applies"""
+
+    def get_templates(self, room_ids: List[int]):
+        return []
+
+    def get_exceptions(self, room_ids: List[int], from_date: date):
+        return []
+
+
+class InMemoryClosureRepository:
+    """No holidays or closures"""
+
+    def get_fingerprint(self):
+        return 0, 0
+
+    def get_active(self, from_date: date):
+        return []
+
+
+class InMemoryAppointmentRepository:
+    def __init__(self, booked: List[Tuple[int, date, object, object]]):
+        # [(room_id, date, start_time, end_time)]
+        self.by_date: Dict[date, List[Tuple[int, object, object]]] = {}
+        self.by_room_date: Dict[Tuple[int, date], List[Tuple[object, object]]] = {}
+        for room_id, booked_date, start_time, end_time in booked:
+            self.by_date.setdefault(booked_date, []).append((room_id, start_time, end_time))
+            self.by_room_date.setdefault((room_id, booked_date), []).append((start_time, end_time))
+
+    def get_active_intervals(self, room_ids: List[int], check_date: date):
+        return self.by_date.get(check_date, [])
+
+    def exists_overlapping(self, consultation_room_id, appointment_date, start_time, end_time, exclude_appointment_id=None) -> bool:
+        return any(
+            booked_start < end_time and booked_end > start_time
+            for booked_start, booked_end in self.by_room_date.get((consultation_room_id, appointment_date), [])
+        )
+
+
+def build_service(rooms: int, density: float, check_date: date, rng: random.Random) -> Tuple[SlotService, Specialty, List]:
+    """SlotService wired to in-memory repositories; returns it with the specialty and the booked slots"""
+    specialty = Specialty(id=SPECIALTY_ID, name="Cardiología", active=True, slot_duration=DEFAULT_SLOT_DURATION)
+    room_objs = [
+        ConsultationRoom(
+            id=i, hospital_id=HOSPITAL_ID, room_number=f"R-{i}", name=f"Consultorio {i}", active=True, schedule_version=0
+        )
+        for i in range(1, rooms + 1)
+    ]
+
+    service = SlotService(db=None)
+    booked = []
+    for shift_enum in ShiftType:
+        start, end = (
+            (SlotService.MORNING_START, SlotService.MORNING_END)
+            if shift_enum == ShiftType.MORNING
+            else (SlotService.AFTERNOON_START, SlotService.AFTERNOON_END)
+        )
+        for room in room_objs:
+            for slot_time in service._generate_time_slots(start, end):
+                if rng.random() < density:
+                    booked.append((room.id, check_date, slot_time, service.slot_end_time(slot_time, DEFAULT_SLOT_DURATION)))
+
+    service.specialty_repo = InMemorySpecialtyRepository(specialty)
+    service.room_repo = InMemoryConsultationRoomRepository(room_objs)
+    service.appointment_repo = InMemoryAppointmentRepository(booked)
+    service.schedule_service.schedule_repo = InMemoryScheduleRepository()
+    service.closure_service.closure_repo = InMemoryClosureRepository()
+    return service, specialty, booked
+
+
+# =====================================================
+# Timing
+# =====================================================
+
+def measure(func: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    """Calibrate loops per round to last at least min_time; stats are per call"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - started) / loops)
+
+    return {
+        "loops": loops,
+        "rounds": rounds,
+        "min_us": round(min(timings) * 1e6, 3),
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "mean_us": round(statistics.mean(timings) * 1e6, 3),
+        "stddev_us": round(statistics.stdev(timings) * 1e6, 3) if len(timings) > 1 else 0.0,
+    }
+
+
+def next_weekday(from_date: date) -> date:
+    check_date = from_date + timedelta(days=1)
+    while check_date.weekday() >= 5:
+        check_date += timedelta(days=1)
+    return check_date
+
+
+def run(room_counts: List[int], densities: List[float], rounds: int, min_time: float, seed: int) -> Dict[str, Dict]:
+    rng = random.Random(seed)
+    check_date = next_weekday(date.today())
+    results = {}
+
+    base_service = SlotService(db=None)
+    results["generate_time_slots[morning]"] = measure(
+        lambda: base_service._generate_time_slots(SlotService.MORNING_START, SlotService.MORNING_END),
+        rounds, min_time
+    )
+
+    for rooms in room_counts:
+        for density in densities:
+            service, specialty, booked = build_service(rooms, density, check_date, rng)
+            label = f"rooms={rooms},density={density}"
+
+            results[f"get_available_slots[{label}]"] = measure(
+                lambda: service.get_available_slots(HOSPITAL_ID, SPECIALTY_ID, check_date, "morning"),
+                rounds, min_time
+            )
+
+            # Mitad de las validaciones sobre slots ocupados, mitad libres
+            probes = [(room_id, start_time) for room_id, _, start_time, _ in booked[:50]]
+            probes += [(rooms, SlotService.MORNING_START)] * max(1, len(probes))
+
+            def validate():
+                for room_id, start_time in probes:
+                    service.validate_slot_availability(specialty, check_date, start_time, "morning", room_id)
+
+            stats = measure(validate, rounds, min_time)
+            # Normalizar a una llamada de validación
+            for key in ("min_us", "median_us", "mean_us", "stddev_us"):
+                stats[key] = round(stats[key] / len(probes), 3)
+            results[f"validate_slot_availability[{label}]"] = stats
+
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Return the cases whose median regressed beyond the threshold"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get("median_us"):
+            continue
+        ratio = stats["median_us"] / reference["median_us"]
+        stats["baseline_median_us"] = reference["median_us"]
+        stats["change"] = round(ratio - 1, 4)
+        if ratio > 1 + max_regression:
+            regressions.append(f"{name}: {reference['median_us']}us -> {stats['median_us']}us (+{(ratio - 1) * 100:.1f}%)")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict]) -> None:
+    width = max(len(name) for name in results)
+    print(f"{'case':<{width}}  {'median_us':>12}  {'mean_us':>12}  {'stddev_us':>10}  {'change':>8}")
+    for name, stats in results.items():
+        change = f"{stats['change'] * 100:+.1f}%" if "change" in stats else "-"
+        print(f"{name:<{width}}  {stats['median_us']:>12.3f}  {stats['mean_us']:>12.3f}  {stats['stddev_us']:>10.3f}  {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SlotService microbenchmarks")
+    parser.add_argument("--rooms", default="1,10,100,1000", help="Comma-separated room counts")
+    parser.add_argument("--densities", default="0,0.5,0.9", help="Comma-separated booking densities (0-1)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Write results as a new baseline")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=float(os.getenv("SLOT_BENCH_MAX_REGRESSION", "0.25")),
+        help="Allowed median slowdown vs baseline (0.25 = 25%%)"
+    )
+    args = parser.parse_args()
+
+    results = run(
+        [int(v) for v in args.rooms.split(",")],
+        [float(v) for v in args.densities.split(",")],
+        args.rounds,
+        args.min_time,
+        args.seed
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.max_regression)
+
+    print_table(results)
+
+    report = {"results": results, "max_regression": args.max_regression}
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} case(s) regressed more than {args.max_regression * 100:.0f}%:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Slot engine comparison (python vs sql)
+
+Runs SlotService.get_available_slots end to end against the configured
+PostgreSQL database with both SLOT_ENGINE values:
+- python: occupied slots are fetched and the shift grid is built in Python
+- sql: the grid is generated with generate_series and anti-joined against
+  active appointments in PostgreSQL
+
+For each room count a scratch hospital, specialty, rooms and appointments
+are inserted in one transaction that is rolled back at the end, so the
+database is left untouched. Use the results to pick SLOT_ENGINE per
+deployment.
+
+Usage (from service/):
+    python -m benchmarks.slot_engine_benchmark --rooms 1,10,100,500 --density 0.5
+"""
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import date
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.models import Appointment, ConsultationRoom, Hospital, Patient, Specialty
+from app.models.appointment import AppointmentStatus, ShiftType
+from app.services.slot_service import SlotService
+from benchmarks.slot_benchmark import measure, next_weekday
+
+ENGINES = ("python", "sql")
+
+
+def seed(db, rooms: int, density: float, check_date: date, rng: random.Random):
+    """Insert (flush, no commit) a hospital with `rooms` rooms and booked slots"""
+    suffix = uuid.uuid4().hex[:8]
+    specialty = Specialty(name=f"Bench {suffix}", active=True)
+    hospital = Hospital(name=f"Bench {suffix}", code=f"B{suffix}", address="-", active=True)
+    hospital.specialties.append(specialty)
+    patient = Patient(
+        document_number=f"B{suffix}",
+        first_name="Bench",
+        last_name="Bench",
+        birth_date=date(1990, 1, 1),
+        gender="M",
+        email=f"bench-{suffix}@example.com",
+        password_hash="-"
+    )
+    room_objs = [
+        ConsultationRoom(hospital=hospital, room_number=f"B{suffix}-{i}", name=f"Bench {i}", active=True)
+        for i in range(rooms)
+    ]
+    for room in room_objs:
+        room.specialties.append(specialty)
+    db.add_all([hospital, patient] + room_objs)
+    db.flush()
+
+    service = SlotService(db)
+    appointments = []
+    for room in room_objs:
+        for start_time, end_time in service.generate_shift_slots(ShiftType.MORNING):
+            if rng.random() < density:
+                appointments.append(Appointment(
+                    patient_id=patient.id,
+                    specialty_id=specialty.id,
+                    consultation_room_id=room.id,
+                    appointment_date=check_date,
+                    start_time=start_time,
+                    end_time=end_time,
+                    shift=ShiftType.MORNING.value,
+                    status=AppointmentStatus.CONFIRMED.value
+                ))
+    db.add_all(appointments)
+    db.flush()
+    return hospital.id, specialty.id
+
+
+def run(room_counts: List[int], density: float, rounds: int, min_time: float, seed_value: int) -> Dict[str, Dict]:
+    rng = random.Random(seed_value)
+    check_date = next_weekday(date.today())
+    results = {}
+    original_engine = settings.SLOT_ENGINE
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            raise SystemExit("❌ The sql engine needs PostgreSQL; point DATABASE_URL to a PostgreSQL database")
+
+        for rooms in room_counts:
+            hospital_id, specialty_id = seed(db, rooms, density, check_date, rng)
+            service = SlotService(db)
+            responses = {}
+
+            for engine_name in ENGINES:
+                settings.SLOT_ENGINE = engine_name
+                responses[engine_name] = service.get_available_slots(hospital_id, specialty_id, check_date, "morning")
+                results[f"{engine_name}[rooms={rooms}]"] = measure(
+                    lambda: service.get_available_slots(hospital_id, specialty_id, check_date, "morning"),
+                    rounds, min_time
+                )
+
+            # Ambos motores deben devolver exactamente los mismos slots
+            if responses["python"].slots != responses["sql"].slots:
+                raise SystemExit(f"❌ Engines disagree for rooms={rooms}")
+    finally:
+        settings.SLOT_ENGINE = original_engine
+        db.rollback()
+        db.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the python and sql slot engines")
+    parser.add_argument("--rooms", default="1,10,100,500", help="Comma-separated room counts")
+    parser.add_argument("--density", type=float, default=0.5, help="Fraction of booked slots (0-1)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    room_counts = [int(v) for v in args.rooms.split(",")]
+    results = run(room_counts, args.density, args.rounds, args.min_time, args.seed)
+
+    print(f"{'rooms':>6}  {'python_ms':>10}  {'sql_ms':>10}  {'faster':>8}")
+    for rooms in room_counts:
+        python_ms = results[f"python[rooms={rooms}]"]["median_us"] / 1000
+        sql_ms = results[f"sql[rooms={rooms}]"]["median_us"] / 1000
+        faster = "sql" if sql_ms < python_ms else "python"
+        print(f"{rooms:>6}  {python_ms:>10.2f}  {sql_ms:>10.2f}  {faster:>8}")
+
+
+if __name__ == "__main__":
+    main()
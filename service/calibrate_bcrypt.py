@@ -0,0 +1,64 @@
+"""
+bcrypt cost calibration
+
+Measures how long one password hash takes on this host for each bcrypt cost
+and recommends the highest cost whose median stays within a latency budget.
+Run it on the production hardware and set BCRYPT_ROUNDS accordingly;
+existing hashes are upgraded on the next successful login of each patient.
+
+Usage:
+    python calibrate_bcrypt.py --budget-ms 250
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+from app.core.security import _normalize_password
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Median milliseconds per hash at a given cost"""
+    password = _normalize_password("calibration-password")
+    handler = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(password)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend a bcrypt cost for a latency budget")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Maximum median hash time")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=15)
+    parser.add_argument("--samples", type=int, default=5, help="Hashes per cost")
+    args = parser.parse_args()
+
+    print(f"\n🔧 Calibrating bcrypt (budget {args.budget_ms:.0f} ms, current BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS})")
+    print(f"   {'rounds':>6}  {'median_ms':>10}")
+
+    recommended = None
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        median_ms = measure(rounds, args.samples)
+        within = median_ms <= args.budget_ms
+        print(f"   {rounds:>6}  {median_ms:>10.1f}  {'✓' if within else '✗'}")
+        if within:
+            recommended = rounds
+        else:
+            # Cada ronda duplica el costo: las siguientes tampoco entran
+            break
+
+    if recommended is None:
+        print(f"\n❌ Even {args.min_rounds} rounds exceed the budget; raise --budget-ms or lower --min-rounds")
+        return
+
+    print(f"\n✅ Recommended: BCRYPT_ROUNDS={recommended}")
+
+
+if __name__ == "__main__":
+    main()
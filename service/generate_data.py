@@ -0,0 +1,361 @@
+"""
+Synthetic data generator for performance testing
+
+Builds a parameterized dataset (hospitals, specialties, rooms, patients and
+months of appointment history with a target occupancy) and bulk-loads it:
+- PostgreSQL: COPY FROM STDIN in large chunks
+- Other databases: executemany in batches
+
+All patients share one precomputed password hash, so no bcrypt runs per row.
+For the small hand-written demo dataset use init_db.py instead.
+
+Usage:
+    python generate_data.py --hospitals 10 --specialties 10 --rooms-per-specialty 3 \\
+        --patients 50000 --months 6 --occupancy 0.8
+"""
+import argparse
+import io
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from sqlalchemy import func, select, text
+
+from app.core.security import get_password_hash
+from app.database.base import Base, engine
+from app.models.appointment import Appointment
+from app.models.consultation_room import ConsultationRoom, specialty_rooms
+from app.models.hospital import Hospital, hospital_specialties
+from app.models.patient import Patient
+from app.models.specialty import Specialty, DEFAULT_SLOT_DURATION
+from app.schemas.patient import PatientCreate, PatientResponse
+from app.services.slot_service import SlotService
+
+SPECIALTY_NAMES = [
+    "Medicina General", "Cardiología", "Pediatría", "Dermatología", "Ginecología",
+    "Traumatología", "Oftalmología", "Neurología", "Psicología", "Nutrición",
+]
+FIRST_NAMES = ["Juan", "María", "Pedro", "Ana", "Luis", "Carmen", "José", "Rosa", "Carlos", "Lucía"]
+LAST_NAMES = ["Pérez", "González", "Rodríguez", "Martínez", "García", "López", "Torres", "Flores", "Ramírez", "Vargas"]
+DISTRICTS = ["Jesús María", "La Victoria", "Miraflores", "San Isidro", "Surco", "Lince"]
+REASONS = ["Control", "Consulta", "Chequeo anual", "Dolor", "Seguimiento", None]
+
+PATIENT_COLUMNS = [
+    "id", "document_number", "last_name", "first_name", "birth_date", "gender",
+    "phone", "email", "password_hash", "active", "created_at", "updated_at"
+]
+# Dominio reservado para ejemplos pero válido para EmailStr (.test/.local no lo son)
+PATIENT_EMAIL_DOMAIN = "example.com"
+
+COPY_CHUNK_ROWS = 200_000
+EXECUTEMANY_BATCH = 5_000
+
+
+# =====================================================
+# Bulk loading
+# =====================================================
+
+def _copy_value(value) -> str:
+    """Format a value for COPY ... (FORMAT text)"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _copy_line(row: Sequence) -> str:
+    return "\t".join([_copy_value(v) for v in row]) + "\n"
+
+
+def bulk_insert(
+    table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    copy_line: Callable[[Sequence], str] = _copy_line
+) -> int:
+    """
+    Load rows into a table with COPY (PostgreSQL) or executemany.
+    copy_line formats one row for COPY; large tables pass a specialized one.
+    """
+    count = 0
+
+    if engine.dialect.name == "postgresql":
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+            buffer = io.StringIO()
+            pending = 0
+
+            for row in rows:
+                buffer.write(copy_line(row))
+                pending += 1
+                if pending >= COPY_CHUNK_ROWS:
+                    buffer.seek(0)
+                    cursor.copy_expert(sql, buffer)
+                    count += pending
+                    buffer = io.StringIO()
+                    pending = 0
+
+            if pending:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                count += pending
+
+            raw.commit()
+        finally:
+            raw.close()
+        return count
+
+    with engine.begin() as conn:
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(dict(zip(columns, row)))
+            if len(batch) >= EXECUTEMANY_BATCH:
+                conn.execute(table.insert(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+            count += len(batch)
+    return count
+
+
+def _next_id(model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+
+
+def _sync_sequences(*models) -> None:
+    """Move serial sequences past the explicit IDs loaded (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for model in models:
+            table = model.__tablename__
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            ))
+
+
+# =====================================================
+# Generation
+# =====================================================
+
+def _working_days(start: date, end: date) -> List[date]:
+    days = []
+    current = start
+    while current <= end:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def _shift_slots(start, end, duration: int) -> List[tuple]:
+    """[(start_time, end_time), ...] for a shift"""
+    slots = []
+    current = datetime.combine(date.today(), start)
+    limit = datetime.combine(date.today(), end)
+    step = timedelta(minutes=duration)
+    while current < limit:
+        slots.append((current.time(), (current + step).time()))
+        current += step
+    return slots
+
+
+def _patient_row(pid: int, rng: random.Random, password_hash: str, now: datetime) -> tuple:
+    return (
+        pid, f"9{pid:08d}", rng.choice(LAST_NAMES), rng.choice(FIRST_NAMES),
+        date(1950 + pid % 55, 1 + pid % 12, 1 + pid % 28), "M" if pid % 2 else "F",
+        f"9{pid % 100000000:08d}", f"patient{pid}@{PATIENT_EMAIL_DOMAIN}", password_hash, True, now, now
+    )
+
+
+def _check_patient_row(row: tuple, password: str) -> None:
+    """Fail before loading if a generated patient would not pass the API schemas"""
+    values = dict(zip(PATIENT_COLUMNS, row))
+    PatientCreate.model_validate({**values, "password": password})
+    PatientResponse.model_validate(values)
+
+
+def generate(
+    hospitals: int,
+    specialties: int,
+    rooms_per_specialty: int,
+    patients: int,
+    months: int,
+    future_weeks: int,
+    occupancy: float,
+    password: str,
+    seed: int
+) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+
+    def step(label: str, count: int, since: float) -> None:
+        print(f"   ✓ {label}: {count:,} rows in {time.perf_counter() - since:.2f}s")
+
+    # Especialidades
+    t = time.perf_counter()
+    specialty_start = _next_id(Specialty)
+    specialty_ids = list(range(specialty_start, specialty_start + specialties))
+    count = bulk_insert(Specialty.__table__, ["id", "name", "description", "active", "created_at", "updated_at"], (
+        (
+            sid,
+            SPECIALTY_NAMES[i] if i < len(SPECIALTY_NAMES) and specialty_start == 1 else f"Especialidad {sid}",
+            "Generada para pruebas de rendimiento",
+            True, now, now
+        )
+        for i, sid in enumerate(specialty_ids)
+    ))
+    step("Specialties", count, t)
+
+    # Hospitales y asignación de especialidades
+    t = time.perf_counter()
+    hospital_start = _next_id(Hospital)
+    hospital_ids = list(range(hospital_start, hospital_start + hospitals))
+    count = bulk_insert(Hospital.__table__, ["id", "name", "code", "address", "district", "city", "active"], (
+        (hid, f"Hospital Sintético {hid}", f"GEN-{hid}", f"Av. Generada {hid}", rng.choice(DISTRICTS), "Lima", True)
+        for hid in hospital_ids
+    ))
+    bulk_insert(hospital_specialties, ["hospital_id", "specialty_id", "active"], (
+        (hid, sid, True) for hid in hospital_ids for sid in specialty_ids
+    ))
+    step("Hospitals", count, t)
+
+    # Consultorios: rooms_per_specialty por especialidad y hospital
+    t = time.perf_counter()
+    room_start = _next_id(ConsultationRoom)
+    rooms = []  # (room_id, specialty_id)
+    room_rows = []
+    room_id = room_start
+    for hid in hospital_ids:
+        for sid in specialty_ids:
+            for k in range(1, rooms_per_specialty + 1):
+                rooms.append((room_id, sid))
+                room_rows.append((
+                    room_id, hid, f"G{hid}-S{sid}-R{k}", f"Consultorio {sid}-{k}",
+                    str(k), "Torre Principal", True, now, now
+                ))
+                room_id += 1
+    count = bulk_insert(ConsultationRoom.__table__, [
+        "id", "hospital_id", "room_number", "name", "floor", "building", "active", "created_at", "updated_at"
+    ], room_rows)
+    bulk_insert(specialty_rooms, ["specialty_id", "consultation_room_id", "created_at"], (
+        (sid, rid, now) for rid, sid in rooms
+    ))
+    step("Consultation rooms", count, t)
+
+    # Pacientes: un único hash precalculado
+    t = time.perf_counter()
+    password_hash = get_password_hash(password)
+    patient_start = _next_id(Patient)
+    patient_end = patient_start + patients
+    # Una fila de muestra con su propio Random para no alterar el dataset
+    _check_patient_row(_patient_row(patient_start, random.Random(seed), password_hash, now), password)
+    count = bulk_insert(Patient.__table__, PATIENT_COLUMNS, (
+        _patient_row(pid, rng, password_hash, now)
+        for pid in range(patient_start, patient_end)
+    ))
+    step("Patients", count, t)
+    print(f"     Password (for all): {password}")
+
+    _sync_sequences(Specialty, Hospital, ConsultationRoom, Patient)
+
+    if not patients or not rooms:
+        return
+
+    # Citas: historial de `months` meses + `future_weeks` semanas futuras
+    t = time.perf_counter()
+    today = date.today()
+    days = _working_days(today - timedelta(days=30 * months), today + timedelta(weeks=future_weeks))
+    duration = DEFAULT_SLOT_DURATION
+    shifts = [
+        ("morning", _shift_slots(SlotService.MORNING_START, SlotService.MORNING_END, duration)),
+        ("afternoon", _shift_slots(SlotService.AFTERNOON_START, SlotService.AFTERNOON_END, duration)),
+    ]
+    random_value = rng.random
+    randrange = rng.randrange
+
+    def appointment_rows():
+        for day in days:
+            past = day < today
+            for rid, sid in rooms:
+                for shift, slots in shifts:
+                    for start_time, end_time in slots:
+                        if random_value() >= occupancy:
+                            continue
+                        if past:
+                            status = "cancelled" if random_value() < 0.1 else "completed"
+                        else:
+                            status = "confirmed"
+                        yield (
+                            randrange(patient_start, patient_end), sid, rid, day,
+                            start_time, end_time, shift, status, REASONS[randrange(len(REASONS))], now, now
+                        )
+
+    # Formateo para COPY con cachés: fechas, horas y textos se repiten mucho
+    formatted: Dict[object, str] = {}
+
+    def appointment_copy_line(row: Sequence) -> str:
+        parts = []
+        for value in row:
+            if type(value) is int:
+                parts.append(str(value))
+                continue
+            text_value = formatted.get(value)
+            if text_value is None:
+                text_value = formatted[value] = _copy_value(value)
+            parts.append(text_value)
+        return "\t".join(parts) + "\n"
+
+    count = bulk_insert(Appointment.__table__, [
+        "patient_id", "specialty_id", "consultation_room_id", "appointment_date", "start_time",
+        "end_time", "shift", "status", "reason", "created_at", "updated_at"
+    ], appointment_rows(), copy_line=appointment_copy_line)
+    step("Appointments", count, t)
+
+    print(f"\n✅ Generated dataset in {time.perf_counter() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset for performance testing")
+    parser.add_argument("--hospitals", type=int, default=10)
+    parser.add_argument("--specialties", type=int, default=10, help="Specialties offered by every hospital")
+    parser.add_argument("--rooms-per-specialty", type=int, default=3, help="Rooms per specialty in each hospital")
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--months", type=int, default=6, help="Months of appointment history")
+    parser.add_argument("--future-weeks", type=int, default=2, help="Weeks of upcoming appointments")
+    parser.add_argument("--occupancy", type=float, default=0.75, help="Fraction of slots booked (0-1)")
+    parser.add_argument("--password", default="password123", help="Password for every generated patient")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    if not 0 <= args.occupancy <= 1:
+        parser.error("--occupancy must be between 0 and 1")
+
+    Base.metadata.create_all(bind=engine)
+
+    print("\n🔧 Generating synthetic dataset...")
+    generate(
+        hospitals=args.hospitals,
+        specialties=args.specialties,
+        rooms_per_specialty=args.rooms_per_specialty,
+        patients=args.patients,
+        months=args.months,
+        future_weeks=args.future_weeks,
+        occupancy=args.occupancy,
+        password=args.password,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
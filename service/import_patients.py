@@ -0,0 +1,106 @@
+"""
+Bulk patient import (admin)
+
+Loads patients from a CSV (header row) or JSONL file with the same fields as
+POST /auth/register. Rows are validated with PatientCreate, duplicates are
+skipped before hashing, passwords are hashed in a process pool across all
+cores and patients are inserted in batches. Rejected rows (invalid or
+conflicting) are written to an optional CSV report.
+
+Usage:
+    python import_patients.py insurer_patients.csv --report rejected.csv
+    python import_patients.py patients.jsonl --batch-size 2000 --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from app.database.base import Base, SessionLocal, engine
+from app.services.patient_import_service import ImportStats, PatientImportService, RawRow
+
+
+def read_csv(path: str) -> Iterator[RawRow]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        # Línea 1 es la cabecera
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            yield line, {key: (value or None) for key, value in row.items() if key}
+
+
+def read_jsonl(path: str) -> Iterator[RawRow]:
+    with open(path, encoding="utf-8") as f:
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError:
+                # El servicio la reporta como fila inválida
+                yield line, None
+
+
+def count_rows(path: str, file_format: str) -> int:
+    with open(path, "rb") as f:
+        lines = sum(1 for text in f if text.strip())
+    return lines - 1 if file_format == "csv" else lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import patients from CSV or JSONL")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Hashing processes")
+    parser.add_argument("--report", default=None, help="Write rejected rows to this CSV")
+    args = parser.parse_args()
+
+    file_format = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+    rows = read_jsonl(args.path) if file_format == "jsonl" else read_csv(args.path)
+    total = count_rows(args.path, file_format)
+
+    Base.metadata.create_all(bind=engine)
+
+    print(f"\n📥 Importing {total:,} rows from {args.path} ({args.workers} hashing workers)")
+    started = time.perf_counter()
+
+    def progress(stats: ImportStats) -> None:
+        elapsed = time.perf_counter() - started
+        rate = stats.processed / elapsed if elapsed else 0
+        eta = (total - stats.processed) / rate if rate else 0
+        sys.stdout.write(
+            f"\r   {stats.processed:,}/{total:,} rows | {stats.inserted:,} inserted | "
+            f"{stats.invalid:,} invalid | {stats.conflicts:,} conflicts | {rate:,.0f} rows/s | ETA {eta:,.0f}s "
+        )
+        sys.stdout.flush()
+
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            service = PatientImportService(db, executor, batch_size=args.batch_size)
+            stats = service.import_rows(rows, on_progress=progress)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n\n✅ Imported {stats.inserted:,} patients in {elapsed:.2f}s ({stats.inserted / elapsed:,.0f} patients/s)")
+
+    if stats.rejected:
+        print(f"⚠️  {len(stats.rejected):,} rows rejected ({stats.invalid:,} invalid, {stats.conflicts:,} conflicts)")
+        if args.report:
+            with open(args.report, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["line", "document_number", "status", "detail"])
+                for outcome in sorted(stats.rejected, key=lambda o: o.line):
+                    writer.writerow([outcome.line, outcome.document_number, outcome.status, outcome.detail])
+            print(f"   Report: {args.report}")
+        else:
+            for outcome in sorted(stats.rejected, key=lambda o: o.line)[:20]:
+                print(f"   line {outcome.line}: {outcome.status} - {outcome.detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core import metrics, tracing
+from app.core.profiling import ProfilingMiddleware
+from app.core.health import readiness
+from app.core.loop_monitor import loop_monitor
+from app.services.slot_inventory_service import slot_inventory_refresher
+from app.services.closure_service import closure_calendar_refresher
+from app.services.waitlist_service import waitlist_worker
 from app.database.base import Base, engine
 
 # Import controllers (routers)
@@ -11,7 +19,10 @@ from app.controllers import (
     hospital_router,
     consultation_room_router,
     slot_router,
-    appointment_router
+    appointment_router,
+    booking_router,
+    closure_router,
+    waitlist_router
 )
 
 # Create database tables
@@ -35,6 +46,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Tracing (TRACING_EXPORTER=stdout|json)
+if tracing.configure_from_settings():
+    tracing.instrument_engine(engine)
+    app.add_middleware(tracing.TracingMiddleware, sample_rate=settings.TRACING_SAMPLE_RATE)
+
+# Profiling bajo demanda (solo con PROFILING_SECRET)
+if settings.PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware, secret=settings.PROFILING_SECRET, output_dir=settings.PROFILING_DIR)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(patient_router)
@@ -43,6 +68,56 @@ app.include_router(hospital_router)
 app.include_router(consultation_room_router)
 app.include_router(slot_router)
 app.include_router(appointment_router)
+app.include_router(booking_router)
+app.include_router(closure_router)
+app.include_router(waitlist_router)
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start(
+            settings.LOOP_MONITOR_INTERVAL,
+            settings.LOOP_BLOCK_THRESHOLD_MS,
+            debug=settings.LOOP_BLOCK_DEBUG
+        )
+
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    await loop_monitor.stop()
+
+
+@app.on_event("startup")
+async def start_slot_inventory_refresher():
+    if settings.SLOT_INVENTORY_ENABLED:
+        slot_inventory_refresher.start(settings.SLOT_INVENTORY_REFRESH_SECONDS)
+
+
+@app.on_event("shutdown")
+async def stop_slot_inventory_refresher():
+    await slot_inventory_refresher.stop()
+
+
+@app.on_event("startup")
+async def start_closure_calendar_refresher():
+    closure_calendar_refresher.start(settings.CLOSURE_CALENDAR_REFRESH_SECONDS)
+
+
+@app.on_event("shutdown")
+async def stop_closure_calendar_refresher():
+    await closure_calendar_refresher.stop()
+
+
+@app.on_event("startup")
+async def start_waitlist_worker():
+    if settings.WAITLIST_ENABLED:
+        waitlist_worker.start(settings.WAITLIST_REFRESH_SECONDS)
+
+
+@app.on_event("shutdown")
+async def stop_waitlist_worker():
+    await waitlist_worker.stop()
 
 
 @app.get("/", tags=["Root"])
@@ -62,6 +137,26 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """Check whether this worker can take traffic (DB, pool, event loop, caches)"""
+    result = await readiness()
+    status_code = status.HTTP_200_OK if result["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(content=result, status_code=status_code)
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics_endpoint():
+        """Prometheus metrics (aggregated across workers in multiprocess mode)"""
+        body, content_type = metrics.render_metrics()
+        return Response(content=body, headers={"Content-Type": content_type})
+
+    @app.on_event("shutdown")
+    def metrics_shutdown():
+        metrics.mark_process_dead()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=3000, reload=True)
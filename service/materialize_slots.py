@@ -0,0 +1,44 @@
+"""
+Slot inventory materialization
+
+Creates the slot_inventory rows of the next SLOT_INVENTORY_WEEKS, marks the
+ones taken by active appointments, frees the ones of cancelled appointments
+and removes past days. Safe to run from cron while the API is up: a
+PostgreSQL advisory lock lets only one materialization run at a time.
+
+Usage:
+    python materialize_slots.py
+    python materialize_slots.py --weeks 8
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.database.base import Base, engine
+from app.services.slot_inventory_service import materialize_slot_inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize the slot inventory")
+    parser.add_argument("--weeks", type=int, default=settings.SLOT_INVENTORY_WEEKS, help="Weeks ahead to materialize")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    print(f"\n🗓️  Materializing slot inventory ({args.weeks} weeks)")
+    started = time.perf_counter()
+    summary = materialize_slot_inventory(weeks=args.weeks)
+    elapsed = time.perf_counter() - started
+
+    if summary is None:
+        print("⚠️  Another materialization is running, skipped")
+        return
+
+    print(
+        f"✅ Done in {elapsed:.2f}s: {summary['inserted']:,} inserted, {summary['booked']:,} booked, "
+        f"{summary['released']:,} released, {summary['deleted']:,} deleted"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@
 --   - Horarios dinámicos, arquitectura limpia
 -- =====================================================
 
+-- btree_gist: restricción EXCLUDE de citas solapadas (entero + rango)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 -- Eliminar objetos si existen (para reinstalación limpia)
 DROP VIEW IF EXISTS v_upcoming_appointments CASCADE;
 DROP VIEW IF EXISTS v_room_usage_stats CASCADE;
@@ -61,6 +64,7 @@ CREATE TABLE specialties (
     id SERIAL PRIMARY KEY,
     name VARCHAR(100) UNIQUE NOT NULL,
     description TEXT,
+    slot_duration INTEGER NOT NULL DEFAULT 20 CHECK (slot_duration BETWEEN 5 AND 240),
     active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -128,6 +132,7 @@ CREATE TABLE consultation_rooms (
     building VARCHAR(50),
     description VARCHAR(255),
     active BOOLEAN DEFAULT TRUE,
+    schedule_version INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -193,9 +198,23 @@ CREATE INDEX idx_appointments_status ON appointments(status);
 CREATE INDEX idx_appointments_specialty_date ON appointments(specialty_id, appointment_date);
 CREATE INDEX idx_appointments_room_date_time ON appointments(consultation_room_id, appointment_date, start_time);
 
+-- Un consultorio no puede tener dos citas activas en el mismo slot
+CREATE UNIQUE INDEX uq_appointments_active_room_slot
+ON appointments(consultation_room_id, appointment_date, start_time)
+WHERE status IN ('pending', 'confirmed', 'rescheduled');
+
+-- Un consultorio no puede tener dos citas activas que se solapen
+-- (especialidades con distinta duración de consulta)
+ALTER TABLE appointments
+ADD CONSTRAINT excl_appointments_active_room_overlap
+EXCLUDE USING gist (
+    consultation_room_id WITH =,
+    tsrange(appointment_date + start_time, appointment_date + end_time) WITH &&
+) WHERE (status IN ('pending', 'confirmed', 'rescheduled'));
+
 COMMENT ON TABLE appointments IS 'Citas médicas agendadas';
 COMMENT ON COLUMN appointments.shift IS 'Turno: morning (8-13h) o afternoon (14-18h)';
-COMMENT ON COLUMN appointments.start_time IS 'Hora de inicio (slots de 20 minutos)';
+COMMENT ON COLUMN appointments.start_time IS 'Hora de inicio (duración según specialties.slot_duration)';
 COMMENT ON COLUMN appointments.end_time IS 'Hora de fin (automático: start_time + 20 min)';
 
 
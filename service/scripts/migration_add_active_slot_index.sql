@@ -0,0 +1,60 @@
+-- =====================================================
+-- MIGRACIÓN: Índice Único de Slots Activos
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Un consultorio no puede tener dos citas activas
+--     (pending, confirmed, rescheduled) en el mismo slot
+--   - Respaldo de POST /appointments/auto y de reservas concurrentes
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Verificar que no haya slots duplicados
+-- =====================================================
+
+DO $$
+DECLARE
+    duplicates INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO duplicates
+    FROM (
+        SELECT consultation_room_id, appointment_date, start_time
+        FROM appointments
+        WHERE status IN ('pending', 'confirmed', 'rescheduled')
+        GROUP BY consultation_room_id, appointment_date, start_time
+        HAVING COUNT(*) > 1
+    ) d;
+    
+    IF duplicates > 0 THEN
+        RAISE EXCEPTION '✗ Hay % slots con más de una cita activa; resolverlos antes de migrar', duplicates;
+    END IF;
+END $$;
+
+-- =====================================================
+-- PASO 2: Crear índice único parcial
+-- =====================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_appointments_active_room_slot
+ON appointments(consultation_room_id, appointment_date, start_time)
+WHERE status IN ('pending', 'confirmed', 'rescheduled');
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Índice uq_appointments_active_room_slot creado exitosamente';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Las citas canceladas o completadas no ocupan el slot,
+-- por eso el índice es parcial: el slot puede volver a
+-- reservarse después de una cancelación.
+-- =====================================================
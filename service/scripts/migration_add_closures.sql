@@ -0,0 +1,61 @@
+-- =====================================================
+-- MIGRACIÓN: Calendario de Feriados y Cierres
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Crea la tabla closures: feriados (global), cierres de
+--     hospital (hospital) y mantenimiento de consultorios (room)
+--   - Rango de días start_date..end_date, ambos inclusive
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Crear tabla closures
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS closures (
+    id SERIAL PRIMARY KEY,
+    scope VARCHAR(20) NOT NULL,
+    hospital_id INTEGER REFERENCES hospitals(id) ON DELETE CASCADE,
+    consultation_room_id INTEGER REFERENCES consultation_rooms(id) ON DELETE CASCADE,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    reason VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT check_closures_scope CHECK (
+        (scope = 'global' AND hospital_id IS NULL AND consultation_room_id IS NULL)
+        OR (scope = 'hospital' AND hospital_id IS NOT NULL AND consultation_room_id IS NULL)
+        OR (scope = 'room' AND consultation_room_id IS NOT NULL AND hospital_id IS NULL)
+    ),
+    CONSTRAINT check_closures_range CHECK (start_date <= end_date)
+);
+
+-- =====================================================
+-- PASO 2: Índices
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_closures_end_date
+ON closures(end_date);
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Tabla closures creada exitosamente';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Ejemplo de feriado nacional:
+--   INSERT INTO closures (scope, start_date, end_date, reason)
+--   VALUES ('global', '2026-12-25', '2026-12-25', 'Navidad');
+-- Cada worker guarda los días cerrados en memoria y revisa
+-- cambios cada CLOSURE_CALENDAR_REFRESH_SECONDS; los cambios
+-- hechos con /closures se aplican al instante en ese worker.
+-- =====================================================
@@ -0,0 +1,103 @@
+-- =====================================================
+-- MIGRACIÓN: Horarios por Consultorio
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Crea schedule_templates (horario semanal por día y turno)
+--   - Crea schedule_breaks (pausas dentro de una plantilla)
+--   - Crea schedule_exceptions (cambios por fecha)
+--   - Agrega consultation_rooms.schedule_version
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Versión del horario en consultation_rooms
+-- =====================================================
+
+ALTER TABLE consultation_rooms
+ADD COLUMN IF NOT EXISTS schedule_version INTEGER NOT NULL DEFAULT 0;
+
+-- =====================================================
+-- PASO 2: Crear tabla schedule_templates
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS schedule_templates (
+    id SERIAL PRIMARY KEY,
+    consultation_room_id INTEGER NOT NULL REFERENCES consultation_rooms(id) ON DELETE CASCADE,
+    weekday INTEGER NOT NULL,
+    shift VARCHAR(20) NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_schedule_templates_room_weekday_shift
+        UNIQUE (consultation_room_id, weekday, shift),
+    CONSTRAINT check_schedule_templates_weekday CHECK (weekday BETWEEN 0 AND 6),
+    CONSTRAINT check_schedule_templates_shift CHECK (shift IN ('morning', 'afternoon')),
+    CONSTRAINT check_schedule_templates_range CHECK (start_time < end_time)
+);
+
+-- =====================================================
+-- PASO 3: Crear tabla schedule_breaks
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS schedule_breaks (
+    id SERIAL PRIMARY KEY,
+    template_id INTEGER NOT NULL REFERENCES schedule_templates(id) ON DELETE CASCADE,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    CONSTRAINT check_schedule_breaks_range CHECK (start_time < end_time)
+);
+
+-- =====================================================
+-- PASO 4: Crear tabla schedule_exceptions
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS schedule_exceptions (
+    id SERIAL PRIMARY KEY,
+    consultation_room_id INTEGER NOT NULL REFERENCES consultation_rooms(id) ON DELETE CASCADE,
+    exception_date DATE NOT NULL,
+    shift VARCHAR(20) NOT NULL,
+    start_time TIME,
+    end_time TIME,
+    reason VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_schedule_exceptions_room_date_shift
+        UNIQUE (consultation_room_id, exception_date, shift),
+    CONSTRAINT check_schedule_exceptions_shift CHECK (shift IN ('morning', 'afternoon'))
+);
+
+-- =====================================================
+-- PASO 5: Índices
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_schedule_templates_consultation_room_id
+ON schedule_templates(consultation_room_id);
+
+CREATE INDEX IF NOT EXISTS idx_schedule_breaks_template_id
+ON schedule_breaks(template_id);
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Tablas de horarios creadas exitosamente';
+    RAISE NOTICE '✓ Columna consultation_rooms.schedule_version agregada';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Los consultorios sin plantillas mantienen el horario por
+-- defecto (lunes a viernes, 8:00-13:00 y 14:00-18:00).
+-- Cada cambio de horario incrementa schedule_version; la app
+-- recompila solo los horarios cuya versión cambió.
+-- Con SLOT_INVENTORY_ENABLED=true, los slots libres del
+-- consultorio se descartan y se vuelven a materializar.
+-- =====================================================
@@ -0,0 +1,87 @@
+-- =====================================================
+-- MIGRACIÓN: Duración de Consulta por Especialidad
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Agrega specialties.slot_duration (minutos, 20 por defecto)
+--   - Restricción EXCLUDE: un consultorio no puede tener dos
+--     citas activas que se solapen, aunque empiecen a distinta hora
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Duración por especialidad
+-- =====================================================
+
+ALTER TABLE specialties
+ADD COLUMN IF NOT EXISTS slot_duration INTEGER NOT NULL DEFAULT 20;
+
+ALTER TABLE specialties
+DROP CONSTRAINT IF EXISTS check_specialties_slot_duration;
+
+ALTER TABLE specialties
+ADD CONSTRAINT check_specialties_slot_duration CHECK (slot_duration BETWEEN 5 AND 240);
+
+-- =====================================================
+-- PASO 2: Verificar que no haya citas solapadas
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+DO $$
+DECLARE
+    overlapping INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO overlapping
+    FROM appointments a
+    JOIN appointments b
+      ON b.consultation_room_id = a.consultation_room_id
+     AND b.appointment_date = a.appointment_date
+     AND b.id > a.id
+     AND b.start_time < a.end_time
+     AND b.end_time > a.start_time
+    WHERE a.status IN ('pending', 'confirmed', 'rescheduled')
+      AND b.status IN ('pending', 'confirmed', 'rescheduled');
+    
+    IF overlapping > 0 THEN
+        RAISE EXCEPTION '✗ Hay % pares de citas activas solapadas; resolverlos antes de migrar', overlapping;
+    END IF;
+END $$;
+
+-- =====================================================
+-- PASO 3: Restricción de solapamiento
+-- =====================================================
+
+ALTER TABLE appointments
+DROP CONSTRAINT IF EXISTS excl_appointments_active_room_overlap;
+
+ALTER TABLE appointments
+ADD CONSTRAINT excl_appointments_active_room_overlap
+EXCLUDE USING gist (
+    consultation_room_id WITH =,
+    tsrange(appointment_date + start_time, appointment_date + end_time) WITH &&
+) WHERE (status IN ('pending', 'confirmed', 'rescheduled'));
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Columna specialties.slot_duration agregada';
+    RAISE NOTICE '✓ Restricción excl_appointments_active_room_overlap creada exitosamente';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Configurar duraciones, por ejemplo:
+--   UPDATE specialties SET slot_duration = 40 WHERE name = 'Psiquiatría';
+-- o con PATCH /specialties/{id}.
+-- Las citas existentes conservan su hora de fin. Con
+-- SLOT_INVENTORY_ENABLED=true, cambiar la duración descarta el
+-- inventario de la especialidad hasta la próxima materialización.
+-- =====================================================
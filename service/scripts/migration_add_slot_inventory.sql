@@ -0,0 +1,66 @@
+-- =====================================================
+-- MIGRACIÓN: Inventario de Slots Precalculados
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Crea la tabla slot_inventory (un registro por slot)
+--   - Índice de lectura por especialidad, fecha y turno
+--   - Se llena con: python materialize_slots.py
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Crear tabla slot_inventory
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS slot_inventory (
+    id SERIAL PRIMARY KEY,
+    consultation_room_id INTEGER NOT NULL REFERENCES consultation_rooms(id) ON DELETE CASCADE,
+    specialty_id INTEGER NOT NULL REFERENCES specialties(id) ON DELETE CASCADE,
+    slot_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    shift VARCHAR(20) NOT NULL,
+    state VARCHAR(20) NOT NULL DEFAULT 'free',
+    appointment_id INTEGER REFERENCES appointments(id) ON DELETE SET NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_slot_inventory_room_specialty_date_time
+        UNIQUE (consultation_room_id, specialty_id, slot_date, start_time),
+    CONSTRAINT check_slot_inventory_state CHECK (state IN ('free', 'booked')),
+    CONSTRAINT check_slot_inventory_shift CHECK (shift IN ('morning', 'afternoon'))
+);
+
+-- =====================================================
+-- PASO 2: Índices
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_slot_inventory_lookup
+ON slot_inventory(specialty_id, slot_date, shift, consultation_room_id, start_time);
+
+CREATE INDEX IF NOT EXISTS idx_slot_inventory_appointment
+ON slot_inventory(appointment_id);
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Tabla slot_inventory creada exitosamente';
+    RAISE NOTICE '✓ Ejecutar: python materialize_slots.py para llenar el inventario';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Con SLOT_INVENTORY_ENABLED=true:
+--   - GET /slots/available lee directamente de slot_inventory
+--   - Reservar bloquea la fila del slot con FOR UPDATE SKIP LOCKED
+--   - Cancelar libera la fila en la misma transacción
+-- Los días sin filas siguen usando el cálculo dinámico.
+-- El job de la app (SLOT_INVENTORY_REFRESH_SECONDS) o el CLI
+-- agregan los días nuevos y borran los pasados.
+-- =====================================================
@@ -0,0 +1,62 @@
+-- =====================================================
+-- MIGRACIÓN: Lista de Espera
+-- =====================================================
+-- Fecha: 2026-10-19
+-- Descripción: 
+--   - Crea la tabla waitlist_entries: pacientes que esperan
+--     un slot liberado de una especialidad en un hospital
+--   - Rango de fechas date_from..date_to, ambos inclusive
+-- =====================================================
+
+BEGIN;
+
+-- =====================================================
+-- PASO 1: Crear tabla waitlist_entries
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS waitlist_entries (
+    id SERIAL PRIMARY KEY,
+    patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    hospital_id INTEGER NOT NULL REFERENCES hospitals(id) ON DELETE CASCADE,
+    specialty_id INTEGER NOT NULL REFERENCES specialties(id) ON DELETE CASCADE,
+    date_from DATE NOT NULL,
+    date_to DATE NOT NULL,
+    shift VARCHAR(20),
+    status VARCHAR(20) NOT NULL DEFAULT 'waiting',
+    appointment_id INTEGER REFERENCES appointments(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT check_waitlist_shift CHECK (shift IS NULL OR shift IN ('morning', 'afternoon')),
+    CONSTRAINT check_waitlist_status CHECK (status IN ('waiting', 'booked', 'cancelled')),
+    CONSTRAINT check_waitlist_range CHECK (date_from <= date_to)
+);
+
+-- =====================================================
+-- PASO 2: Índices
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_waitlist_entries_patient_id
+ON waitlist_entries(patient_id);
+
+CREATE INDEX IF NOT EXISTS idx_waitlist_entries_status_date_to
+ON waitlist_entries(status, date_to);
+
+-- =====================================================
+-- VERIFICACIÓN
+-- =====================================================
+
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Tabla waitlist_entries creada exitosamente';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- NOTAS
+-- =====================================================
+-- Cada worker mantiene en memoria las inscripciones en espera
+-- indexadas por (consultorio, día). Al cancelarse una cita, el
+-- worker en segundo plano reserva el slot para el primer
+-- paciente en espera que pueda tomarlo.
+-- =====================================================